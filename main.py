@@ -1,13 +1,24 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import os
 import warnings
-import csv
-import re
-from io import StringIO
-import requests
-from io import BytesIO
+import traceback
+
+from sod import (
+    Coocorrencia, CacheResultados, DatasetIndisponivel,
+    calcular_comparacao, calcular_coocorrencia, calcular_tabela_cruzada,
+    calcular_uso_perfil, calcular_uso_tecnologias, carregar_dataset,
+    categorizar_tecnologias
+)
+from sod.bootstrap import NIVEL, REAMOSTRAGENS, intervalos_cruzada, intervalos_phi, intervalos_uso
+from sod.cache import CACHE_LIMITE_MB, DIRETORIO_CACHE_DISCO
+from sod.coortes import comparar_coortes, complemento
+from sod.filtros import opcoes_filtros
+from sod.incremental import AgregadorIncremental
+from sod.instrumentacao import RASTREAR_MEMORIA, Medidor, Metricas
+from sod.ponderacao import Estratos, ler_margens, ponderar
+from sod.precomputo import carregar_precomputado
+from sod.testes import ALFA, CORRECOES, testar_associacao
+from sod.validacao import hash_json
 warnings.filterwarnings('ignore')
 
 # Configuração da página
@@ -27,611 +38,75 @@ st.markdown("""
 """)
 
 # ============================================================================
-# FUNÇÕES AUXILIARES
+# RECURSOS COMPARTILHADOS DO PROCESSO
 # ============================================================================
-def limpar_nome_coluna(nome):
-    """Remove sufixos .1, .2, etc. dos nomes das colunas"""
-    if isinstance(nome, str):
-        nome = re.sub(r'\.\d+$', '', nome)
-        nome = nome.strip()
-    return nome
-
-def consolidar_colunas_duplicadas(df):
+# A lógica de carregamento e análise fica no pacote sod (sem Streamlit);
+# aqui só se decide o que é compartilhado entre as sessões
+@st.cache_resource
+def obter_metricas():
+    """Totais de tempo e de cache por etapa, acumulados por todas as sessões"""
+    return Metricas()
+
+@st.cache_resource(show_spinner=False)
+def load_complete_dataset():
     """
-    Consolida colunas com nomes iguais (mas com sufixos .1, .2, etc.)
-    mantendo o valor máximo (1 se pelo menos uma coluna for 1)
+    Dataset do processo, compartilhado (somente leitura) por todas as sessões,
+    com as mensagens e as medições do carregamento para a barra lateral.
+    Falhas não ficam em cache: a próxima sessão tenta de novo.
     """
-    col_map = {}
-    for col in df.columns:
-        nome_limpo = limpar_nome_coluna(col)
-        if nome_limpo != col:
-            col_map[col] = nome_limpo
-    
-    df = df.rename(columns=col_map)
-    
-    colunas_agrupadas = {}
-    for col in df.columns:
-        if col not in colunas_agrupadas:
-            colunas_agrupadas[col] = []
-        colunas_agrupadas[col].append(col)
-    
-    colunas_para_remover = []
-    novas_colunas = {}
-    
-    for nome_base, colunas in colunas_agrupadas.items():
-        if len(colunas) > 1:
-            df_temp = df[colunas]
-            nova_col = df_temp.max(axis=1)
-            novas_colunas[nome_base] = nova_col
-            colunas_para_remover.extend(colunas)
-    
-    df = df.drop(columns=colunas_para_remover)
-    
-    for nome, valores in novas_colunas.items():
-        df[nome] = valores
-    
-    return df
+    mensagens = []
+    validacao = {}
+    medidor_carga = Medidor(obter_metricas(), execucao='carga')
+    df, tech_columns, matriz, indice = carregar_dataset(
+        mensagens=mensagens, medidor=medidor_carga, validacao=validacao
+    )
+    return df, tech_columns, matriz, indice, mensagens, medidor_carga, validacao
 
-# ============================================================================
-# FUNÇÕES DE AGRUPAMENTO CORRIGIDAS
-# ============================================================================
-def calcular_uso_individual(df_filtrado, tech_columns):
-    """Calcula uso individual de cada tecnologia sem agrupamento"""
-    tech_data = []
-    for tech in tech_columns:
-        if tech in df_filtrado.columns:
-            try:
-                uso = df_filtrado[tech].mean() * 100
-                usuarios = int(df_filtrado[tech].sum())
-                total = len(df_filtrado)
-                tech_data.append({
-                    'Tecnologia': limpar_nome_coluna(tech),
-                    'Uso (%)': uso,
-                    'Usuários': usuarios,
-                    'Total': total,
-                    'Coluna Original': tech
-                })
-            except:
-                continue
-    
-    if not tech_data:
-        return None
-    
-    df_tech = pd.DataFrame(tech_data)
-    df_tech = df_tech.drop_duplicates(subset='Tecnologia', keep='first')
-    return df_tech
+@st.cache_resource(show_spinner=False)
+def obter_opcoes_filtros():
+    """Opções dos filtros da barra lateral, calculadas uma vez por processo"""
+    return opcoes_filtros(load_complete_dataset()[0])
 
-def calcular_uso_com_grupos_unificado(df_filtrado, tech_columns):
-    """
-    Calcula uso de tecnologias com agrupamento UNIFICADO
-    Agora SQL, Dados relacionais e Bancos relacionais estão em um único grupo "SQL"
-    """
-    # Primeiro, calcular uso individual de todas as tecnologias
-    df_individual = calcular_uso_individual(df_filtrado, tech_columns)
-    if df_individual is None:
-        return None
-    
-    # Dicionário de agrupamentos UNIFICADO
-    grupos_tecnologias = {
-        # GRUPO UNIFICADO SQL - INCLUI LINGUAGEM, DADOS E BANCOS RELACIONAIS
-        'SQL (linguagem, dados relacionais e bancos)': [
-            # Linguagem SQL
-            'SQL',
-            # Dados relacionais (fonte de dados)
-            'Dados relacionais',
-            # Bancos de dados relacionais
-            'MySQL', 'PostgreSQL', 'SQL SERVER', 'SQLite', 
-            'MariaDB', 'Oracle', 'DB2', 'Microsoft Access', 'Sybase'
-        ],
-        
-        # Grupo Cloud AWS
-        'AWS (serviços diversos)': [
-            'Amazon Aurora ou RDS', 'Amazon DynamoDB', 
-            'Amazon Redshift', 'Amazon Athena', 'S3'
-        ],
-        
-        # Grupo Google Cloud
-        'Google Cloud (BigQuery, Firestore)': ['Google BigQuery', 'Google Firestore'],
-        
-        # Grupo NoSQL
-        'Bancos NoSQL (MongoDB, Cassandra, Redis, etc.)': [
-            'MongoDB', 'Cassandra', 'Redis', 'Neo4J', 
-            'CoachDB', 'Datomic', 'HBase', 'Firebird'
-        ],
-        
-        # Grupo Ferramentas BI
-        'Ferramentas BI (Tableau, Power BI, etc.)': ['Tableau', 'Power BI', 'Looker', 'Qlik'],
-        
-        # Grupo Big Data
-        'Plataformas Big Data (Spark, Hadoop, etc.)': [
-            'Spark', 'Hadoop', 'Kafka', 'Hive', 'Presto', 
-            'Snowflake', 'Databricks', 'HBase'
-        ]
-    }
-    
-    # Inverter o dicionário para mapear cada tecnologia para seu grupo
-    mapa_tecnologia_grupo = {}
-    for grupo, tecnologias in grupos_tecnologias.items():
-        for tech in tecnologias:
-            mapa_tecnologia_grupo[tech.lower()] = grupo
-    
-    # Preparar lista para dados agrupados
-    dados_agrupados = []
-    tecnologias_processadas = set()
-    
-    # Processar grupos primeiro
-    for grupo, tecnologias in grupos_tecnologias.items():
-        # Encontrar colunas originais correspondentes a este grupo
-        colunas_grupo = []
-        for tech in tecnologias:
-            # Procurar por esta tecnologia no df_individual
-            for _, row in df_individual.iterrows():
-                if tech.lower() in row['Tecnologia'].lower():
-                    colunas_grupo.append(row['Coluna Original'])
-                    tecnologias_processadas.add(row['Tecnologia'])
-                    break
-        
-        if colunas_grupo:
-            # Abordagem correta: criar coluna temporária para o grupo
-            temp_col_name = f'_temp_{grupo[:10]}'
-            df_temp = df_filtrado.copy()
-            
-            # Inicializar com 0
-            df_temp[temp_col_name] = 0
-            
-            # Para cada coluna do grupo, marcar como 1 se usar
-            for col in colunas_grupo:
-                if col in df_temp.columns:
-                    df_temp.loc[df_temp[col] == 1, temp_col_name] = 1
-            
-            # Calcular estatísticas do grupo
-            uso_grupo = df_temp[temp_col_name].mean() * 100
-            usuarios_grupo = int(df_temp[temp_col_name].sum())
-            
-            dados_agrupados.append({
-                'Tecnologia': grupo,
-                'Uso (%)': uso_grupo,
-                'Usuários': usuarios_grupo,
-                'Total': len(df_filtrado),
-                'Coluna Original': ', '.join(colunas_grupo[:3]) + ('...' if len(colunas_grupo) > 3 else '')
-            })
-    
-    # Adicionar tecnologias não agrupadas (excluindo as que já estão no grupo SQL)
-    for _, row in df_individual.iterrows():
-        if row['Tecnologia'] not in tecnologias_processadas:
-            # Verificar se esta tecnologia não pertence a nenhum grupo
-            tech_lower = row['Tecnologia'].lower()
-            pertence_grupo = False
-            for tech_key, grupo in mapa_tecnologia_grupo.items():
-                if tech_key in tech_lower:
-                    pertence_grupo = True
-                    break
-            
-            if not pertence_grupo:
-                dados_agrupados.append({
-                    'Tecnologia': row['Tecnologia'],
-                    'Uso (%)': row['Uso (%)'],
-                    'Usuários': row['Usuários'],
-                    'Total': row['Total'],
-                    'Coluna Original': row['Coluna Original']
-                })
-    
-    # Criar DataFrame final
-    df_agrupado = pd.DataFrame(dados_agrupados)
-    
-    # Ordenar por uso
-    df_agrupado = df_agrupado.sort_values('Uso (%)', ascending=False)
-    
-    return df_agrupado
+@st.cache_resource(show_spinner=False)
+def obter_estratos():
+    """Célula de raking de cada respondente, montada uma vez por processo"""
+    return Estratos(load_complete_dataset()[3])
 
-# ============================================================================
-# FUNÇÃO PARA CARREGAR O DATASET DO GITHUB
-# ============================================================================
-@st.cache_data
-def load_complete_dataset():
-    """
-    Carrega o dataset completo (2.645 linhas) com tratamento de erros
-    A partir do GitHub
-    """
+@st.cache_resource(show_spinner=False)
+def obter_agregador():
+    """Somas parciais por valor de filtro, compartilhadas por todas as sessões"""
+    df, _, matriz, indice = load_complete_dataset()[:4]
+    return AgregadorIncremental(matriz, indice, versao=df.attrs.get('versao_dados'))
+
+@st.cache_resource(show_spinner=False)
+def obter_margens_arquivo():
+    """Margens de SOD_MARGENS (None sem arquivo); um arquivo inválido vira aviso"""
     try:
-        # URL do dataset no GitHub (raw)
-        github_url = "https://raw.githubusercontent.com/Thmeirelles/tecnologiastateofdatabrazil/main/State%20of%20Data%20Brazil%202021.csv"
-        
-        st.sidebar.info(f"📂 Carregando arquivo do GitHub...")
-        
-        # MÉTODO 1: Tentar ler diretamente do GitHub
-        try:
-            df = pd.read_csv(
-                github_url,
-                encoding='utf-8',
-                engine='python',
-                on_bad_lines='skip',
-                quoting=csv.QUOTE_MINIMAL,
-                sep=','
-            )
-            st.sidebar.success(f"✅ Método GitHub: {len(df)} linhas carregadas")
-        except Exception as e:
-            st.sidebar.warning(f"⚠️ Método GitHub falhou: {str(e)[:50]}")
-            df = None
-        
-        # MÉTODO 2: Tentar com requests se o método direto falhar
-        if df is None or len(df) < 2000:
-            try:
-                response = requests.get(github_url)
-                response.raise_for_status()
-                
-                # Ler o conteúdo do CSV
-                df = pd.read_csv(
-                    BytesIO(response.content),
-                    encoding='utf-8',
-                    engine='python',
-                    on_bad_lines='skip',
-                    sep=','
-                )
-                st.sidebar.success(f"✅ Método Requests: {len(df)} linhas carregadas")
-            except Exception as e:
-                st.sidebar.warning(f"⚠️ Método Requests falhou: {str(e)[:50]}")
-                df = None
-        
-        # MÉTODO 3: Tentar com encoding latin-1
-        if df is None or len(df) < 2000:
-            try:
-                df = pd.read_csv(
-                    github_url,
-                    encoding='latin-1',
-                    engine='python',
-                    on_bad_lines='skip',
-                    sep=','
-                )
-                st.sidebar.success(f"✅ Método Latin-1: {len(df)} linhas carregadas")
-            except:
-                st.sidebar.error("❌ Não foi possível carregar o dataset do GitHub")
-                return None, []
-        
-        if df is None:
-            st.error("❌ Não foi possível carregar o dataset")
-            return None, []
-        
-        # Verificar se temos colunas suficientes
-        if len(df.columns) < 5:
-            st.error(f"❌ Muito poucas colunas: {len(df.columns)}")
-            return None, []
-        
-        st.sidebar.success(f"🎉 Dataset carregado: {len(df)} linhas × {len(df.columns)} colunas")
-        
-        # ================================================================
-        # CORRIGIR NOMES DE COLUNAS E CONSOLIDAR DUPLICATAS
-        # ================================================================
-        st.sidebar.info("🔄 Consolidando colunas duplicadas...")
-        
-        def corrigir_coluna(nome):
-            """Corrige problemas de encoding em nomes das colunas"""
-            if isinstance(nome, str):
-                try:
-                    return nome.encode('latin-1').decode('utf-8')
-                except:
-                    try:
-                        return nome.encode('utf-8').decode('utf-8')
-                    except:
-                        return nome
-            return nome
-        
-        df.columns = [corrigir_coluna(col) for col in df.columns]
-        
-        df = consolidar_colunas_duplicadas(df)
-        
-        st.sidebar.success(f"✅ Colunas após consolidação: {len(df.columns)}")
-        
-        # ================================================================
-        # IDENTIFICAR COLUNAS DE TECNOLOGIAS (0/1)
-        # ================================================================
-        
-        tech_columns = []
-        
-        tecnologias_esperadas = [
-            # Linguagens
-            'SQL', 'R', 'Python', 'C/C++/C#', '.NET', 'Java', 'Julia',
-            'SAS/Stata', 'Visual Basic/VBA', 'Scala', 'Matlab', 'PHP',
-            'Javascript', 'Não utilizo nenhuma linguagem',
-            
-            # Fontes de dados
-            'Dados relacionais', 'Dados em bancos NoSQL', 'Imagens',
-            'Textos/Documentos', 'Vídeos', 'Áudios', 'Planilhas',
-            'Dados georreferenciados',
-            
-            # Bancos de dados
-            'MySQL', 'Oracle', 'SQL SERVER', 'SAP', 'Amazon Aurora ou RDS',
-            'Amazon DynamoDB', 'CoachDB', 'Cassandra', 'MongoDB', 'MariaDB',
-            'Datomic', 'S3', 'PostgreSQL', 'ElasticSearch', 'DB2',
-            'Microsoft Access', 'SQLite', 'Sybase', 'Firebase', 'Vertica',
-            'Redis', 'Neo4J', 'Google BigQuery', 'Google Firestore',
-            'Amazon Redshift', 'Amazon Athena', 'Snowflake', 'Databricks',
-            'HBase', 'Presto', 'Splunk', 'SAP HANA', 'Hive', 'Firebird',
-            
-            # Cloud
-            'AWS', 'Google Cloud', 'Azure', 'Oracle Cloud', 'IBM',
-            'Servidores On Premise/Não utilizamos Cloud', 'Cloud Própria'
-        ]
-        
-        for tech in tecnologias_esperadas:
-            for col in df.columns:
-                if tech.lower() in col.lower():
-                    tech_columns.append(col)
-                    break
-        
-        padroes_tech = [
-            'sql', 'python', 'r$', 'java', 'javascript', 'c\+\+', 'c#', '\.net',
-            'scala', 'julia', 'sas', 'stata', 'matlab', 'php', 'visual basic',
-            'mysql', 'postgres', 'oracle', 'mongodb', 'redis', 'firebase',
-            'aws', 'azure', 'google', 'cloud', 'ibm', 'dados relacionais',
-            'nosql', 'imagens', 'textos', 'documentos', 'vídeos', 'áudios',
-            'planilhas', 'georreferenciados', 'bigquery', 'databricks',
-            'snowflake', 'spark', 'kafka', 'hadoop', 'tableau', 'power bi',
-            'looker', 'qlik', 'excel'
-        ]
-        
-        for padrao in padroes_tech:
-            for col in df.columns:
-                col_lower = col.lower()
-                if padrao in col_lower and col not in tech_columns:
-                    if not ('?' in col or 'quais' in col_lower or 'entre' in col_lower):
-                        tech_columns.append(col)
-        
-        tech_columns_unicos = []
-        nomes_vistos = set()
-        
-        for col in tech_columns:
-            nome_limpo = limpar_nome_coluna(col)
-            if nome_limpo not in nomes_vistos:
-                nomes_vistos.add(nome_limpo)
-                tech_columns_unicos.append(col)
-        
-        tech_columns = tech_columns_unicos
-        
-        st.sidebar.success(f"🔧 {len(tech_columns)} colunas de tecnologia identificadas")
-        
-        # Converter colunas de tecnologia para binário (0/1)
-        for col in tech_columns:
-            try:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                if df[col].isna().all():
-                    df[col] = df[col].astype(str).str.strip().str.lower()
-                    
-                    df[col] = df[col].replace({
-                        '1': 1, '1.0': 1, 'sim': 1, 'yes': 1, 'true': 1, 's': 1, 'y': 1,
-                        '0': 0, '0.0': 0, 'não': 0, 'nao': 0, 'no': 0, 'false': 0, 'n': 0
-                    })
-                    
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                df[col] = df[col].fillna(0)
-                df[col] = df[col].astype(int)
-                
-            except Exception as e:
-                st.sidebar.warning(f"⚠️ Não foi possível converter {col}: {str(e)[:50]}")
-                if col in tech_columns:
-                    tech_columns.remove(col)
-        
-        # ================================================================
-        # PROCESSAMENTO DE COLUNAS ESPECÍFICAS
-        # ================================================================
-        
-        processed_df = df.copy()
-        
-        # Processar Idade
-        if 'Idade' in processed_df.columns:
-            processed_df['Idade'] = pd.to_numeric(processed_df['Idade'], errors='coerce')
-            
-            if processed_df['Idade'].isna().any():
-                median_age = processed_df['Idade'].median()
-                processed_df['Idade'] = processed_df['Idade'].fillna(median_age)
-            
-            bins = [0, 25, 35, 45, 55, 100]
-            labels = ['<25', '25-34', '35-44', '45-54', '55+']
-            processed_df['faixa_etaria'] = pd.cut(processed_df['Idade'], bins=bins, labels=labels, right=False)
-        
-        # Processar UF e Região
-        if 'UF' in processed_df.columns:
-            processed_df['UF'] = processed_df['UF'].astype(str).str.strip().str.upper()
-            
-            regioes = {
-                'AC': 'Norte', 'AL': 'Nordeste', 'AP': 'Norte', 'AM': 'Norte',
-                'BA': 'Nordeste', 'CE': 'Nordeste', 'DF': 'Centro-Oeste',
-                'ES': 'Sudeste', 'GO': 'Centro-Oeste', 'MA': 'Nordeste',
-                'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste', 'MG': 'Sudeste',
-                'PA': 'Norte', 'PB': 'Nordeste', 'PR': 'Sul', 'PE': 'Nordeste',
-                'PI': 'Nordeste', 'RJ': 'Sudeste', 'RN': 'Nordeste',
-                'RS': 'Sul', 'RO': 'Norte', 'RR': 'Norte', 'SC': 'Sul',
-                'SP': 'Sudeste', 'SE': 'Nordeste', 'TO': 'Norte'
-            }
-            
-            processed_df['regiao'] = processed_df['UF'].map(regioes)
-            processed_df['regiao'] = processed_df['regiao'].fillna('Outros')
-        
-        # Processar Senioridade - AGORA COM FILTRO PARA APENAS JÚNIOR, PLENO E SÊNIOR
-        if 'Senioridade' in processed_df.columns:
-            processed_df['Senioridade'] = processed_df['Senioridade'].astype(str).str.strip()
-            
-            # Primeiro, tratar gestores
-            if 'Gestor?' in processed_df.columns:
-                processed_df['Gestor?'] = pd.to_numeric(processed_df['Gestor?'], errors='coerce')
-                
-                mask_gestor = (processed_df['Senioridade'].isin(['nan', 'NaN', '', 'None', 'null'])) & (processed_df['Gestor?'] == 1)
-                processed_df.loc[mask_gestor, 'Senioridade'] = 'Gestor'
-            
-            # Mapear variações comuns
-            senioridade_map = {
-                'junior': 'Júnior',
-                'pleno': 'Pleno',
-                'senior': 'Sênior',
-                'sênior': 'Sênior',
-                'especialista': 'Especialista',
-                'gestor': 'Gestor',
-                'coordenador': 'Coordenador',
-                'gerente': 'Gerente',
-                'diretor': 'Diretor',
-                'lider': 'Líder',
-                'head': 'Head',
-                'estagiário': 'Estagiário',
-                'trainee': 'Trainee',
-                'assistente': 'Assistente'
-            }
-            
-            for key, value in senioridade_map.items():
-                mask = processed_df['Senioridade'].str.lower().str.contains(key, na=False)
-                processed_df.loc[mask, 'Senioridade'] = value
-            
-            # Para valores que ainda são 'nan', substituir por 'Não informado'
-            mask_nan = processed_df['Senioridade'].isin(['nan', 'NaN', '', 'None', 'null'])
-            processed_df.loc[mask_nan, 'Senioridade'] = 'Não informado'
-        
-        # Processar Gênero (mantido para análise, mas sem filtro)
-        if 'Gênero' in processed_df.columns:
-            processed_df['Gênero'] = processed_df['Gênero'].astype(str).str.strip()
-            
-            genero_map = {
-                'masculino': 'Masculino',
-                'feminino': 'Feminino',
-                'm': 'Masculino',
-                'f': 'Feminino',
-                'homem': 'Masculino',
-                'mulher': 'Feminino'
-            }
-            
-            for key, value in genero_map.items():
-                mask = processed_df['Gênero'].str.lower().str.contains(key)
-                processed_df.loc[mask, 'Gênero'] = value
-        
-        # Processar outras colunas categóricas
-        categorias_para_limpar = [
-            'Nível de Ensino', 'Área de Formação', 'Setor', 
-            'Faixa salarial', 'Forma de trabalho', 'Atuação'
-        ]
-        
-        for col in categorias_para_limpar:
-            if col in processed_df.columns:
-                processed_df[col] = processed_df[col].astype(str).str.strip()
-        
-        return processed_df, tech_columns
-        
-    except Exception as e:
-        st.error(f"❌ Erro ao processar dados: {str(e)}")
-        import traceback
-        st.error(traceback.format_exc())
-        return None, []
+        return ler_margens(), None
+    except (OSError, ValueError) as e:
+        return None, f"⚠️ Margens de ponderação inválidas: {str(e)[:80]}"
 
-# ============================================================================
-# FUNÇÕES DE ANÁLISE DE TECNOLOGIAS UNIFICADAS
-# ============================================================================
-def calcular_uso_tecnologias(df_filtrado, tech_columns, usar_grupos=True):
+@st.cache_resource
+def obter_cache_resultados(versao_dados):
     """
-    Analisa e retorna dados de uso de tecnologias
+    Instância única do cache por processo, compartilhada por todas as sessões.
+    Os resultados pré-calculados do estado padrão (python -m sod precomputar)
+    ficam fixados nele, com as mesmas chaves usadas nas seções.
     """
-    if not tech_columns or df_filtrado.empty:
-        return None
-    
-    if usar_grupos:
-        return calcular_uso_com_grupos_unificado(df_filtrado, tech_columns)
-    else:
-        return calcular_uso_individual(df_filtrado, tech_columns)
-
-def categorizar_tecnologias(df_tech):
-    """Categoriza as tecnologias em grupos COM LISTA FIXA DE LINGUAGENS DE PROGRAMAÇÃO"""
-    # Lista FIXA de linguagens de programação (apenas as que realmente são linguagens de programação)
-    linguagens_de_programacao = [
-        'Python', 'R', 'Java', 'Javascript', 'C/C++/C#', '.NET', 
-        'Julia', 'Scala', 'Matlab', 'PHP', 'Visual Basic/VBA'
-    ]
-    
-    # Lista de tecnologias que NÃO são linguagens de programação (para evitar confusão)
-    nao_linguagens = [
-        'SQL', 'SAS/Stata',  # SQL é linguagem de consulta, não de programação
-        'Não utilizo nenhuma linguagem'  # Esta é uma opção, não linguagem
-    ]
-    
-    categorias = {
-        'Linguagens de Programação': [],
-        'Bancos de Dados': [],
-        'Plataformas Cloud': [],
-        'Fontes de Dados': [],
-        'Ferramentas BI/Visualização': [],
-        'Big Data/Processamento': [],
-        'Outras Ferramentas': []
-    }
-    
-    for _, row in df_tech.iterrows():
-        tech = row['Tecnologia'].lower()
-        tech_original = row['Tecnologia']
-        
-        # 1. Verificar se é o grupo SQL unificado
-        if 'sql (linguagem, dados relacionais e bancos)' in tech:
-            categorias['Bancos de Dados'].append(row['Tecnologia'])
-            continue
-        
-        # 2. Verificar se é uma LINGUAGEM DE PROGRAMAÇÃO (lista fixa)
-        eh_linguagem = False
-        for linguagem in linguagens_de_programacao:
-            if linguagem.lower() in tech:
-                eh_linguagem = True
-                break
-        
-        if eh_linguagem:
-            # Verificar se não está na lista de não-linguagens
-            nao_eh_linguagem = False
-            for nao_ling in nao_linguagens:
-                if nao_ling.lower() in tech:
-                    nao_eh_linguagem = True
-                    break
-            
-            if not nao_eh_linguagem:
-                categorias['Linguagens de Programação'].append(row['Tecnologia'])
-                continue
-        
-        # 3. Bancos de Dados (inclui NoSQL e outros)
-        if any(padrao in tech for padrao in ['mysql', 'postgres', 'oracle', 'mongodb',
-                                              'redis', 'firebase', 'sql server', 'database',
-                                              'cassandra', 'elasticsearch', 'sqlite', 'neo4j',
-                                              'bigquery', 'snowflake', 'databricks', 'hbase',
-                                              'hive', 'firebird', 'mariadb', 'db2', 'access',
-                                              'nosql', 'banco']):
-            categorias['Bancos de Dados'].append(row['Tecnologia'])
-            continue
-        
-        # 4. Cloud
-        elif any(padrao in tech for padrao in ['aws', 'azure', 'google cloud', 'ibm',
-                                              'cloud', 'oracle cloud', 'amazon']):
-            categorias['Plataformas Cloud'].append(row['Tecnologia'])
-            continue
-        
-        # 5. Fontes de Dados
-        elif any(padrao in tech for padrao in ['dados relacionais', 'nosql', 'imagens',
-                                              'textos', 'documentos', 'vídeos', 'áudios',
-                                              'planilhas', 'georreferenciados', 'fontes']):
-            categorias['Fontes de Dados'].append(row['Tecnologia'])
-            continue
-        
-        # 6. Ferramentas BI
-        elif any(padrao in tech for padrao in ['tableau', 'power bi', 'looker', 'qlik',
-                                              'bi', 'visualização']):
-            categorias['Ferramentas BI/Visualização'].append(row['Tecnologia'])
-            continue
-        
-        # 7. Big Data
-        elif any(padrao in tech for padrao in ['spark', 'hadoop', 'kafka', 'presto',
-                                              'databricks', 'snowflake', 'big data',
-                                              'processamento']):
-            categorias['Big Data/Processamento'].append(row['Tecnologia'])
-            continue
-        
-        # 8. Outras
-        else:
-            categorias['Outras Ferramentas'].append(row['Tecnologia'])
-    
-    # Remover categorias vazias
-    categorias = {k: v for k, v in categorias.items() if v}
-    
-    return categorias
+    cache = CacheResultados(int(CACHE_LIMITE_MB * 1024 * 1024), DIRETORIO_CACHE_DISCO, versao=versao_dados)
+    artefato = carregar_precomputado(versao_dados)
+    if artefato is not None:
+        assinatura_padrao = artefato['assinatura']
+        for usar_grupos in (True, False):
+            cache.fixar(('uso', assinatura_padrao, usar_grupos), artefato['uso'][usar_grupos])
+            cache.fixar(('categorias', assinatura_padrao, usar_grupos), artefato['categorias'][usar_grupos])
+        for variavel, tabela in artefato['cruzadas'].items():
+            cache.fixar(('cruzada', assinatura_padrao, variavel), tabela)
+        cache.fixar(('coocorrencia', assinatura_padrao), artefato['coocorrencia'])
+        cache.fixar(('ic_uso', assinatura_padrao), artefato['intervalos_uso'])
+        for variavel, intervalos in artefato['intervalos_cruzadas'].items():
+            cache.fixar(('ic_cruzada', assinatura_padrao, variavel), intervalos)
+    return cache
 
 # ============================================================================
 # CONFIGURAÇÃO DE GRÁFICOS
@@ -657,33 +132,79 @@ def configurar_grafico(fig, altura_minima=400):
     )
     return fig
 
+def especificacao_barras(dados, altura):
+    """
+    Especificação Vega-Lite de barras com a mesma leitura do st.bar_chart
+    (Series: uma barra por índice; DataFrame: barras empilhadas por coluna).
+    Montada uma vez por entrada e guardada com a seção: o st.bar_chart
+    refaz e valida a especificação do Altair a cada rerun.
+    """
+    eixo_x = dados.index.name or 'index'
+    if isinstance(dados, pd.Series):
+        eixo_y = dados.name
+        registros = dados.rename_axis(eixo_x).reset_index()
+        cor = None
+    else:
+        eixo_y = 'valor'
+        cor = dados.columns.name or 'grupo'
+        registros = dados.rename_axis(eixo_x).rename_axis(cor, axis=1).reset_index().melt(
+            id_vars=eixo_x, var_name=cor, value_name=eixo_y
+        )
+    
+    codificacao = {
+        'x': {'field': eixo_x, 'type': 'ordinal', 'title': '', 'axis': {'grid': False}},
+        'y': {'field': eixo_y, 'type': 'quantitative', 'title': '', 'axis': {'grid': True}},
+        'tooltip': [{'field': eixo_x, 'type': 'nominal'}, {'field': eixo_y, 'type': 'quantitative'}],
+    }
+    if cor is not None:
+        codificacao['color'] = {
+            'field': cor, 'type': 'nominal', 'title': ' ',
+            'legend': {'titlePadding': 5, 'offset': 5, 'orient': 'bottom'}
+        }
+        codificacao['tooltip'].append({'field': cor, 'type': 'nominal'})
+    
+    return {
+        'data': {'values': registros.to_dict('records')},
+        'mark': {'type': 'bar'},
+        'encoding': codificacao,
+        'height': altura,
+        'params': [{'name': 'zoom', 'select': {'type': 'interval', 'encodings': ['x', 'y']}, 'bind': 'scales'}],
+    }
+
 # ============================================================================
 # CARREGAMENTO DOS DADOS
 # ============================================================================
-if 'df' not in st.session_state:
-    with st.spinner("Carregando dataset do GitHub..."):
-        df, tech_columns = load_complete_dataset()
-        if df is not None:
-            st.session_state['df'] = df
-            st.session_state['tech_columns'] = tech_columns
-            st.session_state['data_loaded'] = True
-            st.rerun()
-        else:
-            st.error("❌ Não foi possível carregar o dataset")
-            st.stop()
+# Um único dataset por processo, compartilhado (somente leitura) por todas
+# as sessões; cada sessão guarda apenas o estado dos próprios filtros.
+# Cada seção do script é medida (tempo, cache e, com SOD_TRACEMALLOC=1, memória)
+medidor = Medidor(obter_metricas())
+medidor.secao('carregamento')
+with st.spinner("Carregando dataset do GitHub..."):
+    try:
+        df, tech_columns, matriz, indice, mensagens_carga, medidor_carga, validacao_dados = load_complete_dataset()
+    except DatasetIndisponivel as e:
+        st.error(f"❌ {e}")
+        st.stop()
+    except Exception as e:
+        st.error(f"❌ Erro ao processar dados: {str(e)}")
+        st.error(traceback.format_exc())
+        st.stop()
 
-df = st.session_state['df']
-tech_columns = st.session_state['tech_columns']
+for nivel, texto in mensagens_carga:
+    getattr(st.sidebar, nivel)(texto)
 
 # ============================================================================
 # FILTROS INTERATIVOS (SEMPRE COM TODAS AS VARIÁVEIS SELECIONADAS)
 # ============================================================================
+medidor.secao('filtros')
 st.sidebar.header("🔍 FILTROS DE ANÁLISE")
 
+# Opções de cada filtro (iguais para todas as sessões do processo)
+opcoes_filtro = obter_opcoes_filtros()
+
 # Filtro de idade
-if 'Idade' in df.columns:
-    idade_min = int(df['Idade'].min())
-    idade_max = int(df['Idade'].max())
+if 'Idade' in opcoes_filtro:
+    idade_min, idade_max = opcoes_filtro['Idade']
     # Definir faixa padrão para cobrir todos
     idade_range = st.sidebar.slider(
         "Faixa de Idade", 
@@ -692,10 +213,8 @@ if 'Idade' in df.columns:
     )
 
 # Filtro de UF - TODAS SELECIONADAS POR PADRÃO
-if 'UF' in df.columns:
-    uf_opcoes = df['UF'].dropna().unique().tolist()
-    # Remover valores NaN se houver
-    uf_opcoes = [uf for uf in uf_opcoes if uf and str(uf) != 'nan' and str(uf) != 'None']
+if 'UF' in opcoes_filtro:
+    uf_opcoes = opcoes_filtro['UF']
     ufs_selecionadas = st.sidebar.multiselect(
         "UF", 
         uf_opcoes, 
@@ -703,13 +222,9 @@ if 'UF' in df.columns:
     )
 
 # Filtro de senioridade - TODAS SELECIONADAS POR PADRÃO
-if 'Senioridade' in df.columns:
-    # Filtrar para não incluir "Não informado" e "Gestor"
-    senioridade_opcoes = [s for s in df['Senioridade'].dropna().unique() 
-                         if s != 'Não informado' and s != 'Gestor' 
-                         and s in ['Júnior', 'Pleno', 'Sênior']]
-    # Remover valores NaN/None
-    senioridade_opcoes = [s for s in senioridade_opcoes if s and str(s) != 'nan' and str(s) != 'None']
+# (sem "Não informado" e "Gestor")
+if 'Senioridade' in opcoes_filtro:
+    senioridade_opcoes = opcoes_filtro['Senioridade']
     senioridades_selecionadas = st.sidebar.multiselect(
         "Senioridade", 
         senioridade_opcoes, 
@@ -717,10 +232,8 @@ if 'Senioridade' in df.columns:
     )
 
 # Filtro de forma de trabalho - TODAS SELECIONADAS POR PADRÃO
-if 'Forma de trabalho' in df.columns:
-    forma_opcoes = df['Forma de trabalho'].dropna().unique().tolist()
-    # Remover valores NaN/None
-    forma_opcoes = [f for f in forma_opcoes if f and str(f) != 'nan' and str(f) != 'None']
+if 'Forma de trabalho' in opcoes_filtro:
+    forma_opcoes = opcoes_filtro['Forma de trabalho']
     formas_selecionadas = st.sidebar.multiselect(
         "Forma de Trabalho", 
         forma_opcoes, 
@@ -730,67 +243,206 @@ if 'Forma de trabalho' in df.columns:
 # ============================================================================
 # APLICAR FILTROS
 # ============================================================================
-df_filtrado = df.copy()
+# Cada filtro é um OR de bitmaps por valor; entre filtros, AND.
+# Filtros sem seleção não restringem os respondentes.
+filtros_selecionados = {
+    'UF': ufs_selecionadas if 'ufs_selecionadas' in locals() else None,
+    'Senioridade': senioridades_selecionadas if 'senioridades_selecionadas' in locals() else None,
+    'Forma de trabalho': formas_selecionadas if 'formas_selecionadas' in locals() else None,
+}
+idade_filtro = idade_range if 'idade_range' in locals() else None
+selecao = indice.selecionar(idade_range=idade_filtro, filtros=filtros_selecionados)
+total_filtrado = matriz.total(selecao)
 
-if 'Idade' in df_filtrado.columns and 'idade_range' in locals():
-    df_filtrado = df_filtrado[
-        (df_filtrado['Idade'] >= idade_range[0]) & 
-        (df_filtrado['Idade'] <= idade_range[1])
-    ]
+# Resultados dependentes dos filtros ficam no cache compartilhado entre
+# sessões, indexados pela assinatura canônica dos filtros
+cache_resultados = obter_cache_resultados(df.attrs.get('versao_dados'))
+assinatura = (
+    df.attrs.get('versao_dados'),
+    indice.assinatura(idade_filtro, filtros_selecionados)
+)
+# Os testes de significância usam sempre as contagens sem ponderação
+assinatura_amostra = assinatura
 
-# Aplicar filtro de UF apenas se houver seleção, senão usar todas
-if 'ufs_selecionadas' in locals() and ufs_selecionadas:
-    df_filtrado = df_filtrado[df_filtrado['UF'].isin(ufs_selecionadas)]
+# ============================================================================
+# PONDERAÇÃO (RAKING)
+# ============================================================================
+# Os pesos ajustam a seleção a margens de referência; sem ponderação, as
+# chaves de cache são as mesmas de sempre (e o estado padrão pré-calculado vale)
+st.sidebar.header("⚖️ PONDERAÇÃO")
+margens_arquivo, aviso_margens = obter_margens_arquivo()
+if aviso_margens:
+    st.sidebar.warning(aviso_margens)
+modos_ponderacao = ["Sem ponderação", "Composição da amostra completa"]
+if margens_arquivo:
+    modos_ponderacao.append("Margens do arquivo (SOD_MARGENS)")
+modo_ponderacao = st.sidebar.selectbox(
+    "Ponderar respondentes", modos_ponderacao, key='ponderacao',
+    help="Raking (ajuste proporcional iterativo) nas margens de gênero, região, faixa etária e senioridade"
+)
 
-# Aplicar filtro de senioridade apenas se houver seleção, senão usar todas
-if 'senioridades_selecionadas' in locals() and senioridades_selecionadas:
-    df_filtrado = df_filtrado[df_filtrado['Senioridade'].isin(senioridades_selecionadas)]
+def obter_ponderacao(selecao_alvo, assinatura_alvo):
+    """Pesos e relatório do raking de uma seleção, nas margens escolhidas (em cache)"""
+    with medidor.etapa('ponderacao') as medicao:
+        return cache_resultados.obter_ou_calcular(
+            (*chave_ponderacao, assinatura_alvo), lambda: ponderar(estratos, selecao_alvo, margens), medicao
+        )
 
-# Aplicar filtro de forma de trabalho apenas se houver seleção, senão usar todas
-if 'formas_selecionadas' in locals() and formas_selecionadas:
-    df_filtrado = df_filtrado[df_filtrado['Forma de trabalho'].isin(formas_selecionadas)]
+pesos = None
+chave_ponderacao = None
+if modo_ponderacao != modos_ponderacao[0]:
+    estratos = obter_estratos()
+    variaveis_ponderacao = st.sidebar.multiselect(
+        "Variáveis do raking", estratos.variaveis, default=estratos.variaveis, key='variaveis_ponderacao'
+    )
+    margens = estratos.composicao if modo_ponderacao == modos_ponderacao[1] else margens_arquivo
+    margens = {variavel: margens[variavel] for variavel in variaveis_ponderacao if variavel in margens}
+    chave_ponderacao = ('ponderacao', hash_json(margens)[:16])
+    pesos, relatorio_ponderacao = obter_ponderacao(selecao, assinatura)
+    # Todo resultado ponderado fica em chaves próprias
+    assinatura = (*assinatura, chave_ponderacao)
+    
+    situacao = "convergiu" if relatorio_ponderacao['convergiu'] else "NÃO convergiu"
+    st.sidebar.caption(
+        f"Raking {situacao} em {relatorio_ponderacao['iteracoes']} iterações "
+        f"({relatorio_ponderacao['celulas']} células); tamanho efetivo "
+        f"{relatorio_ponderacao['tamanho_efetivo']:,.0f} de {relatorio_ponderacao['respondentes']:,}"
+    )
+    with st.sidebar.expander("Relatório do raking"):
+        st.caption(
+            f"Erro máximo {relatorio_ponderacao['erro_maximo']:.1e} · pesos de "
+            f"{relatorio_ponderacao['peso_minimo']:.2f} a {relatorio_ponderacao['peso_maximo']:.2f}"
+        )
+        for variavel, resumo in relatorio_ponderacao['margens'].items():
+            st.caption(variavel)
+            st.dataframe(
+                pd.DataFrame.from_dict(resumo, orient='index').rename(columns={
+                    'amostra': 'Amostra (%)', 'alvo': 'Margem (%)', 'ponderado': 'Ponderado (%)'
+                }).round(1),
+                use_container_width=True
+            )
+
+# Sem ponderação, uso, co-ocorrência e tabelas cruzadas saem das somas
+# parciais por valor de filtro: mudar um valor só soma ou subtrai a parcial dele
+agregador = obter_agregador()
+
+def calcular_cruzada(variavel):
+    if pesos is None:
+        return agregador.tabela_cruzada(variavel, idade_filtro, filtros_selecionados)
+    return calcular_tabela_cruzada(matriz, indice, variavel, selecao, pesos)
+
+def obter_tabela_cruzada(variavel):
+    """Tabela cruzada da variável com todas as tecnologias e grupos (em cache)"""
+    with medidor.etapa(f'tabela_cruzada:{variavel}') as medicao:
+        return cache_resultados.obter_ou_calcular(
+            ('cruzada', assinatura, variavel), lambda: calcular_cruzada(variavel), medicao
+        )
+
+def obter_intervalos_uso():
+    """Intervalos (bootstrap) do uso de todas as tecnologias e grupos (em cache)"""
+    with medidor.etapa('intervalos_uso') as medicao:
+        return cache_resultados.obter_ou_calcular(
+            ('ic_uso', assinatura), lambda: intervalos_uso(matriz, selecao, pesos=pesos), medicao
+        )
+
+def obter_intervalos_cruzada(variavel):
+    """Intervalos (bootstrap) da tabela cruzada da variável (em cache)"""
+    with medidor.etapa(f'intervalos_cruzada:{variavel}') as medicao:
+        return cache_resultados.obter_ou_calcular(
+            ('ic_cruzada', assinatura, variavel),
+            lambda: intervalos_cruzada(matriz, indice, variavel, selecao, pesos=pesos),
+            medicao
+        )
+
+def obter_testes(variavel, valores=None, correcao='bh'):
+    """Testes de associação de todas as tecnologias e grupos com a variável (em cache)"""
+    def calcular():
+        tabela = cache_resultados.obter_ou_calcular(
+            ('cruzada', assinatura_amostra, variavel),
+            lambda: agregador.tabela_cruzada(variavel, idade_filtro, filtros_selecionados)
+        )
+        return testar_associacao(tabela, valores, correcao=correcao)
+    with medidor.etapa(f'testes:{variavel}') as medicao:
+        return cache_resultados.obter_ou_calcular(
+            ('testes', assinatura_amostra, variavel, tuple(valores) if valores else None, correcao),
+            calcular, medicao
+        )
+
+def texto_intervalos(inferior, superior, formato):
+    """Células 'inferior – superior' para exibir junto das estimativas"""
+    def celula(a, b):
+        return "–" if pd.isna(a) or pd.isna(b) else f"{a:{formato}} – {b:{formato}}"
+    return pd.DataFrame(
+        [[celula(a, b) for a, b in zip(linha_inf, linha_sup)]
+         for linha_inf, linha_sup in zip(inferior.to_numpy(), superior.to_numpy())],
+        index=inferior.index, columns=inferior.columns
+    )
+
+def memorizar_secao(nome, entradas, calcular):
+    """
+    Tudo o que uma seção exibe (tabelas, métricas, gráficos), calculado uma
+    vez por combinação de filtros e das entradas da própria seção: mudar um
+    widget de outra seção não a recalcula, só a desenha de novo
+    """
+    with medidor.etapa(f'secao:{nome}') as medicao:
+        return cache_resultados.obter_ou_calcular(('secao', nome, assinatura, *entradas), calcular, medicao)
 
 # ============================================================================
 # METADADOS DA ANÁLISE
 # ============================================================================
 st.sidebar.header("📊 METADADOS")
-st.sidebar.metric("Respondentes", f"{len(df_filtrado):,}")
+st.sidebar.metric("Respondentes", f"{total_filtrado:,}")
 st.sidebar.metric("Tecnologias", len(tech_columns))
+mostrar_intervalos = st.sidebar.checkbox(
+    f"Intervalos de confiança ({NIVEL:.0%}, bootstrap)", value=True, key='intervalos',
+    help=f"Percentis de {REAMOSTRAGENS} reamostragens dos respondentes filtrados"
+)
 
 # ============================================================================
 # SEÇÃO 1: VISÃO GERAL
 # ============================================================================
+medidor.secao('visao_geral')
 st.header("📊 VISÃO GERAL DA ANÁLISE")
 
+def montar_visao_geral():
+    visao = {}
+    if 'Idade' in df.columns:
+        visao['idade_media'] = indice.media_idade(selecao, pesos)
+    if 'Senioridade' in df.columns:
+        # Filtrar apenas Júnior, Pleno e Sênior para a métrica
+        senior_counts = indice.contagens('Senioridade', selecao, ['Júnior', 'Pleno', 'Sênior'])
+        visao['senioridade'] = max(senior_counts, key=senior_counts.get) if senior_counts else None
+    if 'regiao' in df.columns:
+        regiao_counts = indice.contagens('regiao', selecao)
+        visao['regiao'] = max(regiao_counts, key=regiao_counts.get) if regiao_counts else None
+    return visao
+
+visao_geral = memorizar_secao('visao_geral', (), montar_visao_geral)
+
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total = len(df_filtrado)
-    st.metric("RESPONDENTES FILTRADOS", f"{total:,}".replace(",", "."))
+    st.metric("RESPONDENTES FILTRADOS", f"{total_filtrado:,}".replace(",", "."))
 
 with col2:
-    if 'Idade' in df_filtrado.columns:
-        idade_media = df_filtrado['Idade'].mean()
-        st.metric("IDADE MÉDIA", f"{idade_media:.1f} anos")
+    if 'idade_media' in visao_geral:
+        st.metric("IDADE MÉDIA", f"{visao_geral['idade_media']:.1f} anos")
 
 with col3:
-    if 'Senioridade' in df_filtrado.columns:
-        # Filtrar apenas Júnior, Pleno e Sênior para a métrica
-        senior_counts = df_filtrado[df_filtrado['Senioridade'].isin(['Júnior', 'Pleno', 'Sênior'])]['Senioridade'].value_counts()
-        if not senior_counts.empty:
-            st.metric("SENIORIDADE PRINCIPAL", senior_counts.index[0])
+    if 'senioridade' in visao_geral:
+        if visao_geral['senioridade']:
+            st.metric("SENIORIDADE PRINCIPAL", visao_geral['senioridade'])
         else:
             st.metric("SENIORIDADE", "N/A")
 
 with col4:
-    if 'regiao' in df_filtrado.columns:
-        regiao_counts = df_filtrado['regiao'].value_counts()
-        if not regiao_counts.empty:
-            st.metric("REGIÃO PRINCIPAL", regiao_counts.index[0])
+    if visao_geral.get('regiao'):
+        st.metric("REGIÃO PRINCIPAL", visao_geral['regiao'])
 
 # ============================================================================
 # SEÇÃO 2: ANÁLISE DETALHADA POR CATEGORIA
 # ============================================================================
+medidor.secao('categorias')
 st.header("📊 ANÁLISE DETALHADA POR CATEGORIA")
 
 # Adicionar informação sobre o novo agrupamento SQL
@@ -804,29 +456,55 @@ st.info("""
 usar_grupos = st.checkbox("Agrupar tecnologias similares (SQL unificado, AWS, NoSQL, etc.)", value=True)
 
 # Calcular uso de tecnologias com ou sem grupos
-df_tech = calcular_uso_tecnologias(df_filtrado, tech_columns, usar_grupos=usar_grupos)
+with medidor.etapa('uso_tecnologias') as medicao:
+    df_tech = cache_resultados.obter_ou_calcular(
+        ('uso', assinatura, usar_grupos),
+        lambda: (
+            agregador.uso(tech_columns, idade_filtro, filtros_selecionados, usar_grupos) if pesos is None
+            else calcular_uso_tecnologias(matriz, tech_columns, selecao, usar_grupos=usar_grupos, pesos=pesos)
+        ),
+        medicao
+    )
 
 if df_tech is None or df_tech.empty:
     st.error("Não foi possível calcular o uso de tecnologias. Verifique os dados.")
     st.stop()
 
 # Categorizar tecnologias (com a nova lógica para linguagens de programação)
-categorias = categorizar_tecnologias(df_tech)
+with medidor.etapa('categorizar_tecnologias') as medicao:
+    categorias = cache_resultados.obter_ou_calcular(
+        ('categorias', assinatura, usar_grupos),
+        lambda: categorizar_tecnologias(df_tech),
+        medicao
+    )
+
+def montar_resumo_uso():
+    """Ranking de uso (opções das outras seções) e o destaque do grupo SQL"""
+    resumo = {
+        'ranking': df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].tolist(),
+        'sql': None
+    }
+    if usar_grupos:
+        sql_grupo = df_tech[df_tech['Tecnologia'].str.contains('SQL (linguagem, dados relacionais e bancos)', case=False, na=False)]
+        if not sql_grupo.empty:
+            resumo['sql'] = sql_grupo.iloc[0][['Uso (%)', 'Usuários', 'Total']].to_dict()
+    return resumo
+
+resumo_uso = memorizar_secao('resumo_uso', (usar_grupos,), montar_resumo_uso)
+ranking_tecnologias = resumo_uso['ranking']
 
 # Mostrar estatísticas do grupo SQL unificado (se estiver usando grupos)
-if usar_grupos:
-    sql_grupo = df_tech[df_tech['Tecnologia'].str.contains('SQL (linguagem, dados relacionais e bancos)', case=False, na=False)]
-    if not sql_grupo.empty:
-        uso_sql_grupo = sql_grupo.iloc[0]['Uso (%)']
-        usuarios_sql_grupo = sql_grupo.iloc[0]['Usuários']
-        total_respondentes = sql_grupo.iloc[0]['Total']
-        
-        st.success(f"""
-        **📊 Grupo SQL Unificado:**
-        - **Uso:** {uso_sql_grupo:.1f}% dos respondentes
-        - **Usuários:** {usuarios_sql_grupo:,} de {total_respondentes:,} respondentes
-        - **Interpretação:** {uso_sql_grupo:.1f}% dos profissionais usam pelo menos uma tecnologia relacionada a SQL
-        """)
+if resumo_uso['sql'] is not None:
+    uso_sql_grupo = resumo_uso['sql']['Uso (%)']
+    usuarios_sql_grupo = resumo_uso['sql']['Usuários']
+    total_respondentes = resumo_uso['sql']['Total']
+    
+    st.success(f"""
+    **📊 Grupo SQL Unificado:**
+    - **Uso:** {uso_sql_grupo:.1f}% dos respondentes
+    - **Usuários:** {usuarios_sql_grupo:,} de {total_respondentes:,} respondentes
+    - **Interpretação:** {uso_sql_grupo:.1f}% dos profissionais usam pelo menos uma tecnologia relacionada a SQL
+    """)
 
 # Seletor de categoria
 categoria_selecionada = st.selectbox(
@@ -835,46 +513,60 @@ categoria_selecionada = st.selectbox(
     key='categoria_detalhada'
 )
 
-if categoria_selecionada == 'Todas as Categorias':
-    df_analise = df_tech.copy()
-    titulo_analise = 'Top Tecnologias - Todas as Categorias'
-else:
-    techs_categoria = [t for t in df_tech['Tecnologia'] if t in categorias[categoria_selecionada]]
-    df_analise = df_tech[df_tech['Tecnologia'].isin(techs_categoria)]
-    titulo_analise = f'Top Tecnologias - {categoria_selecionada}'
+def montar_categoria():
+    if categoria_selecionada == 'Todas as Categorias':
+        df_analise = df_tech.copy()
+        titulo_analise = 'Top Tecnologias - Todas as Categorias'
+    else:
+        techs_categoria = [t for t in df_tech['Tecnologia'] if t in categorias[categoria_selecionada]]
+        df_analise = df_tech[df_tech['Tecnologia'].isin(techs_categoria)]
+        titulo_analise = f'Top Tecnologias - {categoria_selecionada}'
+    
+    # Ordenar por uso e pegar top 10
+    df_analise = df_analise.sort_values('Uso (%)', ascending=False).head(10)
+    if df_analise.empty:
+        return {'titulo': titulo_analise, 'tabela': None}
+    
+    # Ordenar para o gráfico
+    df_grafico = df_analise.sort_values('Uso (%)', ascending=True)
+    tabela = df_analise[['Tecnologia', 'Uso (%)', 'Usuários']].sort_values('Uso (%)', ascending=False)
+    if mostrar_intervalos:
+        tabela = tabela.join(obter_intervalos_uso(), on='Tecnologia')
+    return {
+        'titulo': titulo_analise,
+        'tabela': tabela,
+        'uso_medio': df_analise['Uso (%)'].mean(),
+        'mais_usada': df_analise.iloc[0]['Tecnologia'],
+        'grafico': especificacao_barras(df_grafico.set_index('Tecnologia')['Uso (%)'], 500),
+    }
 
-# Ordenar por uso e pegar top 10
-df_analise = df_analise.sort_values('Uso (%)', ascending=False).head(10)
+secao_categoria = memorizar_secao(
+    'categoria', (usar_grupos, categoria_selecionada, mostrar_intervalos), montar_categoria
+)
+tabela_categoria = secao_categoria['tabela']
 
 # Mostrar estatísticas da categoria
 if categoria_selecionada != 'Todas as Categorias':
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric(f"Tecnologias em {categoria_selecionada}", len(df_analise))
+        st.metric(f"Tecnologias em {categoria_selecionada}", 0 if tabela_categoria is None else len(tabela_categoria))
     with col2:
-        st.metric("Uso Médio", f"{df_analise['Uso (%)'].mean():.1f}%")
+        st.metric("Uso Médio", f"{secao_categoria.get('uso_medio', float('nan')):.1f}%")
     with col3:
-        st.metric("Tecnologia Mais Usada", df_analise.iloc[0]['Tecnologia'] if len(df_analise) > 0 else "N/A")
+        st.metric("Tecnologia Mais Usada", secao_categoria.get('mais_usada', "N/A"))
 
 # Mostrar gráfico SEM Plotly (usando Streamlit nativo)
-if not df_analise.empty:
+if tabela_categoria is not None:
     # Criar gráfico de barras usando Streamlit nativo
-    st.subheader(f'{titulo_analise}')
+    st.subheader(f"{secao_categoria['titulo']}")
     
-    # Ordenar para o gráfico
-    df_grafico = df_analise.sort_values('Uso (%)', ascending=True)
-    
-    # Gráfico de barras com Streamlit
-    st.bar_chart(
-        df_grafico.set_index('Tecnologia')['Uso (%)'],
-        height=500,
-        use_container_width=True
-    )
+    # Gráfico de barras (especificação guardada com a seção)
+    st.vega_lite_chart(spec=secao_categoria['grafico'], use_container_width=True)
     
     # Adicionar tabela de dados
     with st.expander("📋 Ver dados detalhados"):
         st.dataframe(
-            df_analise[['Tecnologia', 'Uso (%)', 'Usuários']].sort_values('Uso (%)', ascending=False),
+            tabela_categoria,
             use_container_width=True,
             height=400
         )
@@ -884,29 +576,33 @@ else:
 # ============================================================================
 # SEÇÃO 3: ANÁLISE POR PERFIL
 # ============================================================================
+medidor.secao('perfil')
 st.header("👥 ANÁLISE POR PERFIL")
 
 col1, col2 = st.columns(2)
 
-with col1:
-    # Seletor de variável
+def montar_variaveis_perfil():
+    """Variáveis com pelo menos dois valores entre os respondentes filtrados"""
     variaveis_disp = []
     for var in ['Gênero', 'faixa_etaria', 'UF', 'regiao', 'Senioridade', 
-                'Nível de Ensino', 'Área de Formação', 'Forma de trabalho', 'Atuação']:
-        if var in df_filtrado.columns:
+                'Nível de Ensino', 'Área de Formação', 'Forma de trabalho', 'Atuaçao']:
+        if var in indice.bitmaps:
             if var == 'Senioridade':
                 # Para Senioridade, mostrar apenas Júnior, Pleno e Sênior
-                valores_unicos = [s for s in df_filtrado['Senioridade'].unique() 
-                                if s in ['Júnior', 'Pleno', 'Sênior']]
+                valores_unicos = list(indice.contagens('Senioridade', selecao, ['Júnior', 'Pleno', 'Sênior']))
             else:
-                valores_unicos = df_filtrado[var].unique()
+                valores_unicos = list(indice.contagens(var, selecao))
             
             # Remover valores NaN/None
             valores_unicos = [v for v in valores_unicos if v and str(v) != 'nan' and str(v) != 'None']
             
             if len(valores_unicos) > 1:
                 variaveis_disp.append(var)
-    
+    return variaveis_disp
+
+with col1:
+    # Seletor de variável
+    variaveis_disp = memorizar_secao('variaveis_perfil', (), montar_variaveis_perfil)
     if variaveis_disp:
         variavel_demografica = st.selectbox(
             "Selecione a variável:",
@@ -915,7 +611,7 @@ with col1:
 
 with col2:
     # Seletor de tecnologia
-    tecnologias_disp = df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(20).tolist()
+    tecnologias_disp = ranking_tecnologias[:20]
     if tecnologias_disp:
         tecnologia_demografica = st.selectbox(
             "Selecione a tecnologia para análise:",
@@ -923,42 +619,36 @@ with col2:
         )
 
 # Realizar análise se ambas as seleções foram feitas
+def montar_perfil(variavel, tecnologia):
+    df_grupo = calcular_uso_perfil(obter_tabela_cruzada(variavel), tecnologia)
+    if df_grupo is None or df_grupo.empty:
+        return {'tabela': df_grupo, 'grafico': None}
+    tabela = df_grupo
+    if mostrar_intervalos:
+        inferior, superior = obter_intervalos_cruzada(variavel).limites([tecnologia])
+        tabela = df_grupo.assign(**{
+            'IC inferior (%)': df_grupo[variavel].map(inferior.iloc[0]).to_numpy(dtype=float),
+            'IC superior (%)': df_grupo[variavel].map(superior.iloc[0]).to_numpy(dtype=float),
+        })
+    return {
+        'tabela': tabela,
+        'grafico': especificacao_barras(df_grupo.set_index(variavel)['Uso (%)'], 400),
+    }
+
 if 'variavel_demografica' in locals() and 'tecnologia_demografica' in locals():
-    # Encontrar coluna original da tecnologia
-    coluna_original = None
-    for _, row in df_tech.iterrows():
-        if row['Tecnologia'] == tecnologia_demografica:
-            if usar_grupos and ', ' in str(row['Coluna Original']):
-                coluna_original = str(row['Coluna Original']).split(', ')[0]
-            else:
-                coluna_original = row['Coluna Original']
-            break
+    secao_perfil = memorizar_secao(
+        'perfil', (variavel_demografica, tecnologia_demografica, mostrar_intervalos),
+        lambda: montar_perfil(variavel_demografica, tecnologia_demografica)
+    )
+    df_grupo = secao_perfil['tabela']
     
-    if coluna_original and coluna_original in df_filtrado.columns:
-        # Calcular uso por grupo
-        if variavel_demografica == 'Senioridade':
-            # Filtrar apenas Júnior, Pleno e Sênior
-            df_temp = df_filtrado[df_filtrado['Senioridade'].isin(['Júnior', 'Pleno', 'Sênior'])]
-        else:
-            df_temp = df_filtrado
-        
-        df_grupo = df_temp.groupby(variavel_demografica)[coluna_original].mean() * 100
-        df_grupo = df_grupo.reset_index()
-        df_grupo.columns = [variavel_demografica, 'Uso (%)']
-        
-        df_grupo = df_grupo.dropna()
-        df_grupo = df_grupo.sort_values('Uso (%)', ascending=False)
-        
+    if df_grupo is not None:
         # Criar gráfico usando Streamlit nativo
         if not df_grupo.empty:
             st.subheader(f'Uso de {tecnologia_demografica} por {variavel_demografica}')
             
             # Gráfico de barras
-            st.bar_chart(
-                df_grupo.set_index(variavel_demografica)['Uso (%)'],
-                height=400,
-                use_container_width=True
-            )
+            st.vega_lite_chart(spec=secao_perfil['grafico'], use_container_width=True)
             
             # Mostrar tabela
             st.dataframe(
@@ -969,45 +659,70 @@ if 'variavel_demografica' in locals() and 'tecnologia_demografica' in locals():
         else:
             st.warning(f"Não há dados disponíveis para {tecnologia_demografica} por {variavel_demografica}")
 
+# Testes de todas as tecnologias e grupos contra a variável, de uma vez
+rotulo_correcao = st.radio(
+    "Correção para comparações múltiplas:", list(CORRECOES.values()), horizontal=True, key='correcao'
+)
+correcao = {rotulo: metodo for metodo, rotulo in CORRECOES.items()}[rotulo_correcao]
+COLUNAS_TESTES = ['Teste', 'p ajustado', 'V de Cramér', 'Amplitude (pp)', 'Significativo']
+FORMATO_TESTES = {
+    'p ajustado': st.column_config.NumberColumn(format="%.4f"),
+    'V de Cramér': st.column_config.NumberColumn(format="%.3f"),
+    'Amplitude (pp)': st.column_config.NumberColumn(format="%.1f"),
+}
+
+if 'variavel_demografica' in locals():
+    testes_perfil = obter_testes(
+        variavel_demografica,
+        ['Júnior', 'Pleno', 'Sênior'] if variavel_demografica == 'Senioridade' else None,
+        correcao
+    )
+    testadas = testes_perfil['p-valor'].notna()
+    st.subheader(f"Tecnologias que mais diferem por {variavel_demografica}")
+    st.caption(
+        f"{int(testes_perfil['Significativo'].sum())} de {int(testadas.sum())} tecnologias e grupos com "
+        f"diferença significativa (p ajustado < {ALFA}, {CORRECOES[correcao]}), ordenados pelo V de Cramér. "
+        "Qui-quadrado sobre as contagens de respondentes (Fisher exato em tabelas 2×2 esparsas)"
+        + (", sem a ponderação." if pesos is not None else ".")
+    )
+    st.dataframe(
+        testes_perfil[testadas][COLUNAS_TESTES].head(15),
+        use_container_width=True, column_config=FORMATO_TESTES
+    )
+
 # ============================================================================
 # SEÇÃO 4: CORRELAÇÃO ENTRE TECNOLOGIAS (simplificada)
 # ============================================================================
+medidor.secao('correlacao')
 st.header("🔗 CORRELAÇÃO ENTRE TECNOLOGIAS")
 
 # Selecionar tecnologias para análise de correlação
 techs_correlacao = st.multiselect(
     "Selecione as tecnologias para análise de correlação:",
-    df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(15).tolist(),
-    default=df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(5).tolist(),
+    ranking_tecnologias[:15],
+    default=ranking_tecnologias[:5],
     key='correlacao'
 )
 
+def obter_coocorrencia():
+    """Co-ocorrência entre todas as tecnologias e grupos (em cache)"""
+    with medidor.etapa('coocorrencia') as medicao:
+        return cache_resultados.obter_ou_calcular(
+            ('coocorrencia', assinatura),
+            lambda: (
+                agregador.coocorrencia(idade_filtro, filtros_selecionados) if pesos is None
+                else calcular_coocorrencia(matriz, selecao, pesos)
+            ),
+            medicao
+        )
+
 if len(techs_correlacao) >= 2:
-    colunas_originais = []
-    for tech in techs_correlacao:
-        for _, row in df_tech.iterrows():
-            if row['Tecnologia'] == tech:
-                if usar_grupos and ', ' in str(row['Coluna Original']):
-                    colunas_originais.append(str(row['Coluna Original']).split(', ')[0])
-                else:
-                    colunas_originais.append(row['Coluna Original'])
-                break
-    
-    colunas_disponiveis = [col for col in colunas_originais if col in df_filtrado.columns]
+    corr_matrix = memorizar_secao(
+        'correlacao', tuple(techs_correlacao),
+        lambda: obter_coocorrencia().submatriz(techs_correlacao, 'phi')
+    )
     
-    if len(colunas_disponiveis) >= 2:
-        corr_matrix = df_filtrado[colunas_disponiveis].corr()
-        
-        nomes_limpos = []
-        for col in colunas_disponiveis:
-            for _, row in df_tech.iterrows():
-                if row['Coluna Original'] == col or (isinstance(row['Coluna Original'], str) and col in row['Coluna Original']):
-                    nomes_limpos.append(row['Tecnologia'])
-                    break
-        
-        corr_matrix.columns = nomes_limpos
-        corr_matrix.index = nomes_limpos
-        
+    if len(corr_matrix) >= 2:
         # Mostrar matriz de correlação como tabela
         st.subheader("Matriz de Correlação entre Tecnologias")
         
@@ -1015,6 +730,16 @@ if len(techs_correlacao) >= 2:
         styled_corr = corr_matrix.style.background_gradient(cmap='RdBu', vmin=-1, vmax=1)
         st.dataframe(styled_corr.format("{:.2f}"), use_container_width=True, height=400)
         
+        if mostrar_intervalos:
+            intervalos_corr = memorizar_secao(
+                'intervalos_correlacao', tuple(techs_correlacao),
+                lambda: texto_intervalos(
+                    *intervalos_phi(matriz, techs_correlacao, selecao, pesos=pesos), ".2f"
+                )
+            )
+            with st.expander(f"📏 Intervalos de {NIVEL:.0%} da correlação (bootstrap)"):
+                st.dataframe(intervalos_corr, use_container_width=True)
+        
         # Explicação
         with st.expander("ℹ️ Sobre correlação"):
             st.write("""
@@ -1028,182 +753,238 @@ if len(techs_correlacao) >= 2:
             - **Valores negativos**: Correlação negativa (quando uma aumenta, a outra diminui)
             """)
 
+# Ranking dos pares entre todas as tecnologias exibidas
+st.subheader("🏆 Pares de Tecnologias Mais Associados")
+rotulo_metrica = st.selectbox(
+    "Métrica de associação:",
+    list(Coocorrencia.METRICAS.values()),
+    key='metrica_pares'
+)
+metrica_pares = {rotulo: chave for chave, rotulo in Coocorrencia.METRICAS.items()}[rotulo_metrica]
+pares = memorizar_secao(
+    'pares', (usar_grupos, metrica_pares),
+    lambda: obter_coocorrencia().pares_principais(
+        metrica_pares, nomes=df_tech['Tecnologia'].tolist(), top=15, min_usuarios=10
+    )
+)
+if not pares.empty:
+    st.dataframe(
+        pares,
+        use_container_width=True,
+        hide_index=True,
+        column_config={rotulo_metrica: st.column_config.NumberColumn(format="%.2f")}
+    )
+    st.caption(
+        "Pares com pelo menos 10 usuários em comum. Grupos não são comparados "
+        "com os próprios membros nem com grupos que compartilham membros."
+    )
+
 # ============================================================================
 # SEÇÃO 5: COMPARAÇÃO ENTRE GRUPOS (simplificada)
 # ============================================================================
+medidor.secao('comparacao')
 st.header("⚖️ COMPARAÇÃO ENTRE GRUPOS")
 
 # Criar abas para diferentes comparações
 tab1, tab2, tab3 = st.tabs(["📊 Senioridade", "🌎 Região", "🎓 Nível de Ensino"])
 
+def obter_comparacao(variavel, techs, rotulo, valores=None):
+    """Tabela e gráfico de uma aba, recalculados só quando as entradas da aba mudam"""
+    def montar():
+        pivot_table = calcular_comparacao(obter_tabela_cruzada(variavel), techs, rotulo, valores)
+        if pivot_table is None:
+            return None
+        comparacao = {'tabela': pivot_table, 'grafico': especificacao_barras(pivot_table, 400)}
+        if mostrar_intervalos:
+            inferior, superior = obter_intervalos_cruzada(variavel).limites(techs, valores)
+            # Mesma ordem de linhas e colunas da tabela de uso
+            comparacao['intervalos'] = texto_intervalos(
+                inferior.reindex(index=pivot_table.index, columns=pivot_table.columns),
+                superior.reindex(index=pivot_table.index, columns=pivot_table.columns),
+                ".1f"
+            )
+        comparacao['testes'] = obter_testes(variavel, valores, correcao).reindex(pivot_table.index)[COLUNAS_TESTES]
+        return comparacao
+    return memorizar_secao(
+        'comparacao',
+        (variavel, tuple(techs), rotulo, tuple(valores) if valores else None, mostrar_intervalos, correcao),
+        montar
+    )
+
+def exibir_comparacao(comparacao):
+    """Tabela em % e barras agrupadas"""
+    tabela = comparacao['tabela']
+    st.dataframe(
+        tabela, use_container_width=True,
+        column_config={str(col): st.column_config.NumberColumn(format="%.1f%%") for col in tabela.columns}
+    )
+    if 'intervalos' in comparacao:
+        with st.expander(f"📏 Intervalos de {NIVEL:.0%} do uso (%) (bootstrap)"):
+            st.dataframe(comparacao['intervalos'], use_container_width=True)
+    with st.expander(f"📐 Significância das diferenças entre segmentos ({CORRECOES[correcao]})"):
+        st.dataframe(comparacao['testes'], use_container_width=True, column_config=FORMATO_TESTES)
+    st.vega_lite_chart(spec=comparacao['grafico'], use_container_width=True)
+
+medidor.secao('comparacao:senioridade')
 with tab1:
-    if 'Senioridade' in df_filtrado.columns:
+    if 'Senioridade' in indice.bitmaps:
         # USAR APENAS JÚNIOR, PLENO E SÊNIOR - EXCLUIR GESTOR
         senioridades_validas = ['Júnior', 'Pleno', 'Sênior']
         
         # Verificar se há dados para essas senioridades
-        senioridades_disponiveis = [s for s in senioridades_validas if s in df_filtrado['Senioridade'].unique()]
+        senioridades_disponiveis = list(indice.contagens('Senioridade', selecao, senioridades_validas))
         
         if len(senioridades_disponiveis) >= 2:
             techs_senioridade = st.multiselect(
                 "Selecione tecnologias para comparar por senioridade:",
-                df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(10).tolist(),
-                default=df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(3).tolist(),
+                ranking_tecnologias[:10],
+                default=ranking_tecnologias[:3],
                 key='techs_senioridade'
             )
             
             if techs_senioridade:
-                dados_senioridade = []
-                for tech in techs_senioridade:
-                    col_original = None
-                    for _, row in df_tech.iterrows():
-                        if row['Tecnologia'] == tech:
-                            if usar_grupos and ', ' in str(row['Coluna Original']):
-                                col_original = str(row['Coluna Original']).split(', ')[0]
-                            else:
-                                col_original = row['Coluna Original']
-                            break
-                    
-                    if col_original and col_original in df_filtrado.columns:
-                        for senior in senioridades_disponiveis:
-                            mask = df_filtrado['Senioridade'] == senior
-                            uso = df_filtrado.loc[mask, col_original].mean() * 100
-                            if pd.notna(uso):
-                                dados_senioridade.append({
-                                    'Tecnologia': tech,
-                                    'Senioridade': senior,
-                                    'Uso (%)': uso
-                                })
+                comparacao = obter_comparacao(
+                    'Senioridade', techs_senioridade, 'Senioridade', senioridades_disponiveis
+                )
                 
-                if dados_senioridade:
-                    df_senioridade_plot = pd.DataFrame(dados_senioridade)
-                    
-                    # Mostrar como tabela
+                if comparacao is not None:
+                    # Mostrar como tabela e em barras agrupadas
                     st.subheader("Comparação do Uso de Tecnologias por Senioridade")
-                    
-                    # Reorganizar dados para melhor visualização
-                    pivot_table = df_senioridade_plot.pivot_table(
-                        index='Tecnologia', 
-                        columns='Senioridade', 
-                        values='Uso (%)'
-                    ).fillna(0)
-                    
-                    st.dataframe(pivot_table.style.format("{:.1f}%"), use_container_width=True)
-                    
-                    # Gráfico de barras agrupadas (Streamlit nativo)
-                    st.bar_chart(pivot_table, height=400, use_container_width=True)
+                    exibir_comparacao(comparacao)
                 else:
                     st.warning("Não há dados disponíveis para comparação por senioridade.")
         else:
             st.info("Não há dados suficientes de senioridade (Júnior, Pleno, Sênior) para comparação.")
 
+medidor.secao('comparacao:regiao')
 with tab2:
-    if 'regiao' in df_filtrado.columns and df_filtrado['regiao'].nunique() > 1:
+    if 'regiao' in indice.bitmaps and len(indice.contagens('regiao', selecao)) > 1:
         techs_regiao = st.multiselect(
             "Selecione tecnologias para comparar por região:",
-            df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(10).tolist(),
-            default=df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(3).tolist(),
+            ranking_tecnologias[:10],
+            default=ranking_tecnologias[:3],
             key='techs_regiao'
         )
         
         if techs_regiao:
-            dados_regiao = []
-            for tech in techs_regiao:
-                col_original = None
-                for _, row in df_tech.iterrows():
-                    if row['Tecnologia'] == tech:
-                        if usar_grupos and ', ' in str(row['Coluna Original']):
-                            col_original = str(row['Coluna Original']).split(', ')[0]
-                        else:
-                            col_original = row['Coluna Original']
-                        break
-                
-                if col_original and col_original in df_filtrado.columns:
-                    for regiao in df_filtrado['regiao'].unique():
-                        mask = df_filtrado['regiao'] == regiao
-                        uso = df_filtrado.loc[mask, col_original].mean() * 100
-                        if pd.notna(uso):
-                            dados_regiao.append({
-                                'Tecnologia': tech,
-                                'Região': regiao,
-                                'Uso (%)': uso
-                            })
+            comparacao = obter_comparacao('regiao', techs_regiao, 'Região')
             
-            if dados_regiao:
-                df_regiao_plot = pd.DataFrame(dados_regiao)
-                
-                # Mostrar como tabela
+            if comparacao is not None:
+                # Mostrar como tabela e em barras agrupadas
                 st.subheader("Comparação do Uso de Tecnologias por Região")
-                
-                # Reorganizar dados para melhor visualização
-                pivot_table = df_regiao_plot.pivot_table(
-                    index='Tecnologia', 
-                    columns='Região', 
-                    values='Uso (%)'
-                ).fillna(0)
-                
-                st.dataframe(pivot_table.style.format("{:.1f}%"), use_container_width=True)
-                
-                # Gráfico de barras agrupadas
-                st.bar_chart(pivot_table, height=400, use_container_width=True)
+                exibir_comparacao(comparacao)
             else:
                 st.warning("Não há dados disponíveis para comparação por região.")
 
+medidor.secao('comparacao:ensino')
 with tab3:
-    if 'Nível de Ensino' in df_filtrado.columns and df_filtrado['Nível de Ensino'].nunique() > 1:
+    if 'Nível de Ensino' in indice.bitmaps and len(indice.contagens('Nível de Ensino', selecao)) > 1:
         techs_ensino = st.multiselect(
             "Selecione tecnologias para comparar por nível de ensino:",
-            df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(10).tolist(),
-            default=df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(3).tolist(),
+            ranking_tecnologias[:10],
+            default=ranking_tecnologias[:3],
             key='techs_ensino'
         )
         
         if techs_ensino:
-            dados_ensino = []
-            for tech in techs_ensino:
-                col_original = None
-                for _, row in df_tech.iterrows():
-                    if row['Tecnologia'] == tech:
-                        if usar_grupos and ', ' in str(row['Coluna Original']):
-                            col_original = str(row['Coluna Original']).split(', ')[0]
-                        else:
-                            col_original = row['Coluna Original']
-                        break
-                
-                if col_original and col_original in df_filtrado.columns:
-                    for ensino in df_filtrado['Nível de Ensino'].unique():
-                        mask = df_filtrado['Nível de Ensino'] == ensino
-                        uso = df_filtrado.loc[mask, col_original].mean() * 100
-                        if pd.notna(uso):
-                            dados_ensino.append({
-                                'Tecnologia': tech,
-                                'Nível de Ensino': ensino,
-                                'Uso (%)': uso
-                            })
+            comparacao = obter_comparacao('Nível de Ensino', techs_ensino, 'Nível de Ensino')
             
-            if dados_ensino:
-                df_ensino_plot = pd.DataFrame(dados_ensino)
-                
-                # Mostrar como tabela
+            if comparacao is not None:
+                # Mostrar como tabela e em barras agrupadas
                 st.subheader("Comparação do Uso de Tecnologias por Nível de Ensino")
-                
-                # Reorganizar dados para melhor visualização
-                pivot_table = df_ensino_plot.pivot_table(
-                    index='Tecnologia', 
-                    columns='Nível de Ensino', 
-                    values='Uso (%)'
-                ).fillna(0)
-                
-                st.dataframe(pivot_table.style.format("{:.1f}%"), use_container_width=True)
-                
-                # Gráfico de barras agrupadas
-                st.bar_chart(pivot_table, height=400, use_container_width=True)
+                exibir_comparacao(comparacao)
             else:
                 st.warning("Não há dados disponíveis para comparação por nível de ensino.")
 
+# ============================================================================
+# SEÇÃO 6: COMPARAÇÃO ENTRE COORTES (A/B)
+# ============================================================================
+medidor.secao('coortes')
+st.header("🆚 COMPARAÇÃO ENTRE COORTES")
+st.caption(
+    "Dois conjuntos de filtros lado a lado, independentes da barra lateral "
+    "(um filtro sem valores selecionados não restringe a coorte)."
+)
+
+def filtros_coorte(chave, padrao):
+    """Widgets de filtro de uma coorte; retorna (idade_range, filtros)"""
+    idade = None
+    if 'Idade' in opcoes_filtro:
+        idade = st.slider("Faixa de Idade", *opcoes_filtro['Idade'], opcoes_filtro['Idade'], key=f'{chave}_idade')
+    filtros = {}
+    for variavel in ('UF', 'Senioridade', 'Forma de trabalho'):
+        if variavel in opcoes_filtro:
+            opcoes = opcoes_filtro[variavel]
+            filtros[variavel] = st.multiselect(
+                variavel, opcoes, default=[v for v in padrao.get(variavel, opcoes) if v in opcoes],
+                key=f'{chave}_{variavel}'
+            )
+    return idade, filtros
+
+col_a, col_b = st.columns(2)
+with col_a:
+    st.subheader("Coorte A")
+    idade_a, filtros_a = filtros_coorte('coorte_a', {'UF': ['SP'], 'Forma de trabalho': ['Modelo 100% remoto']})
+with col_b:
+    st.subheader("Coorte B")
+    coorte_b_resto = st.checkbox("Todos os demais respondentes (fora da coorte A)", value=True, key='coorte_b_resto')
+    if not coorte_b_resto:
+        idade_b, filtros_b = filtros_coorte('coorte_b', {})
+
+selecao_a = indice.selecionar(idade_a, filtros_a)
+assinatura_a = (df.attrs.get('versao_dados'), indice.assinatura(idade_a, filtros_a))
+if coorte_b_resto:
+    selecao_b = complemento(matriz, selecao_a)
+    assinatura_b = ('resto', assinatura_a)
+else:
+    selecao_b = indice.selecionar(idade_b, filtros_b)
+    assinatura_b = (df.attrs.get('versao_dados'), indice.assinatura(idade_b, filtros_b))
+
+def montar_coortes():
+    # Com ponderação, cada coorte é ajustada às margens separadamente
+    pesos_coortes = None
+    if chave_ponderacao is not None:
+        pesos_coortes = (
+            obter_ponderacao(selecao_a, assinatura_a)[0], obter_ponderacao(selecao_b, assinatura_b)[0]
+        )
+    return comparar_coortes(matriz, selecao_a, selecao_b, pesos_coortes, correcao)
+
+with medidor.etapa('coortes') as medicao:
+    comparacao_coortes = cache_resultados.obter_ou_calcular(
+        ('coortes', assinatura_a, assinatura_b, chave_ponderacao, correcao), montar_coortes, medicao
+    )
+
+tamanho_a, tamanho_b = comparacao_coortes.attrs['tamanho_a'], comparacao_coortes.attrs['tamanho_b']
+if tamanho_a == 0 or tamanho_b == 0:
+    st.warning("Uma das coortes não tem respondentes com esses filtros.")
+else:
+    significativas = int(comparacao_coortes['Significativo'].sum())
+    st.caption(
+        f"A: {tamanho_a:,} respondentes · B: {tamanho_b:,} respondentes · {significativas} tecnologias e "
+        f"grupos com diferença significativa (p ajustado < {ALFA}, {CORRECOES[correcao]}), "
+        "ordenados pela maior diferença"
+        + (" · uso ponderado, testes sobre as contagens" if chave_ponderacao is not None else "")
+    )
+    if comparacao_coortes.attrs['sobreposicao']:
+        st.info(
+            f"As coortes têm {comparacao_coortes.attrs['sobreposicao']:,} respondentes em comum: "
+            "os testes supõem coortes disjuntas."
+        )
+    st.dataframe(
+        comparacao_coortes.head(20), use_container_width=True,
+        column_config={
+            'Uso A (%)': st.column_config.NumberColumn(format="%.1f%%"),
+            'Uso B (%)': st.column_config.NumberColumn(format="%.1f%%"),
+            'Diferença (pp)': st.column_config.NumberColumn(format="%+.1f"),
+            'Razão A/B': st.column_config.NumberColumn(format="%.2f"),
+            'p ajustado': st.column_config.NumberColumn(format="%.4f"),
+        }
+    )
+
 # ============================================================================
 # SEÇÃO DE INFORMAÇÕES SOBRE AGRUPAMENTOS
 # ============================================================================
+medidor.secao('informacoes')
 with st.expander("ℹ️ Sobre o agrupamento de tecnologias (ATUALIZADO)"):
     st.markdown("""
     ### **AGGRUPAMENTO ATUALIZADO:** SQL Unificado
@@ -1301,3 +1082,68 @@ with st.expander("ℹ️ Sobre o agrupamento de tecnologias (ATUALIZADO)"):
 # ============================================================================
 st.markdown("---")
 st.markdown("**UFBa - Curso de Estatística | Análise Exploratória de Dados | Professor: Ricardo Rocha**")
+
+# ============================================================================
+# PAINEL DE DIAGNÓSTICO (TEMPOS, MEMÓRIA E CACHE DESTA EXECUÇÃO)
+# ============================================================================
+medidor.finalizar()
+medidor.exportar()
+
+if st.sidebar.checkbox("🔧 Diagnóstico de desempenho", value=False, key='diagnostico'):
+    def tabela_medicoes(medicoes):
+        """Uma linha por medição; etapas internas aparecem recuadas"""
+        return [
+            {
+                'Etapa': '\u2003' * m['nivel'] + m['etapa'],
+                'Tempo (ms)': round(m['duracao_s'] * 1000, 1),
+                'Alocado (KB)': round(m['memoria_bytes'] / 1024, 1) if 'memoria_bytes' in m else None,
+                'Pico (KB)': round(m['pico_bytes'] / 1024, 1) if m.get('pico_bytes') is not None else None,
+                'Cache': m['cache'] or '',
+            }
+            for m in sorted(medicoes, key=lambda m: m['inicio'])
+        ]
+    
+    total_execucao = sum(m['duracao_s'] for m in medidor.medicoes if m['nivel'] == 0)
+    st.sidebar.caption(f"Execução {medidor.execucao}: {total_execucao * 1000:.0f} ms")
+    st.sidebar.dataframe(tabela_medicoes(medidor.medicoes), use_container_width=True, hide_index=True)
+    if not RASTREAR_MEMORIA:
+        st.sidebar.caption("Memória não medida: inicie com SOD_TRACEMALLOC=1")
+    
+    with st.sidebar.expander("Carregamento do dataset (uma vez por processo)"):
+        st.dataframe(tabela_medicoes(medidor_carga.medicoes), use_container_width=True, hide_index=True)
+    
+    with st.sidebar.expander("Validação dos dados"):
+        impressao = validacao_dados['impressao']
+        st.caption(
+            f"Versão dos dados {impressao['id']} · conteúdo {impressao['hash_conteudo'][:12]} · "
+            f"colunas {impressao['hash_colunas'][:12]} · pipeline v{impressao['versao_pipeline']}"
+        )
+        st.json(validacao_dados['relatorio'], expanded=False)
+        st.dataframe(
+            pd.DataFrame.from_dict(impressao['colunas'], orient='index').rename_axis('Coluna').reset_index(),
+            use_container_width=True, hide_index=True
+        )
+    
+    estatisticas_cache = cache_resultados.estatisticas()
+    st.sidebar.caption(
+        f"Cache de resultados: {estatisticas_cache['itens']} itens "
+        f"(+{estatisticas_cache['fixos']} pré-calculados), "
+        f"{estatisticas_cache['bytes'] / 1024 ** 2:.1f} MB, "
+        f"{estatisticas_cache['acertos']} acertos, {estatisticas_cache['falhas']} falhas"
+    )
+    estatisticas_parciais = agregador.estatisticas()
+    st.sidebar.caption(
+        f"Somas parciais por valor de filtro: {estatisticas_parciais['itens']} itens, "
+        f"{estatisticas_parciais['bytes'] / 1024 ** 2:.1f} MB, "
+        f"{estatisticas_parciais['acertos']} acertos, {estatisticas_parciais['falhas']} falhas"
+    )
+    
+    col_jsonl, col_prom = st.sidebar.columns(2)
+    col_jsonl.download_button(
+        "JSON lines", medidor_carga.para_json_lines() + medidor.para_json_lines(),
+        file_name="sod_medicoes.jsonl", mime="application/x-ndjson"
+    )
+    col_prom.download_button(
+        "Prometheus", obter_metricas().para_prometheus(),
+        file_name="sod_metricas.prom", mime="text/plain"
+    )
@@ -0,0 +1,33 @@
+"""
+Núcleo de análise do State of Data Brazil 2021, sem dependência do Streamlit:
+leitura e limpeza do CSV, matriz de bits das tecnologias, índice de filtros,
+tabelas de uso, tabelas cruzadas, correlações, testes de significância,
+comparação entre coortes e ponderação por raking. O dashboard (main.py) e
+a linha de comando (python -m sod) usam as mesmas funções.
+"""
+from .analise import (
+    calcular_comparacao, calcular_uso_perfil, calcular_uso_tecnologias, categorizar_tecnologias
+)
+from .bits import TechMatrix, desempacotar_bits, empacotar_bits, popcount
+from .bootstrap import IntervalosCruzada, intervalos_cruzada, intervalos_phi, intervalos_uso
+from .cache import CacheResultados
+from .carga import DatasetIndisponivel, carregar_dataset
+from .coocorrencia import Coocorrencia, calcular_coocorrencia
+from .coortes import comparar_coortes
+from .cruzadas import TabelaCruzada, calcular_tabela_cruzada
+from .filtros import COLUNAS_INDEXADAS, IndiceFiltros
+from .grupos import GRUPOS_TECNOLOGIAS, compilar_grupos
+from .instrumentacao import Medidor, Metricas
+from .ponderacao import VARIAVEIS_PONDERACAO, Estratos, ler_margens, ponderar
+from .testes import testar_associacao
+
+__all__ = [
+    'COLUNAS_INDEXADAS', 'GRUPOS_TECNOLOGIAS', 'VARIAVEIS_PONDERACAO',
+    'CacheResultados', 'Coocorrencia', 'DatasetIndisponivel', 'Estratos', 'IndiceFiltros',
+    'IntervalosCruzada', 'Medidor', 'Metricas', 'TabelaCruzada', 'TechMatrix',
+    'calcular_comparacao', 'calcular_coocorrencia', 'calcular_tabela_cruzada',
+    'calcular_uso_perfil', 'calcular_uso_tecnologias', 'carregar_dataset',
+    'categorizar_tecnologias', 'comparar_coortes', 'compilar_grupos', 'desempacotar_bits',
+    'empacotar_bits', 'intervalos_cruzada', 'intervalos_phi', 'intervalos_uso',
+    'ler_margens', 'ponderar', 'popcount', 'testar_associacao',
+]
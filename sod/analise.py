@@ -0,0 +1,136 @@
+"""Tabelas de uso, perfil, comparação e categorias prontas para exibição"""
+import pandas as pd
+
+from .colunas import normalizar_nome_tecnologia
+from .grupos import calcular_uso_com_grupos_unificado, calcular_uso_individual
+
+# ============================================================================
+# FUNÇÕES DE ANÁLISE DE TECNOLOGIAS UNIFICADAS
+# ============================================================================
+def calcular_uso_tecnologias(matriz, tech_columns, selecao=None, usar_grupos=True, pesos=None, contagens=None):
+    """
+    Analisa e retorna dados de uso de tecnologias dos respondentes da seleção.
+    Com `pesos` (um por respondente), o uso (%) é ponderado. `contagens`,
+    se dado, é o par (total, usuários das tecnologias seguidos dos grupos)
+    já calculado (ex.: pelo AgregadorIncremental).
+    """
+    total = matriz.total(selecao) if contagens is None else contagens[0]
+    if not tech_columns or total == 0:
+        return None
+    
+    if usar_grupos:
+        return calcular_uso_com_grupos_unificado(matriz, tech_columns, selecao, pesos, contagens)
+    else:
+        return calcular_uso_individual(matriz, tech_columns, selecao, pesos, contagens)
+
+def calcular_uso_perfil(tabela_cruzada, tecnologia):
+    """Uso (%) de uma tecnologia (ou grupo) por valor da variável demográfica"""
+    if tecnologia not in tabela_cruzada.posicao:
+        return None
+    
+    if tabela_cruzada.variavel == 'Senioridade':
+        # Filtrar apenas Júnior, Pleno e Sênior
+        valores = ['Júnior', 'Pleno', 'Sênior']
+    else:
+        valores = None
+    
+    uso = tabela_cruzada.uso([tecnologia], valores).iloc[0]
+    df_grupo = pd.DataFrame({tabela_cruzada.variavel: uso.index.tolist(), 'Uso (%)': uso.to_numpy()})
+    return df_grupo.sort_values('Uso (%)', ascending=False)
+
+def calcular_comparacao(tabela_cruzada, techs, rotulo, valores=None):
+    """Tabela tecnologia × valor da variável com o uso (%) em cada segmento"""
+    pivot_table = tabela_cruzada.uso(techs, valores)
+    if pivot_table.empty:
+        return None
+    
+    pivot_table = pivot_table.sort_index().sort_index(axis=1)
+    pivot_table.columns.name = rotulo
+    return pivot_table
+
+def categorizar_tecnologias(df_tech):
+    """Categoriza as tecnologias em grupos COM LISTA FIXA DE LINGUAGENS DE PROGRAMAÇÃO"""
+    # Lista FIXA de linguagens de programação (apenas as que realmente são linguagens de programação)
+    linguagens_de_programacao = [
+        'Python', 'R', 'Java', 'Javascript', 'C/C++/C#', '.NET', 
+        'Julia', 'Scala', 'Matlab', 'PHP', 'Visual Basic/VBA'
+    ]
+    
+    # Lista de tecnologias que NÃO são linguagens de programação (para evitar confusão)
+    nao_linguagens = [
+        'SQL', 'SAS/Stata',  # SQL é linguagem de consulta, não de programação
+        'Não utilizo nenhuma linguagem'  # Esta é uma opção, não linguagem
+    ]
+    
+    linguagens = {normalizar_nome_tecnologia(nome) for nome in linguagens_de_programacao}
+    nao_linguagens = {normalizar_nome_tecnologia(nome) for nome in nao_linguagens}
+    
+    categorias = {
+        'Linguagens de Programação': [],
+        'Bancos de Dados': [],
+        'Plataformas Cloud': [],
+        'Fontes de Dados': [],
+        'Ferramentas BI/Visualização': [],
+        'Big Data/Processamento': [],
+        'Outras Ferramentas': []
+    }
+    
+    for _, row in df_tech.iterrows():
+        tech = row['Tecnologia'].lower()
+        
+        # 1. Verificar se é o grupo SQL unificado
+        if 'sql (linguagem, dados relacionais e bancos)' in tech:
+            categorias['Bancos de Dados'].append(row['Tecnologia'])
+            continue
+        
+        # 2. Verificar se é uma LINGUAGEM DE PROGRAMAÇÃO (lista fixa, nome exato:
+        # por substring, 'R' casaria com qualquer nome que tenha "r")
+        if normalizar_nome_tecnologia(tech) in linguagens and \
+                normalizar_nome_tecnologia(tech) not in nao_linguagens:
+            categorias['Linguagens de Programação'].append(row['Tecnologia'])
+            continue
+        
+        # 3. Bancos de Dados (inclui NoSQL e outros)
+        if any(padrao in tech for padrao in ['mysql', 'postgres', 'oracle', 'mongodb',
+                                              'redis', 'firebase', 'sql server', 'database',
+                                              'cassandra', 'elasticsearch', 'sqlite', 'neo4j',
+                                              'bigquery', 'snowflake', 'databricks', 'hbase',
+                                              'hive', 'firebird', 'mariadb', 'db2', 'access',
+                                              'nosql', 'banco']):
+            categorias['Bancos de Dados'].append(row['Tecnologia'])
+            continue
+        
+        # 4. Cloud
+        elif any(padrao in tech for padrao in ['aws', 'azure', 'google cloud', 'ibm',
+                                              'cloud', 'oracle cloud', 'amazon']):
+            categorias['Plataformas Cloud'].append(row['Tecnologia'])
+            continue
+        
+        # 5. Fontes de Dados
+        elif any(padrao in tech for padrao in ['dados relacionais', 'nosql', 'imagens',
+                                              'textos', 'documentos', 'vídeos', 'áudios',
+                                              'planilhas', 'georreferenciados', 'fontes']):
+            categorias['Fontes de Dados'].append(row['Tecnologia'])
+            continue
+        
+        # 6. Ferramentas BI
+        elif any(padrao in tech for padrao in ['tableau', 'power bi', 'looker', 'qlik',
+                                              'bi', 'visualização']):
+            categorias['Ferramentas BI/Visualização'].append(row['Tecnologia'])
+            continue
+        
+        # 7. Big Data
+        elif any(padrao in tech for padrao in ['spark', 'hadoop', 'kafka', 'presto',
+                                              'databricks', 'snowflake', 'big data',
+                                              'processamento']):
+            categorias['Big Data/Processamento'].append(row['Tecnologia'])
+            continue
+        
+        # 8. Outras
+        else:
+            categorias['Outras Ferramentas'].append(row['Tecnologia'])
+    
+    # Remover categorias vazias
+    categorias = {k: v for k, v in categorias.items() if v}
+    
+    return categorias
@@ -0,0 +1,262 @@
+"""Snapshot Arrow do dataset processado e arrays compartilhados entre processos"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from .bits import TechMatrix
+from .filtros import IndiceFiltros
+
+# ============================================================================
+# SNAPSHOT LOCAL DO DATASET PROCESSADO
+# ============================================================================
+# Raiz do projeto (o pacote fica um nível abaixo)
+DIRETORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAMINHO_CSV_LOCAL = os.path.join(DIRETORIO_APP, 'State of Data Brazil 2021.csv')
+DIRETORIO_SNAPSHOT = os.environ.get(
+    'SOD_SNAPSHOT_DIR', os.path.join(DIRETORIO_APP, '.cache', 'snapshots')
+)
+# Desative com SOD_SNAPSHOT=0 para forçar o processamento completo do CSV
+SNAPSHOT_ATIVO = os.environ.get('SOD_SNAPSHOT', '1') != '0'
+# Incrementar sempre que a limpeza mudar, para invalidar snapshots antigos
+VERSAO_PIPELINE = 6
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """Calcula o SHA-256 do conteúdo de um arquivo"""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def caminho_snapshot(hash_fonte):
+    """Caminho do snapshot Arrow associado ao hash do arquivo de origem"""
+    nome = f"state_of_data_{hash_fonte[:16]}_v{VERSAO_PIPELINE}.arrow"
+    return os.path.join(DIRETORIO_SNAPSHOT, nome)
+
+def salvar_snapshot(processed_df, tech_columns, hash_fonte, validacao):
+    """
+    Salva o DataFrame processado, a lista de tecnologias e a validação
+    (impressão digital e relatório, sod.validacao) em um arquivo Arrow
+    (Feather v2) sem compressão, que pode ser mapeado em memória
+    """
+    caminho = caminho_snapshot(hash_fonte)
+    os.makedirs(DIRETORIO_SNAPSHOT, exist_ok=True)
+    
+    tabela = pa.Table.from_pandas(processed_df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[b'tech_columns'] = json.dumps(tech_columns).encode('utf-8')
+    metadados[b'hash_fonte'] = hash_fonte.encode('utf-8')
+    metadados[b'validacao'] = json.dumps(validacao, ensure_ascii=False).encode('utf-8')
+    tabela = tabela.replace_schema_metadata(metadados)
+    
+    # Escrever em arquivo temporário e renomear, para que outro processo
+    # nunca leia um snapshot pela metade
+    caminho_tmp = f"{caminho}.{os.getpid()}.tmp"
+    feather.write_feather(tabela, caminho_tmp, compression='uncompressed')
+    os.replace(caminho_tmp, caminho)
+    return caminho
+
+def carregar_snapshot(hash_fonte):
+    """
+    Carrega o snapshot mapeado em memória, se existir
+    Retorna (processed_df, tech_columns, validacao) ou None
+    """
+    caminho = caminho_snapshot(hash_fonte)
+    if not os.path.exists(caminho):
+        return None
+    
+    try:
+        tabela = feather.read_table(caminho, memory_map=True)
+        metadados = tabela.schema.metadata or {}
+        if metadados.get(b'hash_fonte', b'').decode('utf-8') != hash_fonte:
+            return None
+        tech_columns = json.loads(metadados[b'tech_columns'].decode('utf-8'))
+        validacao = json.loads(metadados[b'validacao'].decode('utf-8'))
+        return tabela.to_pandas(), tech_columns, validacao
+    except Exception:
+        # Snapshot corrompido ou de versão incompatível: reprocessar o CSV
+        return None
+
+# ============================================================================
+# ARRAYS COMPARTILHADOS ENTRE PROCESSOS (MAPEADOS EM MEMÓRIA)
+# ============================================================================
+# Réplicas na mesma máquina publicam os arrays processados (bits das
+# tecnologias, códigos das categorias, idades e bitmaps dos filtros) em um
+# arquivo; as seguintes mapeiam o arquivo somente leitura e usam as mesmas
+# páginas de memória, sem ler o CSV nem copiar os dados.
+DIRETORIO_COMPARTILHADO = os.environ.get(
+    'SOD_SHARED_DIR',
+    '/dev/shm/state_of_data' if os.path.isdir('/dev/shm')
+    else os.path.join(DIRETORIO_APP, '.cache', 'compartilhado')
+)
+# Desative com SOD_SHARED=0 (cada processo monta os próprios arrays)
+COMPARTILHADO_ATIVO = os.environ.get('SOD_SHARED', '1') != '0'
+ASSINATURA_ARQUIVO = b'SODARR02'
+ALINHAMENTO = 64
+
+def caminho_compartilhado(hash_fonte):
+    """Arquivo de arrays associado ao hash da origem e à versão do pipeline"""
+    nome = f"state_of_data_{hash_fonte[:16]}_v{VERSAO_PIPELINE}.bin"
+    return os.path.join(DIRETORIO_COMPARTILHADO, nome)
+
+def alinhar(posicao):
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+def valores_para_json(valores):
+    """
+    Categorias ou valores indexados com o dtype, para voltarem com o mesmo
+    tipo ao anexar (ex.: códigos inteiros não viram texto)
+    """
+    valores = pd.Index(valores)
+    if valores.dtype == object:
+        tipos = {type(v).__name__ for v in valores if not isinstance(v, str)}
+        if tipos:
+            raise TypeError(f"valores não suportados no arquivo compartilhado: {sorted(tipos)}")
+        return {'dtype': None, 'valores': valores.tolist()}
+    if valores.dtype.kind not in 'biuf':
+        raise TypeError(f"dtype não suportado no arquivo compartilhado: {valores.dtype}")
+    return {'dtype': valores.dtype.str, 'valores': valores.tolist()}
+
+def valores_de_json(spec):
+    """Inverso de valores_para_json"""
+    if spec['dtype'] is None:
+        return pd.Index(spec['valores'], dtype=object)
+    return pd.Index(spec['valores'], dtype=np.dtype(spec['dtype']))
+
+def publicar_arrays(processed_df, tech_columns, matriz, indice, hash_fonte, validacao):
+    """
+    Grava os arrays do dataset em um único arquivo: cabeçalho JSON com
+    metadados (incluindo a validação) e posições, seguido dos arrays
+    alinhados em 64 bytes.
+    As colunas de tecnologia vão apenas como bits (TechMatrix).
+    """
+    arrays = {'tech': matriz.palavras}
+    colunas = []
+    ignorar = set(tech_columns)
+    for col in processed_df.columns:
+        if col in ignorar:
+            continue
+        serie = processed_df[col]
+        if pd.api.types.is_numeric_dtype(serie.dtype):
+            arrays[f'valores:{col}'] = serie.to_numpy()
+            colunas.append({'nome': col, 'tipo': 'numerico'})
+            continue
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype('category')
+        arrays[f'codigos:{col}'] = serie.cat.codes.to_numpy()
+        colunas.append({
+            'nome': col,
+            'tipo': 'category',
+            'categorias': valores_para_json(serie.cat.categories),
+            'ordenada': bool(serie.cat.ordered)
+        })
+    
+    valores_indice = {}
+    for col, mapa in indice.bitmaps.items():
+        arrays[f'bitmaps:{col}'] = (
+            np.stack(list(mapa.values())) if mapa
+            else np.zeros((0, matriz.palavras.shape[1]), dtype=np.uint64)
+        )
+        valores_indice[col] = valores_para_json(list(mapa))
+    if indice.idade is not None:
+        arrays['idade'] = indice.idade
+        arrays['idades'] = indice.idades
+        arrays['prefixos_idade'] = indice.prefixos_idade
+    
+    especificacao = {}
+    posicao = 0
+    for nome, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[nome] = array
+        especificacao[nome] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': posicao}
+        posicao = alinhar(posicao + array.nbytes)
+    
+    cabecalho = json.dumps({
+        'hash_fonte': hash_fonte,
+        'validacao': validacao,
+        'n_linhas': matriz.n_linhas,
+        'tech_columns': list(tech_columns),
+        'colunas_matriz': matriz.colunas,
+        'colunas': colunas,
+        'indice': {'valores': valores_indice, 'completa': indice.completa},
+        'arrays': especificacao
+    }).encode('utf-8')
+    inicio = alinhar(len(ASSINATURA_ARQUIVO) + 8 + len(cabecalho))
+    
+    os.makedirs(DIRETORIO_COMPARTILHADO, exist_ok=True)
+    caminho = caminho_compartilhado(hash_fonte)
+    caminho_tmp = f"{caminho}.{os.getpid()}.tmp"
+    with open(caminho_tmp, 'wb') as f:
+        f.write(ASSINATURA_ARQUIVO)
+        f.write(len(cabecalho).to_bytes(8, 'little'))
+        f.write(cabecalho)
+        for nome, array in arrays.items():
+            f.seek(inicio + especificacao[nome]['offset'])
+            f.write(array.tobytes())
+        f.truncate(inicio + posicao)
+    os.replace(caminho_tmp, caminho)
+    return caminho
+
+def anexar_arrays(hash_fonte):
+    """
+    Mapeia o arquivo publicado por outro processo, se existir.
+    Retorna (processed_df, tech_columns, matriz, indice, validacao) com
+    todos os arrays apontando para o mapeamento (somente leitura), ou None.
+    O DataFrame traz as colunas de perfil; as tecnologias estão na matriz.
+    """
+    caminho = caminho_compartilhado(hash_fonte)
+    if not os.path.exists(caminho):
+        return None
+    
+    try:
+        mapa = np.memmap(caminho, dtype=np.uint8, mode='r')
+        n = len(ASSINATURA_ARQUIVO)
+        if bytes(mapa[:n]) != ASSINATURA_ARQUIVO:
+            return None
+        tamanho = int.from_bytes(bytes(mapa[n:n + 8]), 'little')
+        cabecalho = json.loads(bytes(mapa[n + 8:n + 8 + tamanho]).decode('utf-8'))
+        if cabecalho['hash_fonte'] != hash_fonte:
+            return None
+        inicio = alinhar(n + 8 + tamanho)
+        
+        def array(nome):
+            spec = cabecalho['arrays'][nome]
+            return np.ndarray(
+                tuple(spec['shape']), dtype=np.dtype(spec['dtype']),
+                buffer=mapa, offset=inicio + spec['offset']
+            )
+        
+        colunas = {}
+        for col in cabecalho['colunas']:
+            nome = col['nome']
+            if col['tipo'] == 'numerico':
+                colunas[nome] = array(f'valores:{nome}')
+            else:
+                colunas[nome] = pd.Categorical.from_codes(
+                    array(f'codigos:{nome}'), categories=valores_de_json(col['categorias']),
+                    ordered=col['ordenada']
+                )
+        processed_df = pd.DataFrame(colunas, copy=False)
+        
+        n_linhas = cabecalho['n_linhas']
+        matriz = TechMatrix(array('tech'), cabecalho['colunas_matriz'], n_linhas)
+        bitmaps = {
+            col: dict(zip(valores_de_json(valores), array(f'bitmaps:{col}')))
+            for col, valores in cabecalho['indice']['valores'].items()
+        }
+        tem_idade = 'idade' in cabecalho['arrays']
+        indice = IndiceFiltros.de_arrays(
+            n_linhas, bitmaps, cabecalho['indice']['completa'],
+            array('idade') if tem_idade else None,
+            array('idades') if tem_idade else None,
+            array('prefixos_idade') if tem_idade else None
+        )
+        return processed_df, cabecalho['tech_columns'], matriz, indice, cabecalho['validacao']
+    except Exception:
+        # Arquivo incompleto ou de formato antigo: montar os arrays de novo
+        return None
@@ -0,0 +1,334 @@
+"""
+Benchmark dos caminhos de carga e agregação sobre pesquisas sintéticas.
+
+    python -m sod.benchmark --escalas 1 10 100 --saida benchmark.json
+
+Cada escala gera um CSV com o layout do original e N vezes as suas linhas
+(sod.sintetico) e mede cada etapa: tempo de parede (várias repetições),
+pico de memória alocada pelo Python e pelo numpy (tracemalloc) e pico de
+memória residente da etapa sozinha, que inclui os buffers do Arrow
+(processo filho). As medições de memória rodam em execuções separadas,
+para não distorcer os tempos. O resultado sai em JSON.
+"""
+import argparse
+import ctypes
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .analise import calcular_comparacao, calcular_uso_tecnologias, categorizar_tecnologias
+from .armazenamento import CAMINHO_CSV_LOCAL, VERSAO_PIPELINE
+from .bits import TechMatrix
+from .bootstrap import intervalos_cruzada, intervalos_uso
+from .coocorrencia import calcular_coocorrencia
+from .coortes import comparar_coortes, complemento
+from .cruzadas import calcular_tabela_cruzada
+from .esquema import PAPEIS_DATASET, ler_csv_com_esquema
+from .filtros import COLUNAS_INDEXADAS, IndiceFiltros
+from .incremental import AgregadorIncremental
+from .limpeza import processar_dataset
+from .ponderacao import Estratos, ponderar
+from .sintetico import LINHAS_ORIGINAIS, gerar_pesquisa_sintetica
+from .testes import testar_associacao
+
+VERSAO_FORMATO = 1
+
+ESCALAS_PADRAO = [1, 10, 100]
+
+# Filtros típicos da barra lateral
+FILTROS_BENCHMARK = {
+    'UF': ['SP', 'RJ', 'MG'],
+    'Senioridade': ['Pleno', 'Sênior'],
+}
+IDADE_BENCHMARK = (25, 40)
+
+# ============================================================================
+# ETAPAS MEDIDAS
+# ============================================================================
+# Cada etapa recebe o contexto com os resultados das anteriores e devolve
+# o que acrescenta a ele
+def etapa_leitura(ctx):
+    df, _ = ler_csv_com_esquema(ctx['csv'], papeis=PAPEIS_DATASET)
+    return {'df': df}
+
+def etapa_processamento(ctx):
+    # processar_dataset converte as colunas no próprio DataFrame
+    processed_df, tech_columns = processar_dataset(ctx['df'].copy(deep=False))
+    return {'processed_df': processed_df, 'tech_columns': tech_columns}
+
+def etapa_matriz(ctx):
+    return {'matriz': TechMatrix.de_dataframe(ctx['processed_df'], ctx['tech_columns'])}
+
+def etapa_indice(ctx):
+    return {'indice': IndiceFiltros(ctx['processed_df'])}
+
+def etapa_filtros(ctx):
+    return {'selecao': ctx['indice'].selecionar(IDADE_BENCHMARK, FILTROS_BENCHMARK)}
+
+def etapa_uso_grupos(ctx):
+    return {'df_tech': calcular_uso_tecnologias(ctx['matriz'], ctx['tech_columns'], ctx['selecao'], True)}
+
+def etapa_uso_individual(ctx):
+    calcular_uso_tecnologias(ctx['matriz'], ctx['tech_columns'], ctx['selecao'], False)
+    return {}
+
+def etapa_categorias(ctx):
+    categorizar_tecnologias(ctx['df_tech'])
+    return {}
+
+def etapa_tabelas_cruzadas(ctx):
+    techs = ctx['df_tech'].nlargest(10, 'Uso (%)')['Tecnologia'].tolist()
+    for variavel in COLUNAS_INDEXADAS:
+        if variavel in ctx['indice'].bitmaps:
+            tabela = calcular_tabela_cruzada(ctx['matriz'], ctx['indice'], variavel, ctx['selecao'])
+            calcular_comparacao(tabela, techs, variavel)
+    return {}
+
+def etapa_coocorrencia(ctx):
+    coocorrencia = calcular_coocorrencia(ctx['matriz'], ctx['selecao'])
+    coocorrencia.pares_principais('phi', nomes=ctx['df_tech']['Tecnologia'].tolist(), top=15, min_usuarios=10)
+    return {}
+
+def etapa_intervalos(ctx):
+    intervalos_uso(ctx['matriz'], ctx['selecao'])
+    intervalos_cruzada(ctx['matriz'], ctx['indice'], 'regiao', ctx['selecao'])
+    return {}
+
+def etapa_testes(ctx):
+    for variavel in ('Gênero', 'regiao', 'Nível de Ensino'):
+        if variavel in ctx['indice'].bitmaps:
+            testar_associacao(calcular_tabela_cruzada(ctx['matriz'], ctx['indice'], variavel, ctx['selecao']))
+    return {}
+
+def etapa_coortes(ctx):
+    comparar_coortes(ctx['matriz'], ctx['selecao'], complemento(ctx['matriz'], ctx['selecao']))
+    return {}
+
+def agregar_incremental(agregador, ctx, filtros):
+    agregador.uso(ctx['tech_columns'], IDADE_BENCHMARK, filtros)
+    agregador.coocorrencia(IDADE_BENCHMARK, filtros)
+    agregador.tabela_cruzada('regiao', IDADE_BENCHMARK, filtros)
+
+def etapa_incremental_base(ctx):
+    agregador = AgregadorIncremental(ctx['matriz'], ctx['indice'])
+    agregar_incremental(agregador, ctx, FILTROS_BENCHMARK)
+    ufs = [uf for uf in ctx['indice'].valores('UF') if uf not in FILTROS_BENCHMARK['UF']]
+    return {'agregador': agregador, 'ufs_incluidas': itertools.cycle(ufs)}
+
+def etapa_incremental_delta(ctx):
+    # Uma UF diferente a cada execução: só a parcial dela é calculada
+    filtros = {**FILTROS_BENCHMARK, 'UF': [*FILTROS_BENCHMARK['UF'], next(ctx['ufs_incluidas'])]}
+    agregar_incremental(ctx['agregador'], ctx, filtros)
+    return {}
+
+def etapa_ponderacao(ctx):
+    estratos = Estratos(ctx['indice'])
+    pesos, _ = ponderar(estratos, ctx['selecao'])
+    calcular_uso_tecnologias(ctx['matriz'], ctx['tech_columns'], ctx['selecao'], True, pesos)
+    calcular_tabela_cruzada(ctx['matriz'], ctx['indice'], 'regiao', ctx['selecao'], pesos)
+    return {}
+
+ETAPAS = [
+    ('leitura_csv', etapa_leitura),
+    ('processamento', etapa_processamento),
+    ('matriz_bits', etapa_matriz),
+    ('indice_filtros', etapa_indice),
+    ('filtros', etapa_filtros),
+    ('uso_grupos', etapa_uso_grupos),
+    ('uso_individual', etapa_uso_individual),
+    ('categorias', etapa_categorias),
+    ('tabelas_cruzadas', etapa_tabelas_cruzadas),
+    ('coocorrencia', etapa_coocorrencia),
+    ('bootstrap', etapa_intervalos),
+    ('testes', etapa_testes),
+    ('coortes', etapa_coortes),
+    ('incremental_base', etapa_incremental_base),
+    ('incremental_delta', etapa_incremental_delta),
+    ('ponderacao', etapa_ponderacao),
+]
+
+# ============================================================================
+# MEDIÇÃO
+# ============================================================================
+def rss_maximo_mb():
+    """Pico de memória residente do processo até agora (ru_maxrss: KB no Linux, bytes no macOS)"""
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / 1024 ** 2 if sys.platform == 'darwin' else maximo / 1024
+
+def memoria_processo_mb(campo):
+    """Campo de /proc/self/status (VmRSS, VmHWM) em MB; None fora do Linux"""
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith(f"{campo}:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def liberar_memoria_livre():
+    """Devolve ao sistema a memória livre do heap do malloc e do pool do Arrow"""
+    pa.default_memory_pool().release_unused()
+    try:
+        ctypes.CDLL(None).malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+def pico_rss_etapa_mb(funcao, ctx):
+    """
+    Pico de memória residente da etapa sozinha, inclusive os buffers do
+    Arrow que o tracemalloc não vê. A etapa roda em um processo filho
+    (fork) que devolve a memória livre herdada e zera o pico (clear_refs):
+    o aumento de VmHWM sobre VmRSS no início é só dela (mais alguns MB de
+    páginas herdadas copiadas na escrita). None fora do Linux.
+    """
+    if not hasattr(os, 'fork') or memoria_processo_mb('VmHWM') is None:
+        return None
+    leitura, escrita = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(leitura)
+            liberar_memoria_livre()
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+            inicio = memoria_processo_mb('VmRSS')
+            funcao(ctx)
+            os.write(escrita, f"{memoria_processo_mb('VmHWM') - inicio:.3f}".encode())
+        finally:
+            os._exit(0)
+    os.close(escrita)
+    with os.fdopen(leitura) as f:
+        texto = f.read()
+    os.waitpid(pid, 0)
+    return round(float(texto), 1) if texto else None
+
+def medir_etapa(funcao, ctx, repeticoes):
+    """Tempos de `repeticoes` execuções e picos de memória de execuções extras"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(ctx)
+        tempos.append(time.perf_counter() - inicio)
+    
+    tracemalloc.start()
+    try:
+        funcao(ctx)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    medicao = {
+        'tempos_s': [round(t, 6) for t in tempos],
+        'mediana_s': round(statistics.median(tempos), 6),
+        'minimo_s': round(min(tempos), 6),
+        'pico_memoria_mb': round(pico / 1024 ** 2, 3),
+        'pico_rss_etapa_mb': pico_rss_etapa_mb(funcao, ctx),
+        # Pico do processo até aqui (acumulado entre as etapas)
+        'rss_maximo_mb': round(rss_maximo_mb(), 1),
+    }
+    return resultado, medicao
+
+def medir_escala(fator, diretorio, repeticoes=3, semente=0, caminho_modelo=CAMINHO_CSV_LOCAL,
+                 progresso=None):
+    """Gera a pesquisa sintética da escala e mede todas as etapas sobre ela"""
+    caminho = os.path.join(diretorio, f"sintetico_{fator}x.csv")
+    inicio = time.perf_counter()
+    linhas = gerar_pesquisa_sintetica(caminho, fator, semente, caminho_modelo)
+    geracao = time.perf_counter() - inicio
+    
+    ctx = {'csv': caminho}
+    etapas = {}
+    for nome, funcao in ETAPAS:
+        resultado, etapas[nome] = medir_etapa(funcao, ctx, repeticoes)
+        ctx.update(resultado)
+        if progresso:
+            progresso(f"{fator:>5}x  {nome:<18} {etapas[nome]['mediana_s'] * 1000:10.1f} ms  "
+                      f"{etapas[nome]['pico_memoria_mb']:9.1f} MB  "
+                      f"{etapas[nome]['pico_rss_etapa_mb'] or 0:9.1f} MB RSS")
+    
+    return {
+        'fator': fator,
+        'linhas': linhas,
+        'colunas_tecnologia': len(ctx['tech_columns']),
+        'selecionados': int(ctx['matriz'].total(ctx['selecao'])),
+        'tamanho_csv_mb': round(os.path.getsize(caminho) / 1024 ** 2, 2),
+        'geracao_s': round(geracao, 3),
+        'etapas': etapas,
+    }
+
+def ambiente():
+    return {
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__,
+        'versao_pipeline': VERSAO_PIPELINE,
+    }
+
+def executar_benchmark(escalas=ESCALAS_PADRAO, repeticoes=3, semente=0, diretorio=None,
+                       caminho_modelo=CAMINHO_CSV_LOCAL, progresso=None):
+    """Mede todas as escalas; sem `diretorio`, os CSVs gerados são apagados ao final"""
+    with tempfile.TemporaryDirectory(prefix='sod-benchmark-') as temporario:
+        destino = diretorio or temporario
+        os.makedirs(destino, exist_ok=True)
+        resultados = [
+            medir_escala(fator, destino, repeticoes, semente, caminho_modelo, progresso)
+            for fator in escalas
+        ]
+    return {
+        'versao_formato': VERSAO_FORMATO,
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'ambiente': ambiente(),
+        'linhas_originais': LINHAS_ORIGINAIS,
+        'repeticoes': repeticoes,
+        'semente': semente,
+        'filtros': {'idade': list(IDADE_BENCHMARK), **FILTROS_BENCHMARK},
+        'escalas': resultados,
+    }
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m sod.benchmark',
+        description="Tempo e memória das etapas de carga e agregação em pesquisas sintéticas"
+    )
+    parser.add_argument('--escalas', nargs='+', type=int, default=ESCALAS_PADRAO,
+                        help="múltiplos das 2.645 linhas (padrão: 1 10 100; 1000 gera ~2 GB de CSV)")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--modelo', default=CAMINHO_CSV_LOCAL, help="CSV usado como modelo")
+    parser.add_argument('--diretorio', help="mantém os CSVs gerados neste diretório")
+    parser.add_argument('--saida', help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args(argv)
+    
+    resultado = executar_benchmark(
+        args.escalas, args.repeticoes, args.semente, args.diretorio, args.modelo,
+        progresso=lambda linha: print(linha, file=sys.stderr)
+    )
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Matriz de bits respondente × tecnologia e operações de popcount"""
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# MATRIZ DE BITS RESPONDENTE × TECNOLOGIA
+# ============================================================================
+# Número de bits ligados em cada byte possível (popcount por tabela)
+_POPCOUNT_BYTE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def empacotar_bits(mascara):
+    """
+    Empacota máscaras booleanas em palavras uint64 (o último eixo são os
+    respondentes). O bit i da palavra w corresponde ao respondente 64*w + i.
+    """
+    mascara = np.asarray(mascara, dtype=bool)
+    n_palavras = (mascara.shape[-1] + 63) // 64
+    bytes_ = np.packbits(mascara, axis=-1, bitorder='little')
+    falta = n_palavras * 8 - bytes_.shape[-1]
+    if falta:
+        bytes_ = np.pad(bytes_, [(0, 0)] * (bytes_.ndim - 1) + [(0, falta)])
+    return np.ascontiguousarray(bytes_).view(np.uint64)
+
+def desempacotar_bits(palavras, n_linhas):
+    """Operação inversa de empacotar_bits: devolve a máscara booleana"""
+    bytes_ = np.ascontiguousarray(palavras).view(np.uint8)
+    return np.unpackbits(bytes_, axis=-1, count=n_linhas, bitorder='little').astype(bool)
+
+def bits_das_linhas(palavras, linhas):
+    """
+    Bits dos respondentes nas posições `linhas` (último eixo), lidos direto
+    das palavras: o custo depende do número de posições, não de respondentes
+    """
+    linhas = np.asarray(linhas, dtype=np.int64)
+    deslocamento = (linhas & 63).astype(np.uint64)
+    return ((palavras[..., linhas >> 6] >> deslocamento) & np.uint64(1)).astype(bool)
+
+def pesos_selecionados(pesos, selecao, n_linhas):
+    """Pesos (um por respondente) dos respondentes da seleção, na ordem das linhas"""
+    pesos = np.asarray(pesos, dtype=np.float32)
+    return pesos if selecao is None else pesos[desempacotar_bits(selecao, n_linhas)]
+
+def somas_ponderadas(palavras, n_linhas, pesos, selecao=None):
+    """Soma dos pesos dos respondentes com o bit ligado, por linha de palavras"""
+    if selecao is not None:
+        palavras = palavras & selecao
+    return desempacotar_bits(palavras, n_linhas).astype(np.float32) @ np.asarray(pesos, dtype=np.float32)
+
+def popcount(palavras):
+    """Conta os bits ligados ao longo do último eixo"""
+    palavras = np.ascontiguousarray(palavras)
+    bytes_ = palavras.view(np.uint8).reshape(palavras.shape[:-1] + (-1,))
+    return _POPCOUNT_BYTE[bytes_].sum(axis=-1, dtype=np.int64)
+
+class TechMatrix:
+    """
+    Colunas binárias de tecnologia guardadas como bits: uma linha de palavras
+    uint64 por tecnologia, cobrindo todos os respondentes. Seleções de linhas
+    (filtros) usam o mesmo formato, e toda contagem é um AND + popcount.
+    """
+    
+    def __init__(self, palavras, colunas, n_linhas):
+        self.palavras = palavras
+        self.colunas = list(colunas)
+        self.posicao = {col: i for i, col in enumerate(self.colunas)}
+        self.n_linhas = n_linhas
+    
+    @classmethod
+    def de_dataframe(cls, df, tech_columns):
+        """Constrói a matriz a partir das colunas 0/1 já binarizadas"""
+        colunas = [
+            col for col in tech_columns
+            if col in df.columns and pd.api.types.is_numeric_dtype(df[col])
+        ]
+        bloco = df[colunas].to_numpy() == 1
+        return cls(empacotar_bits(bloco.T), colunas, len(df))
+    
+    @property
+    def nbytes(self):
+        return self.palavras.nbytes
+    
+    def selecao_total(self):
+        """Seleção com todos os respondentes"""
+        return empacotar_bits(np.ones(self.n_linhas, dtype=bool))
+    
+    def selecao_de_mascara(self, mascara):
+        """Converte uma máscara booleana de respondentes em seleção"""
+        return empacotar_bits(mascara)
+    
+    def selecao_de_indices(self, indices):
+        """Converte posições de respondentes (ex.: df_filtrado.index) em seleção"""
+        mascara = np.zeros(self.n_linhas, dtype=bool)
+        mascara[np.asarray(indices, dtype=np.int64)] = True
+        return empacotar_bits(mascara)
+    
+    def total(self, selecao=None, pesos=None):
+        """Número de respondentes na seleção (ou a soma dos seus pesos)"""
+        if pesos is not None:
+            return float(pesos_selecionados(pesos, selecao, self.n_linhas).sum(dtype=np.float64))
+        return self.n_linhas if selecao is None else int(popcount(selecao))
+    
+    def contagens(self, selecao=None, pesos=None):
+        """Usuários de cada tecnologia (na ordem de self.colunas), ou a soma dos seus pesos"""
+        if pesos is not None:
+            return somas_ponderadas(self.palavras, self.n_linhas, pesos, selecao)
+        if selecao is None:
+            return popcount(self.palavras)
+        return popcount(self.palavras & selecao)
+    
+    def contagem(self, coluna, selecao=None):
+        """Usuários de uma tecnologia"""
+        linha = self.palavras[self.posicao[coluna]]
+        return int(popcount(linha if selecao is None else linha & selecao))
+    
+    def contagem_qualquer(self, colunas, selecao=None):
+        """Respondentes que usam pelo menos uma das tecnologias"""
+        linhas = [self.posicao[col] for col in colunas if col in self.posicao]
+        if not linhas:
+            return 0
+        uniao = np.bitwise_or.reduce(self.palavras[linhas], axis=0)
+        return int(popcount(uniao if selecao is None else uniao & selecao))
+    
+    def desempacotar(self, selecao=None):
+        """Bloco denso (respondentes selecionados × tecnologias) em uint8"""
+        bloco = desempacotar_bits(self.palavras, self.n_linhas).T
+        if selecao is not None:
+            bloco = bloco[desempacotar_bits(selecao, self.n_linhas)]
+        return bloco.astype(np.uint8)
@@ -0,0 +1,191 @@
+"""
+Intervalos de confiança por bootstrap, vetorizados.
+
+Cada reamostragem é uma linha de pesos Poisson(1) sobre os respondentes
+da seleção (o bootstrap de Poisson, que aproxima o multinomial e dispensa
+sortear índices). As estimativas de todas as reamostragens saem de um
+produto pesos × bloco binário (respondentes × tecnologias e grupos), em
+lotes que limitam a memória dos pesos; os intervalos são os percentis
+dessas estimativas. A semente é fixa: a mesma seleção dá sempre os
+mesmos intervalos. Com ponderação, os pesos Poisson multiplicam os pesos
+dos respondentes (sem refazer o raking em cada reamostragem).
+"""
+import math
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .bits import desempacotar_bits, pesos_selecionados
+from .cruzadas import bloco_com_grupos
+
+REAMOSTRAGENS = 2000
+NIVEL = 0.95
+SEMENTE = 0
+# Memória máxima de um lote de pesos (float32)
+LIMITE_LOTE_BYTES = 32 * 1024 ** 2
+
+# Pesos Poisson(1) por tabela: um inteiro uniforme de 16 bits indexa a
+# inversa da distribuição acumulada (erro < 2e-5 em cada probabilidade,
+# cauda a partir de 8 somada no 8). Bem mais rápido que rng.poisson.
+_ACUMULADA_POISSON = np.cumsum([math.exp(-1) / math.factorial(k) for k in range(9)])
+_TABELA_POISSON = np.minimum(
+    np.searchsorted(np.floor(_ACUMULADA_POISSON * 65536), np.arange(65536), side='right'), 8
+).astype(np.float32)
+
+def lotes_pesos(n, reamostragens=REAMOSTRAGENS, semente=SEMENTE, limite_bytes=LIMITE_LOTE_BYTES):
+    """Pesos Poisson(1) (reamostragens × n, float32), em lotes de até `limite_bytes`"""
+    rng = np.random.default_rng(semente)
+    por_lote = max(1, min(reamostragens, limite_bytes // max(4 * n, 1)))
+    for inicio in range(0, reamostragens, por_lote):
+        tamanho = min(por_lote, reamostragens - inicio)
+        yield _TABELA_POISSON[rng.integers(0, 65536, size=(tamanho, n), dtype=np.uint16)]
+
+def reamostrar(bloco, estatistica, reamostragens=REAMOSTRAGENS, semente=SEMENTE, pesos_linhas=None):
+    """
+    Estimativas de todas as reamostragens: `estatistica(somas, totais)`
+    recebe as somas ponderadas de cada coluna do bloco (lote × colunas) e
+    o peso total de cada reamostragem. Retorna (reamostragens, ...).
+    """
+    bloco = bloco.astype(np.float32)
+    partes = []
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for pesos in lotes_pesos(len(bloco), reamostragens, semente):
+            if pesos_linhas is not None:
+                pesos *= pesos_linhas
+            partes.append(estatistica(pesos @ bloco, pesos.sum(axis=1)))
+    return np.concatenate(partes)
+
+def percentis(estimativas, nivel=NIVEL):
+    """Limites (inferior, superior) do intervalo de percentis ao longo do primeiro eixo"""
+    alfa = (1 - nivel) / 2 * 100
+    # Reamostragens sem ninguém (seleções minúsculas) dão NaN
+    calcular = np.nanpercentile if np.isnan(estimativas).any() else np.percentile
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        inferior, superior = calcular(estimativas, [alfa, 100 - alfa], axis=0)
+    return inferior, superior
+
+def proporcoes(somas, totais):
+    return somas / totais[:, None] * 100
+
+# ============================================================================
+# INTERVALOS DO USO, DAS TABELAS CRUZADAS E DA CORRELAÇÃO
+# ============================================================================
+def intervalos_uso(matriz, selecao=None, reamostragens=REAMOSTRAGENS, nivel=NIVEL, semente=SEMENTE,
+                   pesos=None):
+    """
+    Intervalo do uso (%) de todas as tecnologias e grupos da seleção, com
+    os nomes da coluna 'Tecnologia' das tabelas de uso (com ou sem grupos)
+    """
+    bloco, nomes = bloco_com_grupos(matriz, selecao)
+    if pesos is not None:
+        pesos = pesos_selecionados(pesos, selecao, matriz.n_linhas)
+    inferior, superior = percentis(reamostrar(bloco, proporcoes, reamostragens, semente, pesos), nivel)
+    intervalos = pd.DataFrame(
+        {'IC inferior (%)': inferior, 'IC superior (%)': superior},
+        index=pd.Index(nomes, name='Tecnologia')
+    )
+    return intervalos[~intervalos.index.duplicated()]
+
+class IntervalosCruzada:
+    """Limites do uso (%) de cada tecnologia e grupo por valor de uma variável (layout de TabelaCruzada)"""
+    
+    def __init__(self, variavel, valores, tamanhos, inferior, superior, colunas):
+        self.variavel = variavel
+        self.valores = list(valores)
+        self.tamanhos = tamanhos
+        self.inferior = inferior
+        self.superior = superior
+        self.colunas = list(colunas)
+        self.posicao = {col: i for i, col in enumerate(self.colunas)}
+    
+    @property
+    def nbytes(self):
+        return self.tamanhos.nbytes + self.inferior.nbytes + self.superior.nbytes
+    
+    def limites(self, tecnologias=None, valores=None):
+        """(inferior, superior) como DataFrames iguais aos de TabelaCruzada.uso"""
+        linhas = [
+            i for i, v in enumerate(self.valores)
+            if self.tamanhos[i] > 0 and (valores is None or v in valores)
+        ]
+        tecnologias = self.colunas if tecnologias is None else [t for t in tecnologias if t in self.posicao]
+        colunas = [self.posicao[t] for t in tecnologias]
+        
+        def tabela(limite):
+            return pd.DataFrame(
+                limite[np.ix_(linhas, colunas)].T,
+                index=pd.Index(tecnologias, name='Tecnologia'),
+                columns=pd.Index([self.valores[i] for i in linhas], name=self.variavel)
+            )
+        
+        return tabela(self.inferior), tabela(self.superior)
+
+def intervalos_cruzada(matriz, indice, variavel, selecao=None, reamostragens=REAMOSTRAGENS,
+                       nivel=NIVEL, semente=SEMENTE, pesos=None):
+    """
+    Intervalos da tabela cruzada. Os valores da variável são disjuntos:
+    cada um reamostra só as suas linhas, e o custo total é o de um único
+    produto sobre a seleção.
+    """
+    valores = indice.valores(variavel)
+    bloco, nomes = bloco_com_grupos(matriz, selecao)
+    selecionados = None if selecao is None else desempacotar_bits(selecao, indice.n_linhas)
+    if pesos is not None:
+        pesos = pesos_selecionados(pesos, selecao, indice.n_linhas)
+    inferior = np.full((len(valores), len(nomes)), np.nan)
+    superior = np.full((len(valores), len(nomes)), np.nan)
+    tamanhos = np.zeros(len(valores), dtype=np.int64)
+    
+    for k, valor in enumerate(valores):
+        linhas = desempacotar_bits(indice.bitmap(variavel, valor), indice.n_linhas)
+        if selecionados is not None:
+            linhas = linhas[selecionados]
+        linhas = np.flatnonzero(linhas)
+        tamanhos[k] = len(linhas)
+        if len(linhas):
+            # Semente por valor: o intervalo de um valor não depende dos outros
+            estimativas = reamostrar(
+                bloco[linhas], proporcoes, reamostragens, (semente, k),
+                None if pesos is None else pesos[linhas]
+            )
+            inferior[k], superior[k] = percentis(estimativas, nivel)
+    
+    return IntervalosCruzada(variavel, valores, tamanhos, inferior, superior, nomes)
+
+def intervalos_phi(matriz, nomes, selecao=None, reamostragens=REAMOSTRAGENS, nivel=NIVEL, semente=SEMENTE,
+                   pesos=None):
+    """
+    Intervalos da correlação phi entre as tecnologias `nomes`: o bloco
+    recebe uma coluna com o produto de cada par, e as contagens conjuntas
+    de todas as reamostragens saem do mesmo produto que as marginais.
+    Retorna (inferior, superior) como DataFrames nomes × nomes.
+    """
+    bloco, todos = bloco_com_grupos(matriz, selecao)
+    posicao = {nome: i for i, nome in enumerate(todos)}
+    nomes = [nome for nome in dict.fromkeys(nomes) if nome in posicao]
+    m = len(nomes)
+    bloco = bloco[:, [posicao[nome] for nome in nomes]]
+    i, j = np.triu_indices(m, k=1)
+    estendido = np.concatenate([bloco, bloco[:, i] & bloco[:, j]], axis=1)
+    
+    def phi(somas, totais):
+        # Os produtos passam de 1e10 nas pesquisas grandes: fora do alcance
+        # do float32 (~7 dígitos), então a fórmula roda em float64
+        somas = somas.astype(np.float64)
+        ni, nj, nij = somas[:, i], somas[:, j], somas[:, m:]
+        n = totais.astype(np.float64)[:, None]
+        return (n * nij - ni * nj) / np.sqrt(ni * (n - ni) * nj * (n - nj))
+    
+    if pesos is not None:
+        pesos = pesos_selecionados(pesos, selecao, matriz.n_linhas)
+    inferior_pares, superior_pares = percentis(reamostrar(estendido, phi, reamostragens, semente, pesos), nivel)
+    inferior = np.eye(m)
+    superior = np.eye(m)
+    inferior[i, j] = inferior[j, i] = inferior_pares
+    superior[i, j] = superior[j, i] = superior_pares
+    return (
+        pd.DataFrame(inferior, index=nomes, columns=nomes),
+        pd.DataFrame(superior, index=nomes, columns=nomes),
+    )
@@ -0,0 +1,283 @@
+"""Cache LRU de resultados compartilhado entre sessões"""
+import hashlib
+import os
+import pickle
+import shutil
+import sys
+import threading
+import types
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .registro import logger
+
+# ============================================================================
+# CACHE DE RESULTADOS COMPARTILHADO ENTRE SESSÕES
+# ============================================================================
+# Limites das camadas em memória e em disco, e diretório opcional da
+# camada em disco
+CACHE_LIMITE_MB = float(os.environ.get('SOD_CACHE_MB', '128'))
+CACHE_DISCO_LIMITE_MB = float(os.environ.get('SOD_CACHE_DISCO_MB', '512'))
+DIRETORIO_CACHE_DISCO = os.environ.get('SOD_CACHE_DIR')
+# Ao passar do limite, o disco é podado até esta fração dele (os arquivos
+# menos usados saem primeiro), para não varrer o diretório a cada gravação
+FRACAO_APOS_PODA = 0.8
+PREFIXO_VERSAO = 'dados_'
+# Código e classes são compartilhados, não pertencem ao resultado
+CODIGO = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+def tamanho_aproximado(valor):
+    """
+    Estimativa, em bytes, da memória ocupada por um resultado: arrays pelo
+    nbytes, DataFrames, Series e índices com o texto das colunas object
+    (memory_usage deep), e contêineres e atributos de objetos percorridos,
+    cada objeto contado uma vez
+    """
+    total = 0
+    # Referências mantidas: um id só é reaproveitado depois que o objeto sai
+    vistos = {}
+    pendentes = [valor]
+    while pendentes:
+        item = pendentes.pop()
+        if id(item) in vistos or isinstance(item, CODIGO):
+            continue
+        vistos[id(item)] = item
+        if isinstance(item, np.ndarray):
+            total += item.nbytes
+            if item.dtype == object:
+                pendentes.extend(item.ravel().tolist())
+        elif isinstance(item, pd.Index):
+            total += item.memory_usage(deep=True)
+        elif isinstance(item, (pd.DataFrame, pd.Series)):
+            total += int(np.sum(item.memory_usage(index=True, deep=True)))
+            pendentes.append(item.attrs)
+        elif isinstance(item, dict):
+            total += sys.getsizeof(item)
+            pendentes.extend(item.keys())
+            pendentes.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            total += sys.getsizeof(item)
+            pendentes.extend(item)
+        elif isinstance(item, (str, bytes, int, float, complex, bool, type(None))):
+            total += sys.getsizeof(item)
+        elif hasattr(item, '__dict__'):
+            total += sys.getsizeof(item)
+            pendentes.append(vars(item))
+        elif hasattr(item, 'nbytes'):
+            total += int(item.nbytes)
+        else:
+            total += sys.getsizeof(item)
+    return int(total)
+
+class CacheResultados:
+    """
+    Cache LRU de resultados de agregações, limitado em bytes e seguro para
+    uso simultâneo por várias sessões. Com um diretório configurado, cada
+    resultado também é gravado em disco e sobrevive a reinícios; a camada
+    em disco tem o próprio limite em bytes (os arquivos com acesso mais
+    antigo saem primeiro) e guarda só a versão dos dados `versao`: os
+    arquivos de outras versões são apagados ao criar o cache. Resultados
+    fixados (ex.: os pré-calculados do estado padrão) nunca são descartados.
+    """
+    
+    _AUSENTE = object()
+    
+    def __init__(self, limite_bytes, diretorio=None, versao=None, limite_disco_bytes=None):
+        self.limite_bytes = limite_bytes
+        self.diretorio = None
+        self._itens = OrderedDict()
+        self._fixos = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        if limite_disco_bytes is None:
+            limite_disco_bytes = int(CACHE_DISCO_LIMITE_MB * 1024 * 1024)
+        self.limite_disco_bytes = limite_disco_bytes
+        self._bytes_disco = 0
+        if diretorio:
+            self.diretorio = os.path.join(diretorio, f"{PREFIXO_VERSAO}{versao or 'sem_versao'}")
+            os.makedirs(self.diretorio, exist_ok=True)
+            remover_outras_versoes(diretorio, self.diretorio)
+            self._bytes_disco = sum(tamanho for _, tamanho, _ in arquivos_cache(self.diretorio))
+    
+    def _caminho(self, chave):
+        nome = hashlib.sha256(repr(chave).encode('utf-8')).hexdigest()
+        return os.path.join(self.diretorio, f"{nome}.pkl")
+    
+    def _guardar_memoria(self, chave, valor):
+        tamanho = tamanho_aproximado(valor)
+        if tamanho > self.limite_bytes:
+            return
+        with self._lock:
+            if chave in self._itens:
+                self._bytes -= self._itens.pop(chave)[1]
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.limite_bytes:
+                _, (_, tamanho_removido) = self._itens.popitem(last=False)
+                self._bytes -= tamanho_removido
+    
+    def fixar(self, chave, valor):
+        """Guarda um resultado fora do limite de bytes e do LRU"""
+        with self._lock:
+            self._fixos[chave] = valor
+    
+    def _buscar(self, chave):
+        """Retorna (origem, valor): origem 'fixo', 'memoria', 'disco' ou None (ausente)"""
+        with self._lock:
+            if chave in self._fixos:
+                self.acertos += 1
+                return 'fixo', self._fixos[chave]
+            item = self._itens.get(chave, self._AUSENTE)
+            if item is not self._AUSENTE:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return 'memoria', item[0]
+        
+        if self.diretorio:
+            valor = self._ler_disco(chave)
+            if valor is not self._AUSENTE:
+                self._guardar_memoria(chave, valor)
+                with self._lock:
+                    self.acertos_disco += 1
+                return 'disco', valor
+        
+        with self._lock:
+            self.falhas += 1
+        return None, self._AUSENTE
+    
+    def _ler_disco(self, chave):
+        """Valor gravado para a chave; arquivo ausente, de outra chave ou ilegível é uma falha"""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                chave_salva, valor = pickle.load(f)
+        except FileNotFoundError:
+            return self._AUSENTE
+        except Exception:
+            # Truncado, corrompido ou de classes que mudaram: regravado no próximo cálculo
+            remover(caminho)
+            return self._AUSENTE
+        if chave_salva != chave:
+            return self._AUSENTE
+        # mtime marca o último acesso (a poda remove os mais antigos)
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return valor
+    
+    def obter(self, chave, padrao=None):
+        origem, valor = self._buscar(chave)
+        return padrao if origem is None else valor
+    
+    def guardar(self, chave, valor):
+        self._guardar_memoria(chave, valor)
+        if self.diretorio:
+            self._gravar_disco(chave, valor)
+    
+    def _gravar_disco(self, chave, valor):
+        """Grava o resultado (falhas, inclusive de pickle, só vão para o log) e poda o diretório"""
+        caminho = self._caminho(chave)
+        caminho_tmp = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            with open(caminho_tmp, 'wb') as f:
+                pickle.dump((chave, valor), f, protocol=pickle.HIGHEST_PROTOCOL)
+            tamanho = os.path.getsize(caminho_tmp)
+            if tamanho > self.limite_disco_bytes:
+                return
+            os.replace(caminho_tmp, caminho)
+        except Exception as e:
+            logger.warning("Resultado não gravado no cache em disco (%s): %s", repr(chave)[:80], e)
+            return
+        finally:
+            remover(caminho_tmp)
+        with self._lock:
+            self._bytes_disco += tamanho
+            podar = self._bytes_disco > self.limite_disco_bytes
+        if podar:
+            self.podar_disco()
+    
+    def podar_disco(self):
+        """Remove os arquivos com acesso mais antigo até FRACAO_APOS_PODA do limite"""
+        arquivos = sorted(arquivos_cache(self.diretorio), key=lambda arquivo: arquivo[2])
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        alvo = self.limite_disco_bytes * FRACAO_APOS_PODA
+        for caminho, tamanho, _ in arquivos:
+            if total <= alvo:
+                break
+            if remover(caminho):
+                total -= tamanho
+        with self._lock:
+            self._bytes_disco = total
+    
+    def obter_ou_calcular(self, chave, calcular, medicao=None):
+        """
+        Retorna o resultado em cache ou calcula, guarda e retorna. Com
+        `medicao` (dict de sod.instrumentacao), anota a origem do resultado.
+        """
+        origem, valor = self._buscar(chave)
+        if origem is None:
+            valor = calcular()
+            self.guardar(chave, valor)
+        if medicao is not None:
+            medicao['cache'] = origem or 'falha'
+        return valor
+    
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'itens': len(self._itens),
+                'fixos': len(self._fixos),
+                'bytes': self._bytes,
+                'acertos': self.acertos,
+                'acertos_disco': self.acertos_disco,
+                'falhas': self.falhas,
+                'bytes_disco': self._bytes_disco
+            }
+
+def arquivos_cache(diretorio):
+    """(caminho, bytes, mtime) dos resultados gravados no diretório"""
+    arquivos = []
+    try:
+        entradas = list(os.scandir(diretorio))
+    except OSError:
+        return arquivos
+    for entrada in entradas:
+        if not entrada.name.endswith('.pkl'):
+            continue
+        try:
+            info = entrada.stat()
+        except OSError:
+            continue
+        arquivos.append((entrada.path, info.st_size, info.st_mtime))
+    return arquivos
+
+def remover_outras_versoes(raiz, atual):
+    """
+    Apaga os resultados de outras versões dos dados (e os do formato antigo,
+    gravados direto na raiz); outro processo ainda na versão anterior só
+    perde acertos e volta a gravar o que calcular
+    """
+    try:
+        entradas = list(os.scandir(raiz))
+    except OSError:
+        return
+    for entrada in entradas:
+        if entrada.is_dir() and entrada.name.startswith(PREFIXO_VERSAO) and entrada.path != atual:
+            shutil.rmtree(entrada.path, ignore_errors=True)
+        elif entrada.is_file() and entrada.name.endswith(('.pkl', '.tmp')):
+            remover(entrada.path)
+
+def remover(caminho):
+    """Remove o arquivo se existir; True se removeu"""
+    try:
+        os.remove(caminho)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,220 @@
+"""Carregamento do dataset: arrays compartilhados, snapshot ou CSV (GitHub ou local)"""
+import os
+import threading
+
+from .armazenamento import (
+    CAMINHO_CSV_LOCAL, COMPARTILHADO_ATIVO, SNAPSHOT_ATIVO,
+    anexar_arrays, carregar_snapshot, hash_arquivo, publicar_arrays, salvar_snapshot
+)
+from .bits import TechMatrix
+from .esquema import PAPEIS_DATASET, ler_csv_com_esquema
+from .filtros import IndiceFiltros
+from .instrumentacao import etapa
+from .limpeza import processar_dataset
+from .registro import registrar
+from .remoto import caminhos_copia, obter_copia
+from .validacao import calcular_impressao, conferir_estrutura, montar_relatorio
+
+class DatasetIndisponivel(RuntimeError):
+    """Nenhuma fonte do dataset pôde ser lida (ou o conteúdo não é o esperado)"""
+
+# ============================================================================
+# FONTE DO DATASET
+# ============================================================================
+GITHUB_URL = "https://raw.githubusercontent.com/Thmeirelles/tecnologiastateofdatabrazil/main/State%20of%20Data%20Brazil%202021.csv"
+# Desative com SOD_REMOTO=0 para usar só o CSV do projeto (sem rede)
+REMOTO_ATIVO = os.environ.get('SOD_REMOTO', '1') != '0'
+
+def resolver_fonte(caminho_csv=None, revalidar=True, mensagens=None):
+    """
+    Arquivo CSV a ser lido: `caminho_csv`, se informado; senão a cópia
+    local do GitHub (revalidada com o servidor) e, sem rede nem cópia, o
+    CSV do projeto. Retorna None se nenhum existir.
+    """
+    if caminho_csv is not None:
+        return caminho_csv if os.path.exists(caminho_csv) else None
+    if REMOTO_ATIVO:
+        caminho, _ = obter_copia(GITHUB_URL, revalidar=revalidar, mensagens=mensagens)
+        if caminho is not None:
+            return caminho
+    if os.path.exists(CAMINHO_CSV_LOCAL):
+        registrar(mensagens, 'info', "📂 Usando o CSV do projeto")
+        return CAMINHO_CSV_LOCAL
+    return None
+
+def copia_remota_disponivel():
+    """Há cópia local do CSV do GitHub (dá para carregar sem esperar a rede)"""
+    return REMOTO_ATIVO and os.path.exists(caminhos_copia(GITHUB_URL)[0])
+
+def iniciar_revalidacao():
+    """
+    Revalida a cópia do GitHub em uma thread daemon. Uma versão nova
+    substitui a cópia em disco e vale a partir da próxima carga; a carga
+    atual segue com os dados que já leu.
+    """
+    def revalidar():
+        _, situacao = obter_copia(GITHUB_URL, revalidar=True)
+        if situacao == 'baixada':
+            registrar(None, 'info', "📥 Nova versão do dataset baixada; será usada na próxima carga")
+    thread = threading.Thread(target=revalidar, name='sod-revalidacao', daemon=True)
+    thread.start()
+    return thread
+
+# ============================================================================
+# CARREGAMENTO COMPLETO
+# ============================================================================
+def publicar_dataset(processed_df, tech_columns, matriz, indice, hash_fonte, validacao, mensagens=None):
+    """Publica os arrays para as outras réplicas; falhas não impedem o carregamento"""
+    try:
+        caminho = publicar_arrays(processed_df, tech_columns, matriz, indice, hash_fonte, validacao)
+        registrar(
+            mensagens, 'success',
+            f"🔗 Arrays publicados para outras réplicas "
+            f"({os.path.getsize(caminho) / 1024:.0f} KB)"
+        )
+    except Exception as e:
+        registrar(mensagens, 'warning', f"⚠️ Não foi possível publicar os arrays: {str(e)[:50]}")
+
+def somente_leitura(matriz, indice):
+    """Impede escrita nos arrays compartilhados entre as sessões"""
+    matriz.palavras.flags.writeable = False
+    for array in [indice.prefixos_idade if indice.idade is not None else None,
+                  indice.idade,
+                  *(bits for mapa in indice.bitmaps.values() for bits in mapa.values())]:
+        if array is not None:
+            array.flags.writeable = False
+
+def registrar_validacao(validacao, destino, mensagens=None):
+    """Versão dos dados (id da impressão digital) e avisos da validação"""
+    for aviso in validacao['relatorio']['avisos']:
+        registrar(mensagens, 'warning', f"⚠️ Validação: {aviso}")
+    if destino is not None:
+        destino.update(validacao)
+    return validacao['impressao']['id']
+
+def carregar_dataset(caminho_csv=None, usar_snapshot=SNAPSHOT_ATIVO,
+                     usar_compartilhado=COMPARTILHADO_ATIVO, mensagens=None, medidor=None,
+                     validacao=None, revalidar_em_segundo_plano=True):
+    """
+    Carrega o dataset completo (2.645 linhas): dos arrays publicados por
+    outro processo, do snapshot processado ou do CSV (ver resolver_fonte).
+    Retorna (processed_df, tech_columns, matriz, indice), com os arrays
+    somente leitura para poderem ser compartilhados sem cópia.
+    Levanta DatasetIndisponivel se não houver fonte utilizável ou se a
+    validação encontrar erros. Com `medidor` (sod.instrumentacao), cada
+    etapa da carga é medida; se `validacao` for um dict, recebe a
+    impressão digital e o relatório de validação (sod.validacao).
+    Com cópia local do GitHub, a carga não espera a rede: a cópia é
+    usada como está e revalidada em segundo plano depois da carga
+    (`revalidar_em_segundo_plano=False` revalida antes, ex.: na CLI).
+    """
+    adiar = caminho_csv is None and revalidar_em_segundo_plano and copia_remota_disponivel()
+    with etapa(medidor, 'carga.fonte'):
+        caminho_csv = resolver_fonte(caminho_csv, revalidar=not adiar, mensagens=mensagens)
+    if caminho_csv is None:
+        raise DatasetIndisponivel("Não foi possível carregar o dataset")
+    try:
+        return carregar_arquivo(caminho_csv, usar_snapshot, usar_compartilhado, mensagens, medidor, validacao)
+    finally:
+        # Depois da carga: o arquivo não muda enquanto é lido, e uma cópia
+        # inválida também é renovada
+        if adiar:
+            iniciar_revalidacao()
+
+def carregar_arquivo(caminho_csv, usar_snapshot, usar_compartilhado, mensagens=None, medidor=None,
+                     validacao=None):
+    """Carrega o dataset de `caminho_csv` (ver carregar_dataset)"""
+    with etapa(medidor, 'carga.hash_fonte'):
+        hash_fonte = hash_arquivo(caminho_csv)
+    
+    # Arrays já publicados por outra réplica nesta máquina
+    if usar_compartilhado:
+        with etapa(medidor, 'carga.anexar_compartilhado'):
+            anexado = anexar_arrays(hash_fonte)
+        if anexado is not None:
+            processed_df, tech_columns, matriz, indice, validacao_anexada = anexado
+            if conferir_estrutura(validacao_anexada['impressao'], processed_df, tech_columns, matriz.n_linhas):
+                processed_df.attrs['versao_dados'] = registrar_validacao(validacao_anexada, validacao, mensagens)
+                registrar(
+                    mensagens, 'success',
+                    f"🔗 Dataset compartilhado anexado: {matriz.n_linhas} linhas × "
+                    f"{len(tech_columns)} tecnologias"
+                )
+                return processed_df, tech_columns, matriz, indice
+            registrar(mensagens, 'warning', "⚠️ Arrays compartilhados não conferem com a impressão digital")
+    
+    if usar_snapshot:
+        with etapa(medidor, 'carga.snapshot'):
+            snapshot = carregar_snapshot(hash_fonte)
+        if snapshot is not None and conferir_estrutura(snapshot[2]['impressao'], snapshot[0], snapshot[1]):
+            processed_df, tech_columns, validacao_snapshot = snapshot
+            processed_df.attrs['versao_dados'] = registrar_validacao(validacao_snapshot, validacao, mensagens)
+            registrar(
+                mensagens, 'success',
+                f"⚡ Snapshot carregado: {len(processed_df)} linhas × "
+                f"{len(processed_df.columns)} colunas"
+            )
+            with etapa(medidor, 'carga.matriz'):
+                matriz = TechMatrix.de_dataframe(processed_df, tech_columns)
+            with etapa(medidor, 'carga.indice'):
+                indice = IndiceFiltros(processed_df)
+            if usar_compartilhado:
+                with etapa(medidor, 'carga.publicar'):
+                    publicar_dataset(
+                        processed_df, tech_columns, matriz, indice, hash_fonte, validacao_snapshot, mensagens
+                    )
+            somente_leitura(matriz, indice)
+            return processed_df, tech_columns, matriz, indice
+    
+    with etapa(medidor, 'carga.leitura_csv'):
+        df, relatorio_leitura = ler_csv_com_esquema(caminho_csv, papeis=PAPEIS_DATASET)
+    if relatorio_leitura['linhas_descartadas']:
+        registrar(
+            mensagens, 'warning',
+            f"⚠️ {relatorio_leitura['linhas_descartadas']} linhas malformadas descartadas "
+            f"(ex.: {relatorio_leitura['amostra_linhas_descartadas'][:3]})"
+        )
+    
+    registrar(
+        mensagens, 'success',
+        f"🎉 Dataset carregado: {len(df)} linhas × {len(df.columns)} colunas "
+        f"({relatorio_leitura['linhas_descartadas']} descartadas)"
+    )
+    
+    relatorio_tecnologias = {}
+    with etapa(medidor, 'carga.processamento'):
+        processed_df, tech_columns = processar_dataset(df, mensagens, relatorio_tecnologias)
+    
+    # Impressão digital: identifica os dados em todos os caches
+    with etapa(medidor, 'carga.validacao'):
+        impressao = calcular_impressao(processed_df, tech_columns, hash_fonte)
+        validacao_nova = {
+            'impressao': impressao,
+            'relatorio': montar_relatorio(relatorio_leitura, relatorio_tecnologias, impressao),
+        }
+    if validacao_nova['relatorio']['erros']:
+        raise DatasetIndisponivel(f"Dataset inválido: {'; '.join(validacao_nova['relatorio']['erros'])}")
+    processed_df.attrs['versao_dados'] = registrar_validacao(validacao_nova, validacao, mensagens)
+    
+    if usar_snapshot:
+        try:
+            with etapa(medidor, 'carga.salvar_snapshot'):
+                salvar_snapshot(processed_df, tech_columns, hash_fonte, validacao_nova)
+            registrar(mensagens, 'success', "💾 Snapshot salvo para as próximas inicializações")
+        except Exception as e:
+            registrar(mensagens, 'warning', f"⚠️ Não foi possível salvar o snapshot: {str(e)[:50]}")
+    
+    # Estrutura de bits usada por todas as contagens de uso
+    with etapa(medidor, 'carga.matriz'):
+        matriz = TechMatrix.de_dataframe(processed_df, tech_columns)
+    registrar(mensagens, 'success', f"🧮 Matriz de tecnologias: {matriz.nbytes / 1024:.0f} KB em bits")
+    
+    # Bitmaps dos filtros e das variáveis de perfil
+    with etapa(medidor, 'carga.indice'):
+        indice = IndiceFiltros(processed_df)
+    if usar_compartilhado:
+        with etapa(medidor, 'carga.publicar'):
+            publicar_dataset(processed_df, tech_columns, matriz, indice, hash_fonte, validacao_nova, mensagens)
+    somente_leitura(matriz, indice)
+    
+    return processed_df, tech_columns, matriz, indice
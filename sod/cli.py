@@ -0,0 +1,239 @@
+"""
+Linha de comando: as mesmas tabelas do dashboard, em CSV, JSON ou texto.
+
+    python -m sod uso --uf SP RJ --idade 25 40
+    python -m sod uso --senioridade Júnior --intervalos
+    python -m sod uso --uf SP --ponderar --margens margens.json
+    python -m sod comparacao Senioridade --tecnologias Python R --formato json
+    python -m sod pares --metrica lift --saida pares.csv
+    python -m sod testes regiao --correcao holm
+    python -m sod precomputar
+    python -m sod validar
+    python -m sod ponderacao --uf SP
+"""
+import argparse
+import json
+import logging
+import sys
+
+import pandas as pd
+
+from .analise import (
+    calcular_comparacao, calcular_uso_perfil, calcular_uso_tecnologias, categorizar_tecnologias
+)
+from .armazenamento import CAMINHO_CSV_LOCAL
+from .bootstrap import intervalos_uso
+from .carga import DatasetIndisponivel, carregar_dataset
+from .coocorrencia import Coocorrencia, calcular_coocorrencia
+from .cruzadas import calcular_tabela_cruzada
+from .filtros import COLUNAS_INDEXADAS
+from .ponderacao import Estratos, ler_margens, ponderar
+from .testes import CORRECOES, testar_associacao
+from .precomputo import calcular_precomputado, salvar_precomputado
+
+FORMATOS = ('csv', 'json', 'texto')
+
+# Valores comparados por padrão (mesma restrição do dashboard)
+VALORES_COMPARACAO = {'Senioridade': ['Júnior', 'Pleno', 'Sênior']}
+
+def adicionar_filtros(parser):
+    """Opções comuns: filtros da barra lateral e modo de agrupamento"""
+    parser.add_argument('--csv', help="CSV de origem (padrão: cópia do GitHub ou o CSV do projeto)")
+    parser.add_argument('--idade', nargs=2, type=float, metavar=('MIN', 'MAX'), help="faixa de idade")
+    parser.add_argument('--uf', nargs='+', help="UFs (ex.: SP RJ)")
+    parser.add_argument('--senioridade', nargs='+', help="ex.: Júnior Pleno")
+    parser.add_argument('--forma-trabalho', nargs='+', help="formas de trabalho")
+    parser.add_argument('--individual', action='store_true', help="sem agrupar tecnologias")
+    parser.add_argument('--ponderar', action='store_true',
+                        help="pondera os respondentes por raking (padrão: composição da amostra completa)")
+    parser.add_argument('--margens', help="JSON com as margens do raking (padrão: SOD_MARGENS)")
+    parser.add_argument('--formato', choices=FORMATOS, default='texto')
+    parser.add_argument('--saida', help="arquivo de saída (padrão: stdout)")
+
+def montar_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m sod',
+        description="Tabelas de uso de tecnologias do State of Data Brazil 2021"
+    )
+    parser.add_argument('-v', '--verbose', action='store_true', help="mostra o progresso do carregamento")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    
+    uso = comandos.add_parser('uso', help="uso (%%) de cada tecnologia ou grupo")
+    uso.add_argument('--intervalos', action='store_true', help="intervalos de confiança de 95%% (bootstrap)")
+    adicionar_filtros(uso)
+    adicionar_filtros(comandos.add_parser('categorias', help="uso (%%) por categoria de tecnologia"))
+    
+    perfil = comandos.add_parser('perfil', help="uso de uma tecnologia por valor de uma variável")
+    perfil.add_argument('variavel', choices=COLUNAS_INDEXADAS)
+    perfil.add_argument('tecnologia')
+    adicionar_filtros(perfil)
+    
+    comparacao = comandos.add_parser('comparacao', help="tecnologias × valores de uma variável")
+    comparacao.add_argument('variavel', choices=COLUNAS_INDEXADAS)
+    comparacao.add_argument('--tecnologias', nargs='+', help="padrão: as 10 mais usadas")
+    adicionar_filtros(comparacao)
+    
+    correlacao = comandos.add_parser('correlacao', help="matriz de associação entre tecnologias")
+    correlacao.add_argument('--tecnologias', nargs='+', help="padrão: as 5 mais usadas")
+    correlacao.add_argument('--metrica', choices=list(Coocorrencia.METRICAS), default='phi')
+    adicionar_filtros(correlacao)
+    
+    pares = comandos.add_parser('pares', help="pares de tecnologias mais associados")
+    pares.add_argument('--metrica', choices=list(Coocorrencia.METRICAS), default='phi')
+    pares.add_argument('--top', type=int, default=15)
+    pares.add_argument('--min-usuarios', type=int, default=10)
+    adicionar_filtros(pares)
+    
+    testes = comandos.add_parser(
+        'testes', help="tecnologias cujo uso mais difere entre os valores de uma variável"
+    )
+    testes.add_argument('variavel', choices=COLUNAS_INDEXADAS)
+    testes.add_argument('--correcao', choices=list(CORRECOES), default='bh',
+                        help="correção para comparações múltiplas (padrão: bh)")
+    testes.add_argument('--top', type=int, help="apenas as N primeiras")
+    adicionar_filtros(testes)
+    
+    precomputar = comandos.add_parser(
+        'precomputar', help="grava os resultados do estado padrão do dashboard (etapa de build)"
+    )
+    fonte_precomputar = precomputar.add_mutually_exclusive_group()
+    fonte_precomputar.add_argument('--csv', help="CSV de origem (padrão: o CSV do projeto)")
+    fonte_precomputar.add_argument('--remoto', action='store_true',
+                                   help="usa a cópia do GitHub (revalidada), como o app, em vez do CSV do projeto")
+    precomputar.add_argument('--diretorio', help="destino do artefato (padrão: precomputado/ ou SOD_PRECOMPUTADO_DIR)")
+    
+    validar = comandos.add_parser(
+        'validar', help="impressão digital e relatório de validação do dataset (JSON)"
+    )
+    validar.add_argument('--csv', help="CSV de origem (padrão: cópia do GitHub ou o CSV do projeto)")
+    
+    adicionar_filtros(comandos.add_parser(
+        'ponderacao', help="relatório de convergência do raking para os filtros (JSON)"
+    ))
+    return parser
+
+def mais_usadas(df_tech, n):
+    return df_tech.sort_values('Uso (%)', ascending=False)['Tecnologia'].head(n).tolist()
+
+def selecionar(args, indice):
+    """Respondentes que passam nos filtros da linha de comando"""
+    filtros = {
+        'UF': args.uf,
+        'Senioridade': args.senioridade,
+        'Forma de trabalho': args.forma_trabalho,
+    }
+    return indice.selecionar(tuple(args.idade) if args.idade else None, filtros)
+
+def gerar_tabela(args, matriz, indice, tech_columns):
+    """Calcula a tabela pedida para os respondentes que passam nos filtros"""
+    selecao = selecionar(args, indice)
+    pesos = None
+    if args.ponderar:
+        pesos, _ = ponderar(Estratos(indice), selecao, ler_margens(args.margens))
+    df_tech = calcular_uso_tecnologias(matriz, tech_columns, selecao, not args.individual, pesos)
+    if df_tech is None:
+        return pd.DataFrame()
+    
+    if args.comando == 'uso':
+        tabela = df_tech.sort_values('Uso (%)', ascending=False)[['Tecnologia', 'Uso (%)', 'Usuários', 'Total']]
+        if args.intervalos:
+            tabela = tabela.join(intervalos_uso(matriz, selecao, pesos=pesos), on='Tecnologia')
+        return tabela
+    
+    if args.comando == 'categorias':
+        linhas = df_tech.set_index('Tecnologia')
+        return pd.DataFrame([
+            {'Categoria': categoria, 'Tecnologia': tech,
+             'Uso (%)': linhas.at[tech, 'Uso (%)'], 'Usuários': linhas.at[tech, 'Usuários']}
+            for categoria, techs in categorizar_tecnologias(df_tech).items()
+            for tech in techs
+        ])
+    
+    if args.comando == 'perfil':
+        tabela = calcular_tabela_cruzada(matriz, indice, args.variavel, selecao, pesos)
+        resultado = calcular_uso_perfil(tabela, args.tecnologia)
+        if resultado is None:
+            raise SystemExit(f"Tecnologia desconhecida: {args.tecnologia}")
+        return resultado
+    
+    if args.comando == 'testes':
+        # Sempre sobre as contagens de respondentes (sem ponderação)
+        tabela = calcular_tabela_cruzada(matriz, indice, args.variavel, selecao)
+        resultado = testar_associacao(tabela, VALORES_COMPARACAO.get(args.variavel), correcao=args.correcao)
+        return resultado.head(args.top).reset_index() if args.top else resultado.reset_index()
+    
+    if args.comando == 'comparacao':
+        tabela = calcular_tabela_cruzada(matriz, indice, args.variavel, selecao, pesos)
+        techs = args.tecnologias or mais_usadas(df_tech, 10)
+        resultado = calcular_comparacao(tabela, techs, args.variavel, VALORES_COMPARACAO.get(args.variavel))
+        return pd.DataFrame() if resultado is None else resultado.reset_index()
+    
+    coocorrencia = calcular_coocorrencia(matriz, selecao, pesos)
+    if args.comando == 'correlacao':
+        techs = args.tecnologias or mais_usadas(df_tech, 5)
+        return coocorrencia.submatriz(techs, args.metrica).rename_axis('Tecnologia').reset_index()
+    
+    return coocorrencia.pares_principais(
+        args.metrica, nomes=df_tech['Tecnologia'].tolist(),
+        top=args.top, min_usuarios=args.min_usuarios
+    )
+
+def escrever(tabela, formato, destino):
+    if formato == 'csv':
+        tabela.to_csv(destino, index=False)
+    elif formato == 'json':
+        tabela.to_json(destino, orient='records', force_ascii=False, indent=2)
+        destino.write('\n')
+    else:
+        destino.write(tabela.to_string(index=False) + '\n')
+
+def main(argv=None):
+    args = montar_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(message)s', stream=sys.stderr
+    )
+    
+    caminho_csv = args.csv
+    if args.comando == 'precomputar' and not args.csv and not args.remoto:
+        # Etapa de build: sempre sobre o CSV versionado com o projeto
+        caminho_csv = CAMINHO_CSV_LOCAL
+    
+    validacao = {}
+    try:
+        # Processo de uma execução só: revalida a cópia do GitHub antes de ler
+        df, tech_columns, matriz, indice = carregar_dataset(
+            caminho_csv, validacao=validacao, revalidar_em_segundo_plano=False
+        )
+    except DatasetIndisponivel as e:
+        print(f"erro: {e}", file=sys.stderr)
+        return 1
+    
+    if args.comando == 'validar':
+        print(json.dumps(validacao, ensure_ascii=False, indent=2))
+        return 0
+    
+    if args.comando == 'precomputar':
+        artefato = calcular_precomputado(df, tech_columns, matriz, indice)
+        caminho = salvar_precomputado(artefato, args.diretorio)
+        print(caminho)
+        return 0
+    
+    if args.comando == 'ponderacao':
+        _, relatorio = ponderar(Estratos(indice), selecionar(args, indice), ler_margens(args.margens))
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+        return 0
+    
+    tabela = gerar_tabela(args, matriz, indice, tech_columns)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8', newline='') as destino:
+            escrever(tabela, args.formato, destino)
+        return 0
+    
+    try:
+        escrever(tabela, args.formato, sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Saída fechada antes do fim (ex.: | head): não é erro
+        sys.stderr.close()
+    return 0
@@ -0,0 +1,40 @@
+"""Nomes de colunas do CSV: limpeza de sufixos e consolidação de duplicadas"""
+import re
+
+import pandas as pd
+
+# ============================================================================
+# FUNÇÕES AUXILIARES
+# ============================================================================
+def limpar_nome_coluna(nome):
+    """Remove sufixos .1, .2, etc. dos nomes das colunas"""
+    if isinstance(nome, str):
+        nome = re.sub(r'\.\d+$', '', nome)
+        nome = nome.strip()
+    return nome
+
+def normalizar_nome_tecnologia(nome):
+    """Forma canônica de um nome para comparação exata (sem sufixo, espaços nem caixa)"""
+    return ' '.join(limpar_nome_coluna(str(nome)).split()).casefold()
+
+def consolidar_colunas_duplicadas(df):
+    """
+    Consolida colunas com nomes iguais (mas com sufixos .1, .2, etc.)
+    mantendo o valor máximo (1 se pelo menos uma coluna for 1).
+    O resultado é montado de uma vez, na ordem da primeira ocorrência.
+    """
+    colunas_agrupadas = {}
+    for col in df.columns:
+        colunas_agrupadas.setdefault(limpar_nome_coluna(col), []).append(col)
+    
+    if all(len(colunas) == 1 for colunas in colunas_agrupadas.values()):
+        return df
+    
+    novas_colunas = {}
+    for nome_base, colunas in colunas_agrupadas.items():
+        if len(colunas) > 1:
+            novas_colunas[nome_base] = df[colunas].max(axis=1)
+        else:
+            novas_colunas[nome_base] = df[colunas[0]]
+    
+    return pd.DataFrame(novas_colunas, index=df.index)
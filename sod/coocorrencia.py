@@ -0,0 +1,121 @@
+"""Coocorrência, correlação (phi), Jaccard e lift entre tecnologias"""
+import numpy as np
+import pandas as pd
+
+from .bits import pesos_selecionados
+from .cruzadas import bloco_com_grupos
+from .grupos import compilar_grupos
+
+# ============================================================================
+# COOCORRÊNCIA E CORRELAÇÃO ENTRE TECNOLOGIAS
+# ============================================================================
+class Coocorrencia:
+    """
+    Matriz de coocorrência XᵀX (respondentes que usam i e j) entre todas as
+    tecnologias e grupos de uma seleção. Phi, Jaccard e lift saem dela sem
+    voltar aos respondentes. Com ponderação, `conjunta` e `n` são somas de
+    pesos e `conjunta_amostra` guarda as contagens de respondentes.
+    """
+    
+    METRICAS = {
+        'phi': 'Correlação (phi)',
+        'jaccard': 'Jaccard',
+        'lift': 'Lift'
+    }
+    
+    def __init__(self, nomes, n, conjunta, relacionados, conjunta_amostra=None):
+        self.nomes = list(nomes)
+        self.posicao = {nome: i for i, nome in enumerate(self.nomes)}
+        self.n = n
+        self.conjunta = conjunta
+        self.conjunta_amostra = conjunta if conjunta_amostra is None else conjunta_amostra
+        self.usuarios = np.diag(conjunta).astype(np.float64)
+        # Pares ligados por construção (grupo e membro, grupos com membro comum)
+        self.relacionados = relacionados
+    
+    @property
+    def nbytes(self):
+        amostra = 0 if self.conjunta_amostra is self.conjunta else self.conjunta_amostra.nbytes
+        return self.conjunta.nbytes + self.relacionados.nbytes + amostra
+    
+    def phi(self):
+        """Coeficiente phi (igual à correlação de Pearson entre colunas 0/1)"""
+        ni = self.usuarios
+        with np.errstate(divide='ignore', invalid='ignore'):
+            numerador = self.n * self.conjunta - np.outer(ni, ni)
+            variancia = ni * (self.n - ni)
+            return numerador / np.sqrt(np.outer(variancia, variancia))
+    
+    def jaccard(self):
+        ni = self.usuarios
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.conjunta / (ni[:, None] + ni[None, :] - self.conjunta)
+    
+    def lift(self):
+        ni = self.usuarios
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.n * self.conjunta / np.outer(ni, ni)
+    
+    def submatriz(self, nomes, metrica='phi'):
+        """Fatia da métrica para as tecnologias escolhidas, como DataFrame"""
+        nomes = [nome for nome in nomes if nome in self.posicao]
+        idx = [self.posicao[nome] for nome in nomes]
+        valores = getattr(self, metrica)()[np.ix_(idx, idx)]
+        return pd.DataFrame(valores, index=nomes, columns=nomes)
+    
+    def pares_principais(self, metrica='phi', nomes=None, top=10, min_usuarios=1):
+        """Ranking dos pares com maior valor da métrica entre as tecnologias dadas"""
+        nomes = self.nomes if nomes is None else [nome for nome in nomes if nome in self.posicao]
+        idx = np.array([self.posicao[nome] for nome in nomes], dtype=np.int64)
+        if len(idx) < 2:
+            return pd.DataFrame(columns=['Tecnologia A', 'Tecnologia B', 'Usuários de ambas', self.METRICAS[metrica]])
+        
+        valores = getattr(self, metrica)()[np.ix_(idx, idx)]
+        conjunta = self.conjunta_amostra[np.ix_(idx, idx)]
+        i, j = np.triu_indices(len(idx), k=1)
+        validos = (
+            ~self.relacionados[idx[i], idx[j]]
+            & (conjunta[i, j] >= min_usuarios)
+            & np.isfinite(valores[i, j])
+        )
+        i, j = i[validos], j[validos]
+        ordem = np.argsort(-valores[i, j], kind='stable')[:top]
+        return pd.DataFrame({
+            'Tecnologia A': [nomes[k] for k in i[ordem]],
+            'Tecnologia B': [nomes[k] for k in j[ordem]],
+            'Usuários de ambas': conjunta[i[ordem], j[ordem]],
+            self.METRICAS[metrica]: valores[i[ordem], j[ordem]]
+        })
+
+def pares_relacionados(matriz):
+    """
+    Pares (tecnologias seguidas dos grupos) cuja associação é garantida pela
+    definição dos grupos: grupo e membro, grupos com membro comum
+    """
+    grupos = compilar_grupos(tuple(matriz.colunas))
+    n_tech = len(matriz.colunas)
+    n = n_tech + len(grupos.nomes)
+    pertence = np.zeros((len(grupos.nomes), n_tech), dtype=bool)
+    for g, membros in enumerate(grupos.membros):
+        pertence[g, membros] = True
+    relacionados = np.zeros((n, n), dtype=bool)
+    relacionados[n_tech:, :n_tech] = pertence
+    relacionados[:n_tech, n_tech:] = pertence.T
+    relacionados[n_tech:, n_tech:] = (pertence.astype(np.int64) @ pertence.T.astype(np.int64)) > 0
+    return relacionados
+
+def calcular_coocorrencia(matriz, selecao=None, pesos=None):
+    """
+    Coocorrência de todas as tecnologias e grupos com um único produto XᵀX
+    (XᵀWX com `pesos`, mais o XᵀX das contagens de respondentes)
+    """
+    bloco, nomes = bloco_com_grupos(matriz, selecao)
+    bloco = bloco.astype(np.float32)
+    conjunta = np.rint(bloco.T @ bloco).astype(np.int64)
+    relacionados = pares_relacionados(matriz)
+    
+    if pesos is not None:
+        pesos = pesos_selecionados(pesos, selecao, matriz.n_linhas)
+        ponderada = ((bloco * pesos[:, None]).T @ bloco).astype(np.float64)
+        return Coocorrencia(nomes, float(pesos.sum(dtype=np.float64)), ponderada, relacionados, conjunta)
+    return Coocorrencia(nomes, len(bloco), conjunta, relacionados)
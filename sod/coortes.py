@@ -0,0 +1,69 @@
+"""
+Comparação entre duas coortes (dois conjuntos de filtros) em uma passada.
+
+As seleções das coortes A e B são empilhadas (2 × palavras) e um único
+AND + popcount contra os bits de todas as tecnologias e grupos dá os
+usuários de cada um nas duas coortes; com ponderação, um único produto
+bits × pesos das duas coortes. Uso, diferença, razão e o teste de cada
+diferença saem dessas contagens: a comparação custa o mesmo que uma
+visão, não duas.
+"""
+import numpy as np
+import pandas as pd
+
+from .bits import desempacotar_bits, popcount
+from .cruzadas import TabelaCruzada, palavras_com_grupos
+from .testes import ALFA, testar_associacao
+
+COORTES = ['A', 'B']
+
+def complemento(matriz, selecao):
+    """Respondentes fora da seleção (ex.: "o resto do Brasil")"""
+    return ~selecao & matriz.selecao_total()
+
+def comparar_coortes(matriz, selecao_a, selecao_b, pesos=None, correcao='bh', alfa=ALFA):
+    """
+    Uso (%) de todas as tecnologias e grupos nas coortes A e B, com a
+    diferença (pp), a razão A/B e o teste de cada diferença (sobre as
+    contagens de respondentes). `pesos`, se dado, é o par de vetores de
+    pesos das coortes. Ordenado pela maior diferença absoluta; os tamanhos
+    e a sobreposição das coortes ficam em `attrs`.
+    """
+    palavras, nomes = palavras_com_grupos(matriz)
+    selecoes = np.stack([selecao_a, selecao_b])
+    # Coortes × tecnologias e grupos, em uma única redução
+    usuarios = popcount(palavras[None, :, :] & selecoes[:, None, :])
+    tamanhos = popcount(selecoes)
+    if pesos is None:
+        somas, totais = usuarios.astype(np.float64), tamanhos.astype(np.float64)
+    else:
+        pesos = np.stack(pesos).astype(np.float32) * desempacotar_bits(selecoes, matriz.n_linhas)
+        somas = (pesos @ desempacotar_bits(palavras, matriz.n_linhas).T.astype(np.float32)).astype(np.float64)
+        totais = pesos.sum(axis=1, dtype=np.float64)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        uso = somas / totais[:, None] * 100
+        razao = uso[0] / uso[1]
+    
+    testes = testar_associacao(
+        TabelaCruzada('Coorte', COORTES, tamanhos, usuarios, nomes), correcao=correcao, alfa=alfa
+    )
+    resultado = pd.DataFrame({
+        'Uso A (%)': uso[0],
+        'Uso B (%)': uso[1],
+        'Diferença (pp)': uso[0] - uso[1],
+        'Razão A/B': razao,
+        'Usuários A': usuarios[0],
+        'Usuários B': usuarios[1],
+    }, index=pd.Index(nomes, name='Tecnologia'))
+    resultado = resultado[~resultado.index.duplicated()]
+    resultado = resultado.join(testes[['Teste', 'p ajustado', 'Significativo']])
+    resultado = resultado.iloc[np.argsort(-resultado['Diferença (pp)'].abs().fillna(-1).to_numpy(), kind='stable')]
+    
+    resultado.attrs.update({
+        'tamanho_a': int(tamanhos[0]),
+        'tamanho_b': int(tamanhos[1]),
+        # Os testes supõem coortes disjuntas
+        'sobreposicao': int(popcount(selecao_a & selecao_b)),
+    })
+    return resultado
@@ -0,0 +1,100 @@
+"""Tabelas cruzadas variável demográfica × tecnologias e grupos"""
+import numpy as np
+import pandas as pd
+
+from .bits import desempacotar_bits, pesos_selecionados
+from .colunas import limpar_nome_coluna
+from .grupos import compilar_grupos
+
+# ============================================================================
+# TABELAS CRUZADAS (VARIÁVEL DEMOGRÁFICA × TECNOLOGIAS E GRUPOS)
+# ============================================================================
+def palavras_com_grupos(matriz):
+    """
+    Bits das tecnologias seguidos dos bits "usa pelo menos uma" de cada
+    grupo. Retorna (palavras, nomes), com os nomes da coluna 'Tecnologia'.
+    """
+    grupos = compilar_grupos(tuple(matriz.colunas))
+    palavras = np.concatenate([matriz.palavras, grupos.uniao(matriz)])
+    nomes = [limpar_nome_coluna(col) for col in matriz.colunas] + list(grupos.nomes)
+    return palavras, nomes
+
+def bloco_com_grupos(matriz, selecao=None):
+    """
+    Bloco denso (respondentes selecionados × tecnologias e grupos) em uint8.
+    Cada grupo é uma coluna "usa pelo menos uma" dos seus membros.
+    Retorna (bloco, nomes), com os nomes usados na coluna 'Tecnologia'.
+    """
+    palavras, nomes = palavras_com_grupos(matriz)
+    bloco = desempacotar_bits(palavras, matriz.n_linhas).T
+    if selecao is not None:
+        bloco = bloco[desempacotar_bits(selecao, matriz.n_linhas)]
+    return bloco.astype(np.uint8), nomes
+
+class TabelaCruzada:
+    """
+    Usuários de cada tecnologia e grupo em cada valor de uma variável
+    demográfica, dentro de uma seleção de respondentes (com ponderação,
+    contagens e tamanhos são somas de pesos)
+    """
+    
+    def __init__(self, variavel, valores, tamanhos, contagens, colunas):
+        self.variavel = variavel
+        self.valores = list(valores)
+        self.tamanhos = tamanhos
+        self.contagens = contagens
+        self.colunas = list(colunas)
+        self.posicao = {col: i for i, col in enumerate(self.colunas)}
+    
+    @property
+    def nbytes(self):
+        return self.tamanhos.nbytes + self.contagens.nbytes
+    
+    def uso(self, tecnologias=None, valores=None):
+        """
+        Uso (%) com tecnologias nas linhas e valores nas colunas. Valores sem
+        respondentes na seleção e tecnologias desconhecidas são omitidos.
+        """
+        linhas = [
+            i for i, v in enumerate(self.valores)
+            if self.tamanhos[i] > 0 and (valores is None or v in valores)
+        ]
+        tecnologias = self.colunas if tecnologias is None else [t for t in tecnologias if t in self.posicao]
+        colunas = [self.posicao[t] for t in tecnologias]
+        
+        percentuais = self.contagens[np.ix_(linhas, colunas)] / self.tamanhos[linhas, None] * 100
+        return pd.DataFrame(
+            percentuais.T,
+            index=pd.Index(tecnologias, name='Tecnologia'),
+            columns=pd.Index([self.valores[i] for i in linhas], name=self.variavel)
+        )
+
+def calcular_tabela_cruzada(matriz, indice, variavel, selecao=None, pesos=None):
+    """
+    Tabela cruzada completa em um único produto: codificação one-hot da
+    variável (valores × respondentes) vezes o bloco de tecnologias e grupos.
+    Com `pesos`, cada respondente entra no one-hot com o seu peso.
+    """
+    valores = indice.valores(variavel)
+    bloco, nomes = bloco_com_grupos(matriz, selecao)
+    
+    if valores:
+        bits_valores = np.stack([indice.bitmap(variavel, v) for v in valores])
+        one_hot = desempacotar_bits(bits_valores, indice.n_linhas)
+        if selecao is not None:
+            one_hot = one_hot[:, desempacotar_bits(selecao, indice.n_linhas)]
+    else:
+        one_hot = np.zeros((0, len(bloco)), dtype=bool)
+    
+    one_hot = one_hot.astype(np.float32)
+    if pesos is not None:
+        one_hot *= pesos_selecionados(pesos, selecao, indice.n_linhas)
+        return TabelaCruzada(
+            variavel, valores, one_hot.sum(axis=1, dtype=np.float64),
+            (one_hot @ bloco.astype(np.float32)).astype(np.float64), nomes
+        )
+    
+    # Produto em float32 (contagens exatas até 2^24 respondentes), guardado como inteiro
+    contagens = np.rint(one_hot @ bloco.astype(np.float32)).astype(np.int64)
+    tamanhos = np.rint(one_hot.sum(axis=1)).astype(np.int64)
+    return TabelaCruzada(variavel, valores, tamanhos, contagens, nomes)
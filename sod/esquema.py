@@ -0,0 +1,274 @@
+"""Esquema de ingestão do CSV e detecção das colunas de tecnologia"""
+import csv
+import re
+from io import BytesIO, TextIOWrapper
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from .colunas import limpar_nome_coluna, normalizar_nome_tecnologia
+
+# ============================================================================
+# ESQUEMA DE INGESTÃO DO CSV
+# ============================================================================
+PAPEL_DEMOGRAFICO = 'demográfico'
+PAPEL_BINARIO = 'binário'
+PAPEL_TEXTO_LIVRE = 'texto livre'
+
+# Encodings tentados, em ordem, para o arquivo inteiro
+ENCODINGS_CSV = ['utf-8', 'latin-1']
+
+# Variáveis de perfil do respondente
+COLUNAS_DEMOGRAFICAS = {
+    'Idade': pa.float64(),
+    'Faixa idade': pa.string(),
+    'Gênero': pa.string(),
+    'UF': pa.string(),
+    'Nível de Ensino': pa.string(),
+    'Área de Formação': pa.string(),
+    'Situação atual de trabalho': pa.string(),
+    'Setor': pa.string(),
+    'Número de Funcionários': pa.string(),
+    'Gestor?': pa.float64(),
+    'Cargo como Gestor': pa.string(),
+    'Cargo Atual': pa.string(),
+    'Senioridade': pa.string(),
+    'Faixa salarial': pa.string(),
+    'Experiência na área de dados': pa.string(),
+    'Quanto tempo de experiência na área de TI/Engenharia de Software você teve antes de começar a trabalhar na área de dados?': pa.string(),
+    'Forma de trabalho': pa.string(),
+    'Forma de trabalho ideal': pa.string(),
+    'Qual o número aproximado de pessoas que atuam com dados na sua empresa hoje': pa.string(),
+    'Atuaçao': pa.string(),
+}
+
+OPCOES_FONTES_DE_DADOS = [
+    'Dados relacionais', 'Dados em bancos NoSQL', 'Imagens', 'Textos/Documentos',
+    'Vídeos', 'Áudios', 'Planilhas', 'Dados georeferenciados'
+]
+
+OPCOES_LINGUAGENS = [
+    'SQL', 'R', 'Python', 'C/C++/C#', '.NET', 'Java', 'Julia', 'SAS/Stata',
+    'Visual Basic/VBA', 'Scala', 'Matlab', 'PHP', 'Javascript',
+    'Não utilizo nenhuma linguagem'
+]
+
+OPCOES_BANCOS_DE_DADOS = [
+    'MySQL', 'Oracle', 'SQL SERVER', 'SAP', 'Amazon Aurora ou RDS',
+    'Amazon DynamoDB', 'CoachDB', 'Cassandra', 'MongoDB', 'MariaDB', 'Datomic',
+    'S3', 'PostgreSQL', 'ElasticSearch', 'DB2', 'Microsoft Access', 'SQLite',
+    'Sybase', 'Firebase', 'Vertica', 'Redis', 'Neo4J', 'Google BigQuery',
+    'Google Firestore', 'Amazon Redshift', 'Amazon Athena', 'Snowflake',
+    'Databricks', 'HBase', 'Presto', 'Splunk', 'SAP HANA', 'Hive', 'Firebird'
+]
+
+OPCOES_CLOUD = [
+    'AWS', 'Google Cloud', 'Azure', 'Oracle Cloud', 'IBM',
+    'Servidores On Premise/Não utilizamos Cloud', 'Cloud Própria'
+]
+
+# Blocos de múltipla escolha: a pergunta traz as respostas concatenadas
+# (texto livre) e cada opção vem em seguida como uma coluna 0/1
+BLOCOS_MULTIPLA_ESCOLHA = {
+    'Quais das fontes de dados listadas você já analisou ou processou no trabalho': OPCOES_FONTES_DE_DADOS,
+    'Entre as fontes de dados listadas, quais você utiliza na maior parte do tempo?': OPCOES_FONTES_DE_DADOS,
+    'Quais das linguagens listadas abaixo você utiliza no trabalho?': OPCOES_LINGUAGENS,
+    'Entre as linguagens listadas abaixo, qual é a que você mais utiliza no trabalho?': OPCOES_LINGUAGENS,
+    'Quais dos bancos de dados/fontes de dados listados abaixo você utiliza no trabalho?': OPCOES_BANCOS_DE_DADOS,
+    'Quais das opções de Cloud listadas abaixo você utiliza no trabalho?': OPCOES_CLOUD,
+}
+
+def montar_esquema():
+    """Monta o esquema {nome da coluna: (tipo Arrow, papel)} a partir dos blocos declarados"""
+    esquema = {nome: (tipo, PAPEL_DEMOGRAFICO) for nome, tipo in COLUNAS_DEMOGRAFICAS.items()}
+    for pergunta, opcoes in BLOCOS_MULTIPLA_ESCOLHA.items():
+        esquema[pergunta] = (pa.string(), PAPEL_TEXTO_LIVRE)
+        for opcao in opcoes:
+            esquema[opcao] = (pa.int8(), PAPEL_BINARIO)
+    return esquema
+
+ESQUEMA_CSV = montar_esquema()
+
+# Papéis carregados no dataset principal (None: colunas fora do esquema);
+# o texto livre (respostas concatenadas) fica fora do dataset
+PAPEIS_DATASET = (PAPEL_DEMOGRAFICO, PAPEL_BINARIO, None)
+
+# ============================================================================
+# DETECÇÃO DAS COLUNAS DE TECNOLOGIA
+# ============================================================================
+# Manifesto: cada tecnologia é reconhecida pelo nome exato (sem diferenciar
+# caixa e espaços) ou por uma das variações declaradas, ancoradas no nome todo
+MANIFESTO_TECNOLOGIAS = {
+    **{opcao: [] for opcao in OPCOES_LINGUAGENS},
+    **{opcao: [] for opcao in OPCOES_FONTES_DE_DADOS},
+    **{opcao: [] for opcao in OPCOES_BANCOS_DE_DADOS},
+    **{opcao: [] for opcao in OPCOES_CLOUD},
+}
+MANIFESTO_TECNOLOGIAS.update({
+    'C/C++/C#': [r'c\s*/\s*c\+\+\s*/\s*c#'],
+    'Visual Basic/VBA': [r'visual basic\s*/\s*vba'],
+    'Não utilizo nenhuma linguagem': [r'n[ãa]o utilizo nenhuma linguagem'],
+    'Dados georeferenciados': [r'dados geor+eferenciados'],
+    'SQL SERVER': [r'(microsoft )?sql\s*server'],
+    'CoachDB': [r'co[au]chdb'],
+    'ElasticSearch': [r'elastic\s*search'],
+    'Amazon Aurora ou RDS': [r'amazon aurora (ou|or) rds'],
+    'Neo4J': [r'neo4j'],
+    'Servidores On Premise/Não utilizamos Cloud': [r'servidores on[ -]?premises?\s*/\s*n[ãa]o utilizamos cloud'],
+})
+
+class DetectorTecnologias:
+    """
+    Classificador compilado uma única vez a partir do manifesto: nomes
+    exatos ficam em um dicionário e as variações em uma única regex com
+    alternativas nomeadas. Cada coluna é classificada com uma consulta.
+    """
+    
+    def __init__(self, manifesto=MANIFESTO_TECNOLOGIAS):
+        self.tecnologias = list(manifesto)
+        self.exatos = {normalizar_nome_tecnologia(tech): tech for tech in manifesto}
+        self.padroes = [
+            (tech, re.compile(padrao, re.IGNORECASE))
+            for tech, padroes in manifesto.items() for padrao in padroes
+        ]
+        self.combinado = re.compile(
+            '|'.join(f'(?:{padrao.pattern})' for _, padrao in self.padroes) or r'(?!)',
+            re.IGNORECASE
+        )
+    
+    def classificar_coluna(self, coluna):
+        """Tecnologias do manifesto que a coluna pode representar"""
+        chave = normalizar_nome_tecnologia(coluna)
+        if chave in self.exatos:
+            return [self.exatos[chave]]
+        if not self.combinado.fullmatch(chave):
+            return []
+        # Só as colunas já aceitas pela regex combinada são testadas por padrão
+        return list(dict.fromkeys(tech for tech, padrao in self.padroes if padrao.fullmatch(chave)))
+    
+    def classificar(self, colunas, ignorar=()):
+        """
+        Classifica as colunas em uma passada. Retorna as colunas de
+        tecnologia na ordem do manifesto e o relatório com as colunas não
+        reconhecidas, ambíguas e repetidas (a primeira ocorrência é usada).
+        """
+        ignorar = {normalizar_nome_tecnologia(col) for col in ignorar}
+        encontradas = {}
+        relatorio = {'nao_reconhecidas': [], 'ambiguas': {}, 'repetidas': {}}
+        
+        for col in colunas:
+            candidatas = self.classificar_coluna(col)
+            if len(candidatas) == 1:
+                tech = candidatas[0]
+                if tech in encontradas:
+                    relatorio['repetidas'].setdefault(tech, [encontradas[tech]]).append(col)
+                else:
+                    encontradas[tech] = col
+            elif candidatas:
+                relatorio['ambiguas'][col] = candidatas
+            elif normalizar_nome_tecnologia(col) not in ignorar:
+                relatorio['nao_reconhecidas'].append(col)
+        
+        tech_columns = [encontradas[tech] for tech in self.tecnologias if tech in encontradas]
+        return tech_columns, relatorio
+
+DETECTOR_TECNOLOGIAS = DetectorTecnologias()
+
+# Colunas do esquema que sabidamente não são tecnologias
+COLUNAS_NAO_TECNOLOGIA = [
+    nome for nome, (_, papel) in ESQUEMA_CSV.items() if papel != PAPEL_BINARIO
+]
+
+def nomes_unicos(nomes):
+    """Renomeia colunas repetidas com sufixos .1, .2, ... (mesma convenção do pandas)"""
+    ocorrencias = {}
+    resultado = []
+    for nome in nomes:
+        n = ocorrencias.get(nome, 0)
+        resultado.append(nome if n == 0 else f"{nome}.{n}")
+        ocorrencias[nome] = n + 1
+    return resultado
+
+def ler_cabecalho_csv(fonte, encoding):
+    """Lê apenas a linha de cabeçalho do CSV (caminho ou bytes)"""
+    if isinstance(fonte, (bytes, bytearray)):
+        arquivo = TextIOWrapper(BytesIO(fonte), encoding=encoding, newline='')
+    else:
+        arquivo = open(fonte, encoding=encoding, newline='')
+    with arquivo:
+        return next(csv.reader(arquivo))
+
+def ler_csv_com_esquema(fonte, esquema=ESQUEMA_CSV, papeis=None):
+    """
+    Lê o CSV em uma única passada com o leitor do pyarrow, aplicando o tipo
+    declarado de cada coluna. Colunas fora do esquema são lidas como texto.
+    `papeis` restringe a leitura às colunas desses papéis (None representa
+    as colunas fora do esquema); sem ele, todas as colunas são lidas.
+    Respostas ausentes nas colunas binárias viram 0 (opção não marcada).
+    Retorna (df, relatorio) com as linhas lidas e descartadas.
+    """
+    ultimo_erro = None
+    for encoding in ENCODINGS_CSV:
+        try:
+            cabecalho = nomes_unicos([nome.strip() for nome in ler_cabecalho_csv(fonte, encoding)])
+        except (UnicodeDecodeError, StopIteration) as e:
+            ultimo_erro = e
+            continue
+        
+        tipos = {}
+        incluidas = []
+        binarias = []
+        fora_do_esquema = []
+        for col in cabecalho:
+            tipo, papel = esquema.get(limpar_nome_coluna(col), (pa.string(), None))
+            if papel is None:
+                fora_do_esquema.append(col)
+            tipos[col] = tipo
+            if papeis is None or papel in papeis:
+                incluidas.append(col)
+                if papel == PAPEL_BINARIO:
+                    binarias.append(col)
+        
+        linhas_descartadas = []
+        
+        def descartar_linha(linha_invalida):
+            # O número da linha só é conhecido com leitura sequencial
+            linhas_descartadas.append(linha_invalida.number or linha_invalida.text[:80])
+            return 'skip'
+        
+        entrada = pa.BufferReader(fonte) if isinstance(fonte, (bytes, bytearray)) else fonte
+        try:
+            tabela = pa_csv.read_csv(
+                entrada,
+                read_options=pa_csv.ReadOptions(
+                    encoding=encoding,
+                    skip_rows=1,
+                    column_names=cabecalho
+                ),
+                parse_options=pa_csv.ParseOptions(invalid_row_handler=descartar_linha),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=tipos,
+                    include_columns=incluidas,
+                    strings_can_be_null=True
+                )
+            )
+        except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+            ultimo_erro = e
+            continue
+        
+        # Sem nulos, as colunas binárias chegam ao pandas como int8 (e não float64)
+        for col in binarias:
+            i = tabela.schema.get_field_index(col)
+            tabela = tabela.set_column(i, col, pc.fill_null(tabela.column(i), 0))
+        
+        relatorio = {
+            'encoding': encoding,
+            'linhas_lidas': tabela.num_rows,
+            'linhas_descartadas': len(linhas_descartadas),
+            'amostra_linhas_descartadas': linhas_descartadas[:50],
+            'colunas_fora_do_esquema': fora_do_esquema
+        }
+        return tabela.to_pandas(), relatorio
+    
+    raise ValueError(f"Não foi possível ler o CSV com os encodings {ENCODINGS_CSV}: {ultimo_erro}")
@@ -0,0 +1,192 @@
+"""Índice de filtros em bitmaps (mesmo formato de seleção da TechMatrix)"""
+import numpy as np
+import pandas as pd
+
+from .bits import desempacotar_bits, empacotar_bits, popcount
+
+# ============================================================================
+# ÍNDICE DE FILTROS EM BITMAPS
+# ============================================================================
+# Variáveis com um bitmap por valor: filtros da barra lateral e variáveis
+# usadas nas análises por perfil e comparações entre grupos (nomes do
+# esquema em sod.esquema, como no CSV)
+COLUNAS_INDEXADAS = [
+    'UF', 'Senioridade', 'Forma de trabalho', 'regiao', 'Gênero',
+    'faixa_etaria', 'Nível de Ensino', 'Área de Formação', 'Atuaçao'
+]
+
+def opcoes_filtros(df):
+    """
+    Faixa de idade e opções de cada filtro da barra lateral; o estado
+    padrão do dashboard é a faixa inteira com todas as opções marcadas
+    """
+    opcoes = {}
+    if 'Idade' in df.columns:
+        opcoes['Idade'] = (int(df['Idade'].min()), int(df['Idade'].max()))
+    
+    if 'UF' in df.columns:
+        uf_opcoes = df['UF'].dropna().unique().tolist()
+        # Remover valores NaN se houver
+        opcoes['UF'] = [uf for uf in uf_opcoes if uf and str(uf) != 'nan' and str(uf) != 'None']
+    
+    if 'Senioridade' in df.columns:
+        # Filtrar para não incluir "Não informado" e "Gestor"
+        senioridade_opcoes = [s for s in df['Senioridade'].dropna().unique()
+                              if s != 'Não informado' and s != 'Gestor'
+                              and s in ['Júnior', 'Pleno', 'Sênior']]
+        opcoes['Senioridade'] = [s for s in senioridade_opcoes if s and str(s) != 'nan' and str(s) != 'None']
+    
+    if 'Forma de trabalho' in df.columns:
+        forma_opcoes = df['Forma de trabalho'].dropna().unique().tolist()
+        opcoes['Forma de trabalho'] = [f for f in forma_opcoes if f and str(f) != 'nan' and str(f) != 'None']
+    return opcoes
+
+def filtros_padrao(df):
+    """(idade_range, filtros) do estado inicial da barra lateral"""
+    opcoes = dict(opcoes_filtros(df))
+    return opcoes.pop('Idade', None), opcoes
+
+class IndiceFiltros:
+    """
+    Bitmaps de respondentes (mesmo formato de seleção da TechMatrix) para
+    cada valor das variáveis categóricas, e bitmaps de prefixo para a idade:
+    prefixos_idade[k] marca quem tem idade <= idades[k]. Qualquer combinação
+    de filtros vira um OR por variável e um AND entre variáveis.
+    """
+    
+    def __init__(self, df, colunas=COLUNAS_INDEXADAS, coluna_idade='Idade'):
+        self.n_linhas = len(df)
+        self.bitmaps = {}
+        # Variáveis em que todo respondente tem algum valor (sem nulos)
+        self.completa = {}
+        for col in colunas:
+            if col not in df.columns:
+                continue
+            serie = df[col]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                codigos, valores = serie.cat.codes.to_numpy(), list(serie.cat.categories)
+            else:
+                codigos, valores = pd.factorize(serie, sort=True)
+                valores = list(valores)
+            # Mesma ordem de valores do groupby (ordenados, sem nulos)
+            bits = empacotar_bits(codigos[None, :] == np.arange(len(valores))[:, None])
+            self.bitmaps[col] = dict(zip(valores, bits))
+            self.completa[col] = bool((codigos >= 0).all())
+        
+        self.idade = None
+        if coluna_idade in df.columns:
+            self.idade = df[coluna_idade].to_numpy(dtype=float)
+            self.idades = np.unique(self.idade[~np.isnan(self.idade)])
+            self.prefixos_idade = empacotar_bits(self.idade[None, :] <= self.idades[:, None])
+    
+    @classmethod
+    def de_arrays(cls, n_linhas, bitmaps, completa, idade=None, idades=None, prefixos_idade=None):
+        """Monta o índice a partir de bitmaps já prontos (ex.: mapeados em memória)"""
+        indice = cls.__new__(cls)
+        indice.n_linhas = n_linhas
+        indice.bitmaps = bitmaps
+        indice.completa = completa
+        indice.idade = idade
+        if idade is not None:
+            indice.idades = idades
+            indice.prefixos_idade = prefixos_idade
+        return indice
+    
+    def valores(self, coluna):
+        """Valores indexados de uma variável"""
+        return list(self.bitmaps.get(coluna, {}))
+    
+    def bitmap(self, coluna, valor):
+        return self.bitmaps[coluna][valor]
+    
+    def selecao_valores(self, coluna, valores):
+        """Respondentes com qualquer um dos valores (equivalente a isin)"""
+        mapa = self.bitmaps[coluna]
+        bits = [mapa[v] for v in valores if v in mapa]
+        if not bits:
+            return np.zeros_like(self.selecao_total())
+        return np.bitwise_or.reduce(np.stack(bits), axis=0)
+    
+    def selecao_idade(self, minimo, maximo):
+        """Respondentes com minimo <= idade <= maximo, via dois bitmaps de prefixo"""
+        fim = np.searchsorted(self.idades, maximo, side='right') - 1
+        inicio = np.searchsorted(self.idades, minimo, side='left') - 1
+        if fim < 0:
+            return np.zeros(self.prefixos_idade.shape[1], dtype=np.uint64)
+        if inicio < 0:
+            return self.prefixos_idade[fim].copy()
+        return self.prefixos_idade[fim] & ~self.prefixos_idade[inicio]
+    
+    def selecao_total(self):
+        return empacotar_bits(np.ones(self.n_linhas, dtype=bool))
+    
+    def selecionar(self, idade_range=None, filtros=None):
+        """
+        Combina os filtros em uma seleção de respondentes. Variáveis sem
+        valores selecionados não filtram (mesmo comportamento da barra lateral).
+        """
+        selecao = self.selecao_total()
+        if idade_range is not None and self.idade is not None:
+            selecao &= self.selecao_idade(*idade_range)
+        for coluna, valores in (filtros or {}).items():
+            if valores and coluna in self.bitmaps:
+                selecao &= self.selecao_valores(coluna, valores)
+        return selecao
+    
+    def normalizar_valores(self, coluna, valores):
+        """
+        Forma canônica de uma seleção de valores: None quando não restringe
+        ninguém (vazia, ou todos os valores de uma variável sem nulos)
+        """
+        if not valores:
+            return None
+        mapa = self.bitmaps[coluna]
+        presentes = sorted({v for v in valores if v in mapa}, key=str)
+        if len(presentes) == len(mapa) and self.completa[coluna]:
+            return None
+        return tuple(presentes)
+    
+    def assinatura(self, idade_range=None, filtros=None):
+        """
+        Assinatura canônica dos filtros, usada como chave de cache: filtros
+        equivalentes (mesma faixa efetiva de idade, mesmos valores em
+        qualquer ordem) produzem a mesma assinatura
+        """
+        idade = None
+        if idade_range is not None and self.idade is not None and len(self.idades):
+            inicio = np.searchsorted(self.idades, idade_range[0], side='left')
+            fim = np.searchsorted(self.idades, idade_range[1], side='right') - 1
+            if inicio > fim:
+                idade = ()
+            elif inicio > 0 or fim < len(self.idades) - 1:
+                idade = (float(self.idades[inicio]), float(self.idades[fim]))
+        
+        itens = [('Idade', idade)]
+        for coluna in sorted(filtros or {}):
+            if coluna in self.bitmaps:
+                itens.append((coluna, self.normalizar_valores(coluna, filtros[coluna])))
+        return tuple(itens)
+    
+    def contagens(self, coluna, selecao=None, valores=None):
+        """Respondentes por valor da variável na seleção (apenas valores presentes)"""
+        mapa = self.bitmaps.get(coluna, {})
+        valores = list(mapa) if valores is None else [v for v in valores if v in mapa]
+        if not valores:
+            return {}
+        bits = np.stack([mapa[v] for v in valores])
+        contagens = popcount(bits if selecao is None else bits & selecao)
+        return {v: int(c) for v, c in zip(valores, contagens) if c > 0}
+    
+    def mascara(self, selecao):
+        """Máscara booleana de respondentes da seleção"""
+        return desempacotar_bits(selecao, self.n_linhas)
+    
+    def media_idade(self, selecao, pesos=None):
+        if self.idade is None:
+            return np.nan
+        mascara = self.mascara(selecao)
+        if pesos is not None:
+            total = pesos[mascara].sum()
+            return (self.idade[mascara] * pesos[mascara]).sum() / total if total else np.nan
+        idades = self.idade[mascara]
+        return idades.mean() if len(idades) else np.nan
@@ -0,0 +1,206 @@
+"""Grupos de tecnologias e tabelas de uso (individual e agrupado)"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from .bits import popcount, somas_ponderadas
+from .colunas import limpar_nome_coluna, normalizar_nome_tecnologia
+
+# ============================================================================
+# FUNÇÕES DE AGRUPAMENTO CORRIGIDAS
+# ============================================================================
+# Dicionário de agrupamentos UNIFICADO
+GRUPOS_TECNOLOGIAS = {
+    # GRUPO UNIFICADO SQL - INCLUI LINGUAGEM, DADOS E BANCOS RELACIONAIS
+    'SQL (linguagem, dados relacionais e bancos)': [
+        # Linguagem SQL
+        'SQL',
+        # Dados relacionais (fonte de dados)
+        'Dados relacionais',
+        # Bancos de dados relacionais
+        'MySQL', 'PostgreSQL', 'SQL SERVER', 'SQLite', 
+        'MariaDB', 'Oracle', 'DB2', 'Microsoft Access', 'Sybase'
+    ],
+    
+    # Grupo Cloud AWS
+    'AWS (serviços diversos)': [
+        'Amazon Aurora ou RDS', 'Amazon DynamoDB', 
+        'Amazon Redshift', 'Amazon Athena', 'S3'
+    ],
+    
+    # Grupo Google Cloud
+    'Google Cloud (BigQuery, Firestore)': ['Google BigQuery', 'Google Firestore'],
+    
+    # Grupo NoSQL
+    'Bancos NoSQL (MongoDB, Cassandra, Redis, etc.)': [
+        'MongoDB', 'Cassandra', 'Redis', 'Neo4J', 
+        'CoachDB', 'Datomic', 'HBase', 'Firebird'
+    ],
+    
+    # Grupo Ferramentas BI
+    'Ferramentas BI (Tableau, Power BI, etc.)': ['Tableau', 'Power BI', 'Looker', 'Qlik'],
+    
+    # Grupo Big Data
+    'Plataformas Big Data (Spark, Hadoop, etc.)': [
+        'Spark', 'Hadoop', 'Kafka', 'Hive', 'Presto', 
+        'Snowflake', 'Databricks', 'HBase'
+    ]
+}
+
+class GruposCompilados:
+    """
+    Pertinência grupo × tecnologia em formato esparso (CSR): os membros do
+    grupo g são as linhas indices[indptr[g]:indptr[g + 1]] da TechMatrix.
+    O "usa pelo menos uma" de todos os grupos sai de um único reduceat.
+    """
+    
+    def __init__(self, nomes, membros, individuais):
+        self.nomes = nomes
+        self.membros = membros
+        self.individuais = individuais
+        
+        posicoes = [sorted(set(m)) for m in membros]
+        self.indptr = np.cumsum([0] + [len(p) for p in posicoes])
+        self.indices = np.array([i for p in posicoes for i in p], dtype=np.int64)
+    
+    def uniao(self, matriz):
+        """Bits de "usa pelo menos uma tecnologia" de cada grupo (grupos × palavras)"""
+        if not self.nomes:
+            return np.zeros((0, matriz.palavras.shape[1]), dtype=np.uint64)
+        return np.bitwise_or.reduceat(matriz.palavras[self.indices], self.indptr[:-1], axis=0)
+    
+    def contagens(self, matriz, selecao=None, pesos=None):
+        """Usuários de cada grupo na seleção (ou a soma dos seus pesos)"""
+        uniao = self.uniao(matriz)
+        if pesos is not None:
+            return somas_ponderadas(uniao, matriz.n_linhas, pesos, selecao)
+        return popcount(uniao if selecao is None else uniao & selecao)
+
+@functools.lru_cache(maxsize=8)
+def compilar_grupos(colunas, grupos=None):
+    """
+    Resolve os nomes de GRUPOS_TECNOLOGIAS para posições da TechMatrix uma
+    única vez, por nome exato. Tecnologias fora de todos os grupos aparecem
+    sozinhas.
+    """
+    grupos = GRUPOS_TECNOLOGIAS if grupos is None else dict(grupos)
+    posicao = {}
+    for i, col in enumerate(colunas):
+        posicao.setdefault(normalizar_nome_tecnologia(col), i)
+    
+    nomes_grupos = []
+    membros = []
+    processadas = set()
+    for grupo, tecnologias in grupos.items():
+        posicoes = [
+            posicao[chave] for chave in map(normalizar_nome_tecnologia, tecnologias)
+            if chave in posicao
+        ]
+        if posicoes:
+            nomes_grupos.append(grupo)
+            membros.append(posicoes)
+            processadas.update(posicoes)
+    
+    individuais = [i for i in range(len(colunas)) if i not in processadas]
+    return GruposCompilados(nomes_grupos, membros, individuais)
+
+def linha_uso(tecnologia, usuarios, total, coluna_original, uso=None):
+    """
+    Linha padrão das tabelas de uso de tecnologias. Com ponderação, `uso`
+    é o percentual ponderado; usuários e total continuam sendo contagens.
+    """
+    if uso is None:
+        uso = usuarios / total * 100 if total else np.nan
+    return {
+        'Tecnologia': tecnologia,
+        'Uso (%)': uso,
+        'Usuários': int(usuarios),
+        'Total': total,
+        'Coluna Original': coluna_original
+    }
+
+def uso_ponderado(matriz, somas, selecao, pesos):
+    """Uso (%) a partir das somas de pesos dos usuários"""
+    total = matriz.total(selecao, pesos)
+    return somas / total * 100 if total else np.full(len(somas), np.nan)
+
+def contagens_separadas(matriz, contagens):
+    """(total, usuários das tecnologias, usuários dos grupos) de contagens já calculadas"""
+    total, usuarios = contagens
+    n_tech = len(matriz.colunas)
+    return int(total), usuarios[:n_tech], usuarios[n_tech:]
+
+def calcular_uso_individual(matriz, tech_columns, selecao=None, pesos=None, contagens=None):
+    """
+    Calcula uso individual de cada tecnologia sem agrupamento. `contagens`,
+    se dado, é o par (total, usuários das tecnologias seguidos dos grupos)
+    já calculado para a seleção.
+    """
+    if contagens is None:
+        total, contagens = matriz.total(selecao), matriz.contagens(selecao)
+    else:
+        total, contagens, _ = contagens_separadas(matriz, contagens)
+    usos = None
+    if pesos is not None:
+        usos = uso_ponderado(matriz, matriz.contagens(selecao, pesos), selecao, pesos)
+    
+    tech_data = [
+        linha_uso(limpar_nome_coluna(tech), contagens[i], total, tech, None if usos is None else usos[i])
+        for i, tech in enumerate(matriz.colunas)
+        if tech in tech_columns
+    ]
+    
+    if not tech_data:
+        return None
+    
+    df_tech = pd.DataFrame(tech_data)
+    df_tech = df_tech.drop_duplicates(subset='Tecnologia', keep='first')
+    return df_tech
+
+def calcular_uso_com_grupos_unificado(matriz, tech_columns, selecao=None, pesos=None, contagens=None):
+    """
+    Calcula uso de tecnologias com agrupamento UNIFICADO
+    Agora SQL, Dados relacionais e Bancos relacionais estão em um único grupo "SQL"
+    """
+    colunas = [tech for tech in matriz.colunas if tech in tech_columns]
+    if not colunas:
+        return None
+    
+    grupos = compilar_grupos(tuple(matriz.colunas))
+    if contagens is None:
+        total = matriz.total(selecao)
+        contagens = matriz.contagens(selecao)
+        contagens_grupos = grupos.contagens(matriz, selecao)
+    else:
+        total, contagens, contagens_grupos = contagens_separadas(matriz, contagens)
+    usos = usos_grupos = None
+    if pesos is not None:
+        usos = uso_ponderado(matriz, matriz.contagens(selecao, pesos), selecao, pesos)
+        usos_grupos = uso_ponderado(matriz, grupos.contagens(matriz, selecao, pesos), selecao, pesos)
+    
+    # Processar grupos primeiro
+    dados_agrupados = []
+    for g, grupo in enumerate(grupos.nomes):
+        colunas_grupo = [matriz.colunas[i] for i in grupos.membros[g]]
+        dados_agrupados.append(linha_uso(
+            grupo, contagens_grupos[g], total,
+            ', '.join(colunas_grupo[:3]) + ('...' if len(colunas_grupo) > 3 else ''),
+            None if usos_grupos is None else usos_grupos[g]
+        ))
+    
+    # Adicionar tecnologias não agrupadas
+    for i in grupos.individuais:
+        tech = matriz.colunas[i]
+        if tech in tech_columns:
+            dados_agrupados.append(linha_uso(
+                limpar_nome_coluna(tech), contagens[i], total, tech, None if usos is None else usos[i]
+            ))
+    
+    # Criar DataFrame final
+    df_agrupado = pd.DataFrame(dados_agrupados)
+    
+    # Ordenar por uso
+    df_agrupado = df_agrupado.sort_values('Uso (%)', ascending=False)
+    
+    return df_agrupado
@@ -0,0 +1,197 @@
+"""
+Agregados mantidos incrementalmente quando um filtro muda de valor.
+
+Cada respondente tem no máximo um valor de UF, de senioridade e de forma
+de trabalho, então, fixados os demais filtros (o "resto"), os agregados da
+seleção são a soma dos agregados de cada valor selecionado: usuários de
+cada tecnologia e grupo, coocorrência XᵀX e as células das tabelas
+cruzadas. Essas somas parciais são calculadas a partir das posições dos
+respondentes de cada valor (custo proporcional a eles, não ao dataset) e
+guardadas; incluir ou tirar um valor de um filtro soma ou subtrai só a
+parcial desse valor ao último resultado com o mesmo resto. Mudar a idade
+muda o resto de todas as dimensões e recompõe a seleção inteira a partir
+das parciais.
+
+Só vale sem ponderação: o raking refaz os pesos de todos os respondentes
+a cada seleção, e as parciais ponderadas não se somam.
+"""
+import os
+
+import numpy as np
+
+from .analise import calcular_uso_tecnologias
+from .bits import bits_das_linhas, desempacotar_bits
+from .cache import CacheResultados
+from .coocorrencia import Coocorrencia, pares_relacionados
+from .cruzadas import TabelaCruzada, palavras_com_grupos
+
+DIMENSOES_INCREMENTAIS = ['UF', 'Senioridade', 'Forma de trabalho']
+
+# Limite das parciais e dos últimos resultados guardados em memória
+INCREMENTAL_LIMITE_MB = float(os.environ.get('SOD_INCREMENTAL_MB', '32'))
+
+# Chave da parcial dos respondentes sem valor na dimensão
+SEM_VALOR = None
+
+class AgregadorIncremental:
+    """
+    Somas parciais por valor de filtro e o último resultado de cada resto,
+    compartilhados por todas as sessões. Os agregados são tuplas de arrays
+    de contagens (somáveis termo a termo):
+    'uso' → (total, usuários), 'coocorrencia' → (total, XᵀX) e
+    ('cruzada', variável) → (tamanhos, contagens).
+    """
+    
+    def __init__(self, matriz, indice, versao=None, limite_bytes=None):
+        self.matriz = matriz
+        self.indice = indice
+        self.versao = versao
+        self.palavras, self.nomes = palavras_com_grupos(matriz)
+        self.dimensoes = [d for d in DIMENSOES_INCREMENTAIS if d in indice.bitmaps]
+        if limite_bytes is None:
+            limite_bytes = int(INCREMENTAL_LIMITE_MB * 1024 * 1024)
+        self._cache = CacheResultados(limite_bytes)
+        
+        # Posições dos respondentes de cada valor das dimensões (montadas uma vez)
+        self.linhas = {}
+        for dimensao in self.dimensoes:
+            mapa = indice.bitmaps[dimensao]
+            self.linhas[dimensao] = {
+                valor: np.flatnonzero(desempacotar_bits(bits, indice.n_linhas)) for valor, bits in mapa.items()
+            }
+            if not indice.completa[dimensao]:
+                com_valor = np.bitwise_or.reduce(np.stack(list(mapa.values())), axis=0)
+                self.linhas[dimensao][SEM_VALOR] = np.flatnonzero(~desempacotar_bits(com_valor, indice.n_linhas))
+        self._codigos = {}
+    
+    @property
+    def nbytes(self):
+        linhas = sum(l.nbytes for por_valor in self.linhas.values() for l in por_valor.values())
+        return self.palavras.nbytes + linhas + sum(c.nbytes for c in self._codigos.values())
+    
+    def estatisticas(self):
+        return self._cache.estatisticas()
+    
+    # ========================================================================
+    # AGREGADOS DE UM CONJUNTO DE RESPONDENTES
+    # ========================================================================
+    def codigos(self, variavel):
+        """Código do valor da variável de cada respondente (len(valores) = sem valor)"""
+        if variavel not in self._codigos:
+            valores = self.indice.valores(variavel)
+            codigos = np.full(self.indice.n_linhas, len(valores), dtype=np.int32)
+            for k, valor in enumerate(valores):
+                codigos[desempacotar_bits(self.indice.bitmap(variavel, valor), self.indice.n_linhas)] = k
+            self._codigos[variavel] = codigos
+        return self._codigos[variavel]
+    
+    def calcular(self, tipo, linhas):
+        """Agregado `tipo` dos respondentes nas posições `linhas`"""
+        bloco = bits_das_linhas(self.palavras, linhas).T
+        if tipo == 'uso':
+            return np.int64(len(linhas)), bloco.sum(axis=0, dtype=np.int64)
+        bloco = bloco.astype(np.float32)
+        if tipo == 'coocorrencia':
+            return np.int64(len(linhas)), np.rint(bloco.T @ bloco).astype(np.int64)
+        
+        _, variavel = tipo
+        n_valores = len(self.indice.valores(variavel))
+        codigos = self.codigos(variavel)[linhas]
+        one_hot = (codigos[None, :] == np.arange(n_valores)[:, None]).astype(np.float32)
+        return (
+            np.bincount(codigos, minlength=n_valores + 1)[:n_valores].astype(np.int64),
+            np.rint(one_hot @ bloco).astype(np.int64),
+        )
+    
+    # ========================================================================
+    # SELEÇÃO COMO SOMA DE PARCIAIS
+    # ========================================================================
+    def chaves(self, dimensao, valores):
+        """Parciais que compõem a seleção de `valores` (vazio não filtra, como na barra lateral)"""
+        por_valor = self.linhas[dimensao]
+        if not valores:
+            return frozenset(por_valor)
+        return frozenset(v for v in valores if v is not SEM_VALOR and v in por_valor)
+    
+    def parcial(self, tipo, dimensao, resto, chave_resto, chave):
+        """Agregado dos respondentes do valor `chave` da dimensão dentro do resto (em cache)"""
+        def calcular():
+            linhas = self.linhas[dimensao][chave]
+            return self.calcular(tipo, linhas[bits_das_linhas(resto(), linhas)])
+        return self._cache.obter_ou_calcular(('parcial', tipo, dimensao, chave_resto, chave), calcular)
+    
+    def agregar(self, tipo, idade_range=None, filtros=None):
+        """
+        Agregado `tipo` da seleção dos filtros. Parte do último resultado que
+        difere da seleção em uma única dimensão e soma ou subtrai as parciais
+        dos valores incluídos ou retirados; sem resultado anterior, soma as
+        parciais de todos os valores selecionados.
+        """
+        filtros = {c: v for c, v in (filtros or {}).items() if c in self.indice.bitmaps}
+        if not self.dimensoes:
+            selecao = self.indice.selecionar(idade_range, filtros)
+            return self.calcular(tipo, np.flatnonzero(desempacotar_bits(selecao, self.indice.n_linhas)))
+        
+        alvos, chaves_resto, restos = {}, {}, {}
+        for dimensao in self.dimensoes:
+            outros = {c: v for c, v in filtros.items() if c != dimensao}
+            alvos[dimensao] = self.chaves(dimensao, filtros.get(dimensao))
+            chaves_resto[dimensao] = (self.versao, self.indice.assinatura(idade_range, outros))
+            restos[dimensao] = _seletor(self.indice, idade_range, outros)
+        
+        # Menor número de parciais: um delta a partir de um resultado anterior
+        # ou a soma de todas as parciais selecionadas da primeira dimensão
+        dimensao = self.dimensoes[0]
+        base, incluir, retirar = None, alvos[dimensao], frozenset()
+        for d in self.dimensoes:
+            anterior = self._cache.obter(('estado', tipo, d, chaves_resto[d]))
+            if anterior is None:
+                continue
+            chaves, valor = anterior
+            if len(chaves ^ alvos[d]) < len(incluir) + len(retirar):
+                dimensao, base = d, valor
+                incluir, retirar = alvos[d] - chaves, chaves - alvos[d]
+        
+        def parcial(chave):
+            return self.parcial(tipo, dimensao, restos[dimensao], chaves_resto[dimensao], chave)
+        
+        if base is None:
+            base = self.calcular(tipo, np.empty(0, dtype=np.int64))
+        for chave in incluir:
+            base = tuple(a + b for a, b in zip(base, parcial(chave)))
+        for chave in retirar:
+            base = tuple(a - b for a, b in zip(base, parcial(chave)))
+        
+        # O mesmo resultado serve de ponto de partida para mudanças em qualquer dimensão
+        for d in self.dimensoes:
+            self._cache.guardar(('estado', tipo, d, chaves_resto[d]), (alvos[d], base))
+        return base
+    
+    # ========================================================================
+    # RESULTADOS NO FORMATO DAS FUNÇÕES DE ANÁLISE
+    # ========================================================================
+    def uso(self, tech_columns, idade_range=None, filtros=None, usar_grupos=True):
+        """Mesmo resultado de calcular_uso_tecnologias (sem ponderação)"""
+        return calcular_uso_tecnologias(
+            self.matriz, tech_columns, usar_grupos=usar_grupos,
+            contagens=self.agregar('uso', idade_range, filtros)
+        )
+    
+    def coocorrencia(self, idade_range=None, filtros=None):
+        """Mesmo resultado de calcular_coocorrencia (sem ponderação)"""
+        total, conjunta = self.agregar('coocorrencia', idade_range, filtros)
+        return Coocorrencia(self.nomes, int(total), conjunta, pares_relacionados(self.matriz))
+    
+    def tabela_cruzada(self, variavel, idade_range=None, filtros=None):
+        """Mesmo resultado de calcular_tabela_cruzada (sem ponderação)"""
+        tamanhos, contagens = self.agregar(('cruzada', variavel), idade_range, filtros)
+        return TabelaCruzada(variavel, self.indice.valores(variavel), tamanhos, contagens, self.nomes)
+
+def _seletor(indice, idade_range, filtros):
+    """Seleção dos filtros montada só se alguma parcial precisar dela"""
+    selecao = []
+    def resto():
+        if not selecao:
+            selecao.append(indice.selecionar(idade_range, filtros))
+        return selecao[0]
+    return resto
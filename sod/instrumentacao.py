@@ -0,0 +1,218 @@
+"""
+Instrumentação por etapa: tempo de parede, alocações (tracemalloc) e
+acerto/falha de cache, exportáveis em JSON lines ou no formato texto do
+Prometheus. O custo por etapa é o de dois perf_counter; o tracemalloc só
+é ligado com SOD_TRACEMALLOC=1, porque deixa todas as alocações mais lentas.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+import weakref
+from contextlib import contextmanager, nullcontext
+
+from .registro import logger
+
+# ============================================================================
+# CONFIGURAÇÃO
+# ============================================================================
+RASTREAR_MEMORIA = os.environ.get('SOD_TRACEMALLOC') == '1'
+# Arquivos opcionais atualizados a cada execução (ex.: textfile collector
+# do node_exporter para o formato Prometheus)
+ARQUIVO_METRICAS_JSONL = os.environ.get('SOD_METRICAS_JSONL')
+ARQUIVO_METRICAS_PROM = os.environ.get('SOD_METRICAS_PROM')
+
+if RASTREAR_MEMORIA and not tracemalloc.is_tracing():
+    # Um quadro por alocação: o mínimo necessário para os totais
+    tracemalloc.start(1)
+
+# O pico do tracemalloc é do processo inteiro, e as sessões do Streamlit
+# rodam em threads concorrentes: o pico de uma etapa só vale se nenhum
+# outro Medidor tinha etapas abertas enquanto ela rodou. Nas demais, só a
+# variação da memória atual é registrada (pico_bytes = None). Referências
+# fracas: um rerun interrompido com a seção aberta não fica ativo para sempre.
+_lock_memoria = threading.Lock()
+_medidores_ativos = weakref.WeakSet()
+
+def etapa(medidor, nome):
+    """Etapa medida quando há medidor (mesmo padrão de registrar(mensagens, ...))"""
+    return medidor.etapa(nome) if medidor is not None else nullcontext({})
+
+# ============================================================================
+# MÉTRICAS ACUMULADAS DO PROCESSO
+# ============================================================================
+class Metricas:
+    """Totais por etapa desde o início do processo, seguros para várias sessões"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._etapas = {}
+        self._cache = {}
+    
+    def acumular(self, medicao):
+        nome = medicao['etapa']
+        with self._lock:
+            total = self._etapas.setdefault(
+                nome, {'execucoes': 0, 'segundos': 0.0, 'maximo_s': 0.0, 'pico_bytes': 0}
+            )
+            total['execucoes'] += 1
+            total['segundos'] += medicao['duracao_s']
+            total['maximo_s'] = max(total['maximo_s'], medicao['duracao_s'])
+            if medicao.get('pico_bytes') is not None:
+                total['pico_bytes'] = max(total['pico_bytes'], medicao['pico_bytes'])
+            if medicao.get('cache'):
+                chave = (nome, medicao['cache'])
+                self._cache[chave] = self._cache.get(chave, 0) + 1
+    
+    def resumo(self):
+        with self._lock:
+            return {nome: dict(total) for nome, total in self._etapas.items()}, dict(self._cache)
+    
+    def para_prometheus(self):
+        """Totais no formato texto de exposição do Prometheus"""
+        etapas, cache = self.resumo()
+        linhas = [
+            "# HELP sod_etapa_segundos Tempo de parede das etapas.",
+            "# TYPE sod_etapa_segundos summary",
+        ]
+        for nome, total in sorted(etapas.items()):
+            rotulo = f'etapa="{escapar_rotulo(nome)}"'
+            linhas.append(f"sod_etapa_segundos_sum{{{rotulo}}} {total['segundos']:.6f}")
+            linhas.append(f"sod_etapa_segundos_count{{{rotulo}}} {total['execucoes']}")
+        linhas += [
+            "# HELP sod_etapa_segundos_maximo Maior tempo de parede observado por etapa.",
+            "# TYPE sod_etapa_segundos_maximo gauge",
+        ]
+        for nome, total in sorted(etapas.items()):
+            linhas.append(f'sod_etapa_segundos_maximo{{etapa="{escapar_rotulo(nome)}"}} {total["maximo_s"]:.6f}')
+        if RASTREAR_MEMORIA:
+            linhas += [
+                "# HELP sod_etapa_pico_bytes Maior pico de memória alocada por etapa (tracemalloc).",
+                "# TYPE sod_etapa_pico_bytes gauge",
+            ]
+            for nome, total in sorted(etapas.items()):
+                linhas.append(f'sod_etapa_pico_bytes{{etapa="{escapar_rotulo(nome)}"}} {total["pico_bytes"]}')
+        linhas += [
+            "# HELP sod_cache_total Consultas ao cache de resultados por etapa e resultado.",
+            "# TYPE sod_cache_total counter",
+        ]
+        for (nome, resultado), n in sorted(cache.items()):
+            linhas.append(
+                f'sod_cache_total{{etapa="{escapar_rotulo(nome)}",resultado="{escapar_rotulo(resultado)}"}} {n}'
+            )
+        return "\n".join(linhas) + "\n"
+
+def escapar_rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# ============================================================================
+# MEDIÇÕES DE UMA EXECUÇÃO
+# ============================================================================
+class Medidor:
+    """
+    Medições de uma execução (um rerun da página ou a carga do dataset).
+    `etapa` é um gerenciador de contexto e pode ser aninhado; `secao`
+    encerra a seção anterior e abre a próxima, para marcar trechos
+    sequenciais do script sem reindentá-los. Cada medição é um dict; a
+    etapa pode anotar nele o resultado do cache ('memoria', 'disco' ou 'falha').
+    Com o tracemalloc ligado, pico_bytes só é medido quando o Medidor é o
+    único com etapas abertas no processo; com execuções concorrentes a
+    etapa fica com pico_bytes = None e memoria_bytes (variação da memória
+    atual do processo, aproximada).
+    """
+    
+    def __init__(self, metricas=None, execucao=None):
+        self.metricas = metricas
+        self.execucao = execucao or uuid.uuid4().hex[:12]
+        self.medicoes = []
+        self._pilha = []
+        self._secao = None
+    
+    def _abrir(self, nome):
+        medicao = {
+            'execucao': self.execucao, 'etapa': nome, 'nivel': len(self._pilha),
+            'inicio': time.time(), 'cache': None
+        }
+        if tracemalloc.is_tracing():
+            with _lock_memoria:
+                _medidores_ativos.add(self)
+                atual, pico = tracemalloc.get_traced_memory()
+                if len(_medidores_ativos) > 1:
+                    # Outra execução mede ao mesmo tempo: nenhum pico aberto vale mais
+                    for medidor in _medidores_ativos:
+                        for aberta in medidor._pilha:
+                            aberta['_exclusiva'] = False
+                    medicao['_exclusiva'] = False
+                else:
+                    if self._pilha:
+                        # O pico anterior pertence à etapa externa, que segue aberta
+                        self._pilha[-1]['_pico'] = max(self._pilha[-1]['_pico'], pico)
+                    tracemalloc.reset_peak()
+                    medicao['_exclusiva'] = True
+                medicao['_memoria'] = atual
+                medicao['_pico'] = atual
+                self._pilha.append(medicao)
+        else:
+            self._pilha.append(medicao)
+        medicao['_relogio'] = time.perf_counter()
+        return medicao
+    
+    def _fechar(self, medicao):
+        medicao['duracao_s'] = time.perf_counter() - medicao.pop('_relogio')
+        if '_memoria' in medicao:
+            with _lock_memoria:
+                self._pilha.remove(medicao)
+                atual, pico = tracemalloc.get_traced_memory()
+                pico = max(pico, medicao.pop('_pico'))
+                inicio = medicao.pop('_memoria')
+                medicao['memoria_bytes'] = atual - inicio
+                medicao['pico_bytes'] = pico - inicio if medicao.pop('_exclusiva') else None
+                if self._pilha:
+                    self._pilha[-1]['_pico'] = max(self._pilha[-1]['_pico'], pico)
+                else:
+                    _medidores_ativos.discard(self)
+        else:
+            self._pilha.remove(medicao)
+        self.medicoes.append(medicao)
+        if self.metricas is not None:
+            self.metricas.acumular(medicao)
+        logger.debug("%s: %.1f ms", medicao['etapa'], medicao['duracao_s'] * 1000)
+    
+    @contextmanager
+    def etapa(self, nome):
+        medicao = self._abrir(nome)
+        try:
+            yield medicao
+        finally:
+            self._fechar(medicao)
+    
+    def secao(self, nome):
+        """Encerra a seção aberta (se houver) e abre `nome`"""
+        self.finalizar()
+        self._secao = self._abrir(nome)
+    
+    def finalizar(self):
+        """Encerra a seção aberta, se houver"""
+        if self._secao is not None:
+            self._fechar(self._secao)
+            self._secao = None
+    
+    def para_json_lines(self):
+        return "".join(json.dumps(m, ensure_ascii=False) + "\n" for m in self.medicoes)
+    
+    def exportar(self, arquivo_jsonl=ARQUIVO_METRICAS_JSONL, arquivo_prom=ARQUIVO_METRICAS_PROM):
+        """Grava as medições e os totais nos arquivos configurados; falhas só vão para o log"""
+        try:
+            if arquivo_jsonl:
+                with open(arquivo_jsonl, 'a', encoding='utf-8') as f:
+                    f.write(self.para_json_lines())
+            if arquivo_prom and self.metricas is not None:
+                # Substituição atômica: o coletor nunca lê um arquivo pela metade
+                temporario = f"{arquivo_prom}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    f.write(self.metricas.para_prometheus())
+                os.replace(temporario, arquivo_prom)
+        except OSError as e:
+            logger.warning("Não foi possível exportar as métricas: %s", e)
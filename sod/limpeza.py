@@ -0,0 +1,220 @@
+"""Limpeza do DataFrame bruto: tecnologias em int8 e variáveis de perfil em category"""
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .colunas import consolidar_colunas_duplicadas
+from .esquema import COLUNAS_DEMOGRAFICAS, COLUNAS_NAO_TECNOLOGIA, DETECTOR_TECNOLOGIAS
+from .registro import registrar
+
+# ============================================================================
+# NORMALIZAÇÃO DE VARIÁVEIS CATEGÓRICAS
+# ============================================================================
+# Textos que representam ausência de resposta
+VALORES_VAZIOS = {'', 'nan', 'none', 'null'}
+
+# Regras (padrão, valor): vale a primeira cujo padrão aparece no texto
+REGRAS_SENIORIDADE = [
+    (r'junior|júnior', 'Júnior'),
+    (r'pleno', 'Pleno'),
+    (r'senior|sênior', 'Sênior'),
+    (r'especialista', 'Especialista'),
+    (r'gestor', 'Gestor'),
+    (r'coordenador', 'Coordenador'),
+    (r'gerente', 'Gerente'),
+    (r'diretor', 'Diretor'),
+    (r'l[ií]der', 'Líder'),
+    (r'head', 'Head'),
+    (r'estagi[aá]rio', 'Estagiário'),
+    (r'trainee', 'Trainee'),
+    (r'assistente', 'Assistente'),
+]
+
+# Abreviações só valem como palavra inteira ('m' não casa com 'Feminino')
+REGRAS_GENERO = [
+    (r'\bfeminino\b|\bmulher\b|^f$', 'Feminino'),
+    (r'\bmasculino\b|\bhomem\b|^m$', 'Masculino'),
+]
+
+def compilar_regras(regras):
+    return [(re.compile(padrao, re.IGNORECASE), valor) for padrao, valor in regras]
+
+def mapear_categorica(serie, funcao):
+    """
+    Aplica `funcao` a cada valor distinto da coluna (None para ausentes) e
+    devolve o resultado pelos códigos do factorize, como Series do tipo
+    category com categorias ordenadas. Resultados None viram ausentes.
+    """
+    codigos, unicos = pd.factorize(serie)
+    # O código -1 (ausente) do factorize aponta para o último elemento
+    mapeados = [funcao(valor) for valor in unicos] + [funcao(None)]
+    
+    codigos_novos, categorias = pd.factorize(pd.Series(mapeados, dtype=object), sort=True)
+    return pd.Series(
+        pd.Categorical.from_codes(codigos_novos[codigos], categories=categorias).remove_unused_categories(),
+        index=serie.index,
+        name=serie.name
+    )
+
+def normalizar_categorica(serie, regras=(), vazio=None, formatar=None):
+    """
+    Normaliza uma coluna categórica aplicando as regras apenas aos valores
+    distintos. Valores sem regra ficam com o texto original sem espaços
+    (passado por `formatar`, se houver); ausentes viram `vazio`.
+    """
+    regras = compilar_regras(regras)
+    
+    def normalizar(valor):
+        texto = '' if valor is None else str(valor).strip()
+        if texto.lower() in VALORES_VAZIOS:
+            return vazio
+        if formatar is not None:
+            texto = formatar(texto)
+        return next((novo for padrao, novo in regras if padrao.search(texto)), texto)
+    
+    return mapear_categorica(serie, normalizar)
+
+def preencher_categorica(serie, mascara, valor):
+    """Atribui `valor` às linhas da máscara, incluindo-o nas categorias se preciso"""
+    if valor not in serie.cat.categories:
+        serie = serie.cat.set_categories(sorted([*serie.cat.categories, valor]))
+    return serie.mask(mascara, valor)
+
+def processar_dataset(df, mensagens=None, relatorio=None):
+    """
+    Limpa o DataFrame bruto: consolida colunas duplicadas,
+    identifica e binariza as tecnologias e normaliza as variáveis categóricas.
+    Trabalha sobre o próprio DataFrame recebido, sem cópias intermediárias:
+    tecnologias ficam em int8 e variáveis de perfil em category.
+    Mensagens de progresso vão para o logger e, se dada, para a lista `mensagens`.
+    Se `relatorio` for um dict, recebe o relatório da detecção das
+    tecnologias, as colunas não convertidas e os valores inválidos (lidos como 0).
+    """
+    # ================================================================
+    # CONSOLIDAR COLUNAS DUPLICADAS
+    # ================================================================
+    # Os nomes já chegam corretos: o encoding é resolvido na ingestão
+    registrar(mensagens, 'info', "🔄 Consolidando colunas duplicadas...")
+    
+    df = consolidar_colunas_duplicadas(df)
+    
+    registrar(mensagens, 'success', f"✅ Colunas após consolidação: {len(df.columns)}")
+    
+    # ================================================================
+    # IDENTIFICAR COLUNAS DE TECNOLOGIAS (0/1)
+    # ================================================================
+    
+    tech_columns, relatorio_deteccao = DETECTOR_TECNOLOGIAS.classificar(
+        df.columns, ignorar=COLUNAS_NAO_TECNOLOGIA
+    )
+    
+    registrar(mensagens, 'success', f"🔧 {len(tech_columns)} colunas de tecnologia identificadas")
+    for chave, rotulo in [('nao_reconhecidas', 'não reconhecidas'), ('ambiguas', 'ambíguas'), ('repetidas', 'repetidas')]:
+        if relatorio_deteccao[chave]:
+            registrar(
+                mensagens, 'warning',
+                f"⚠️ {len(relatorio_deteccao[chave])} colunas {rotulo}: "
+                f"{', '.join(map(str, list(relatorio_deteccao[chave])[:5]))}"
+            )
+    
+    falhas_conversao = {}
+    valores_invalidos = {}
+    
+    # Converter colunas de tecnologia para binário (0/1) em int8
+    for col in list(tech_columns):
+        try:
+            valores = df[col]
+            if valores.dtype != np.int8:
+                valores = pd.to_numeric(valores, errors='coerce')
+                
+                if valores.isna().all():
+                    valores = pd.to_numeric(
+                        df[col].astype(str).str.strip().str.lower().replace({
+                            '1': 1, '1.0': 1, 'sim': 1, 'yes': 1, 'true': 1, 's': 1, 'y': 1,
+                            '0': 0, '0.0': 0, 'não': 0, 'nao': 0, 'no': 0, 'false': 0, 'n': 0
+                        }),
+                        errors='coerce'
+                    )
+                
+                invalidos = int((valores.isna() & df[col].notna()).sum())
+                if invalidos:
+                    valores_invalidos[col] = invalidos
+                df[col] = valores.fillna(0).astype(np.int8)
+            
+        except Exception as e:
+            registrar(mensagens, 'warning', f"⚠️ Não foi possível converter {col}: {str(e)[:50]}")
+            falhas_conversao[col] = str(e)[:200]
+            if col in tech_columns:
+                tech_columns.remove(col)
+    
+    if relatorio is not None:
+        relatorio.update(relatorio_deteccao)
+        relatorio['falhas_conversao'] = falhas_conversao
+        relatorio['valores_invalidos'] = valores_invalidos
+    
+    # ================================================================
+    # PROCESSAMENTO DE COLUNAS ESPECÍFICAS
+    # ================================================================
+    
+    processed_df = df
+    
+    # Processar Idade
+    if 'Idade' in processed_df.columns:
+        processed_df['Idade'] = pd.to_numeric(processed_df['Idade'], errors='coerce')
+        
+        if processed_df['Idade'].isna().any():
+            median_age = processed_df['Idade'].median()
+            processed_df['Idade'] = processed_df['Idade'].fillna(median_age)
+        
+        bins = [0, 25, 35, 45, 55, 100]
+        labels = ['<25', '25-34', '35-44', '45-54', '55+']
+        processed_df['faixa_etaria'] = pd.cut(processed_df['Idade'], bins=bins, labels=labels, right=False)
+    
+    # Processar UF e Região
+    if 'UF' in processed_df.columns:
+        processed_df['UF'] = normalizar_categorica(
+            processed_df['UF'], vazio='Não informado', formatar=str.upper
+        )
+        
+        regioes = {
+            'AC': 'Norte', 'AL': 'Nordeste', 'AP': 'Norte', 'AM': 'Norte',
+            'BA': 'Nordeste', 'CE': 'Nordeste', 'DF': 'Centro-Oeste',
+            'ES': 'Sudeste', 'GO': 'Centro-Oeste', 'MA': 'Nordeste',
+            'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste', 'MG': 'Sudeste',
+            'PA': 'Norte', 'PB': 'Nordeste', 'PR': 'Sul', 'PE': 'Nordeste',
+            'PI': 'Nordeste', 'RJ': 'Sudeste', 'RN': 'Nordeste',
+            'RS': 'Sul', 'RO': 'Norte', 'RR': 'Norte', 'SC': 'Sul',
+            'SP': 'Sudeste', 'SE': 'Nordeste', 'TO': 'Norte'
+        }
+        
+        processed_df['regiao'] = mapear_categorica(
+            processed_df['UF'], lambda uf: regioes.get(uf, 'Outros')
+        ).rename('regiao')
+    
+    # Processar Senioridade - AGORA COM FILTRO PARA APENAS JÚNIOR, PLENO E SÊNIOR
+    if 'Senioridade' in processed_df.columns:
+        senioridade = normalizar_categorica(processed_df['Senioridade'], REGRAS_SENIORIDADE)
+        
+        # Gestores sem senioridade informada
+        if 'Gestor?' in processed_df.columns:
+            processed_df['Gestor?'] = pd.to_numeric(processed_df['Gestor?'], errors='coerce')
+            mask_gestor = senioridade.isna() & (processed_df['Gestor?'] == 1)
+            senioridade = preencher_categorica(senioridade, mask_gestor, 'Gestor')
+        
+        processed_df['Senioridade'] = preencher_categorica(senioridade, senioridade.isna(), 'Não informado')
+    
+    # Processar Gênero (mantido para análise, mas sem filtro)
+    if 'Gênero' in processed_df.columns:
+        processed_df['Gênero'] = normalizar_categorica(
+            processed_df['Gênero'], REGRAS_GENERO, vazio='Não informado'
+        )
+    
+    # Processar as demais colunas de perfil (texto) como category
+    for col, tipo in COLUNAS_DEMOGRAFICAS.items():
+        if col in processed_df.columns and pa.types.is_string(tipo) \
+                and not isinstance(processed_df[col].dtype, pd.CategoricalDtype):
+            processed_df[col] = normalizar_categorica(processed_df[col])
+    
+    return processed_df, tech_columns
@@ -0,0 +1,193 @@
+"""
+Ponderação dos respondentes por raking (ajuste proporcional iterativo).
+
+A amostra é de conveniência: os pesos ajustam a seleção para que a
+distribuição ponderada de Gênero, região, faixa etária e senioridade
+bata com margens de referência. O ajuste não roda por respondente: quem
+tem a mesma combinação de valores dessas variáveis recebe o mesmo peso,
+então o IPF trabalha sobre as contagens das células ocupadas (algumas
+centenas, qualquer que seja o número de linhas) e refazê-lo depois de
+mudar um filtro custa um bincount sobre a seleção.
+
+As margens vêm de um JSON (SOD_MARGENS ou --margens) no formato
+{"Gênero": {"Feminino": 0.3, "Masculino": 0.7}, ...}, com proporções ou
+contagens; sem arquivo, usa-se a composição da amostra completa. Valores
+ausentes das margens e respondentes sem valor na variável não são
+ajustados nela.
+"""
+import json
+import os
+
+import numpy as np
+
+from .bits import desempacotar_bits
+
+VARIAVEIS_PONDERACAO = ['Gênero', 'regiao', 'faixa_etaria', 'Senioridade']
+MAX_ITERACOES = 100
+# Maior diferença tolerada entre a proporção ponderada e a margem
+TOLERANCIA = 1e-6
+
+CAMINHO_MARGENS = os.environ.get('SOD_MARGENS')
+
+# ============================================================================
+# MARGENS DE REFERÊNCIA
+# ============================================================================
+def ler_margens(caminho=None):
+    """Margens do arquivo JSON, normalizadas para proporções (None sem arquivo)"""
+    caminho = caminho or CAMINHO_MARGENS
+    if not caminho:
+        return None
+    with open(caminho, encoding='utf-8') as f:
+        margens = json.load(f)
+    return {
+        variavel: {valor: float(p) / sum(alvos.values()) for valor, p in alvos.items()}
+        for variavel, alvos in margens.items() if alvos and sum(alvos.values()) > 0
+    }
+
+# ============================================================================
+# CÉLULAS (COMBINAÇÕES DE VALORES DAS VARIÁVEIS DE PONDERAÇÃO)
+# ============================================================================
+class Estratos:
+    """
+    Célula de cada respondente: os códigos dos valores das variáveis de
+    ponderação combinados em base mista (o último código de cada variável
+    é "sem valor"). Montado uma vez por dataset.
+    """
+    
+    def __init__(self, indice, variaveis=VARIAVEIS_PONDERACAO):
+        self.n_linhas = indice.n_linhas
+        self.variaveis = [variavel for variavel in variaveis if variavel in indice.bitmaps]
+        self.valores = [indice.valores(variavel) for variavel in self.variaveis]
+        self.niveis = np.array([len(valores) + 1 for valores in self.valores], dtype=np.int64)
+        
+        self.celula = np.zeros(self.n_linhas, dtype=np.int64)
+        # Composição da amostra completa: as margens padrão
+        self.composicao = {}
+        for variavel, valores, niveis in zip(self.variaveis, self.valores, self.niveis):
+            codigos = np.full(self.n_linhas, len(valores), dtype=np.int64)
+            for k, valor in enumerate(valores):
+                codigos[desempacotar_bits(indice.bitmap(variavel, valor), self.n_linhas)] = k
+            self.celula = self.celula * niveis + codigos
+            contagens = np.bincount(codigos, minlength=niveis)[:-1]
+            self.composicao[variavel] = {
+                valor: n / contagens.sum() for valor, n in zip(valores, contagens.tolist()) if n
+            }
+        self.n_celulas = int(np.prod(self.niveis))
+    
+    @property
+    def nbytes(self):
+        return self.celula.nbytes
+    
+    def contagens(self, selecao=None):
+        """(células ocupadas, respondentes em cada uma, códigos células × variáveis)"""
+        celulas = self.celula if selecao is None else self.celula[desempacotar_bits(selecao, self.n_linhas)]
+        contagens = np.bincount(celulas, minlength=self.n_celulas)
+        ocupadas = np.flatnonzero(contagens)
+        codigos = np.empty((len(ocupadas), len(self.variaveis)), dtype=np.int64)
+        resto = ocupadas
+        for j in range(len(self.variaveis) - 1, -1, -1):
+            resto, codigos[:, j] = np.divmod(resto, self.niveis[j])
+        return ocupadas, contagens[ocupadas].astype(np.float64), codigos
+
+# ============================================================================
+# RAKING
+# ============================================================================
+def alvos_por_codigo(estratos, margens):
+    """Margem de cada código de cada variável; NaN onde não há ajuste"""
+    alvos = []
+    for variavel, valores, niveis in zip(estratos.variaveis, estratos.valores, estratos.niveis):
+        alvo = np.full(niveis, np.nan)
+        for k, valor in enumerate(valores):
+            if valor in margens.get(variavel, {}):
+                alvo[k] = margens[variavel][valor]
+        alvos.append(alvo)
+    return alvos
+
+def raking(contagens, codigos, alvos, max_iteracoes=MAX_ITERACOES, tolerancia=TOLERANCIA):
+    """
+    IPF sobre as células: a cada passada, o peso das células é multiplicado,
+    variável por variável, pela razão margem / total ponderado do seu
+    valor. Cada margem é renormalizada sobre os valores ajustáveis presentes
+    na seleção (um filtro que remove valores não impede a convergência).
+    Retorna (peso de cada célula, iterações, erro máximo).
+    """
+    pesos = np.ones(len(contagens))
+    alvos_presentes = []
+    for j, alvo in enumerate(alvos):
+        presentes = np.bincount(codigos[:, j], weights=contagens, minlength=len(alvo)) > 0
+        alvo = np.where(presentes, alvo, np.nan)
+        ajustavel = ~np.isnan(alvo)
+        if ajustavel.sum() > 1:
+            alvos_presentes.append((j, ajustavel, alvo[ajustavel] / alvo[ajustavel].sum()))
+    
+    erro = 0.0
+    for iteracao in range(1, max_iteracoes + 1):
+        for j, ajustavel, alvo in alvos_presentes:
+            totais = np.bincount(codigos[:, j], weights=pesos * contagens, minlength=len(ajustavel))
+            fator = np.ones(len(ajustavel))
+            fator[ajustavel] = alvo * totais[ajustavel].sum() / totais[ajustavel]
+            pesos *= fator[codigos[:, j]]
+        
+        erro = 0.0
+        for j, ajustavel, alvo in alvos_presentes:
+            totais = np.bincount(codigos[:, j], weights=pesos * contagens, minlength=len(ajustavel))[ajustavel]
+            erro = max(erro, float(np.abs(totais / totais.sum() - alvo).max()))
+        if erro < tolerancia:
+            break
+    return pesos, iteracao if alvos_presentes else 0, erro
+
+def ponderar(estratos, selecao=None, margens=None, max_iteracoes=MAX_ITERACOES, tolerancia=TOLERANCIA):
+    """
+    Pesos de todos os respondentes (zero fora da seleção, média 1 dentro
+    dela) e o relatório de convergência. Sem `margens`, a seleção é
+    ajustada à composição da amostra completa.
+    """
+    ocupadas, contagens, codigos = estratos.contagens(selecao)
+    alvos = alvos_por_codigo(estratos, estratos.composicao if margens is None else margens)
+    pesos_celulas, iteracoes, erro = raking(contagens, codigos, alvos, max_iteracoes, tolerancia)
+    
+    total = contagens.sum()
+    efetivo = 0.0
+    if total:
+        pesos_celulas *= total / (pesos_celulas * contagens).sum()
+        # Tamanho efetivo de Kish: (Σw)² / Σw²
+        efetivo = float(total ** 2 / (pesos_celulas ** 2 * contagens).sum())
+    pesos_todas = np.zeros(estratos.n_celulas)
+    pesos_todas[ocupadas] = pesos_celulas
+    pesos = pesos_todas[estratos.celula]
+    if selecao is not None:
+        pesos[~desempacotar_bits(selecao, estratos.n_linhas)] = 0.0
+    
+    relatorio = {
+        'convergiu': bool(erro < tolerancia),
+        'iteracoes': iteracoes,
+        'erro_maximo': erro,
+        'respondentes': int(total),
+        'celulas': len(ocupadas),
+        'tamanho_efetivo': efetivo,
+        'peso_minimo': float(pesos_celulas.min()) if total else np.nan,
+        'peso_maximo': float(pesos_celulas.max()) if total else np.nan,
+        'margens': resumo_margens(estratos, contagens, codigos, pesos_celulas, alvos),
+    }
+    return pesos, relatorio
+
+def resumo_margens(estratos, contagens, codigos, pesos_celulas, alvos):
+    """Proporções (%) da amostra, da margem e ponderadas por valor de cada variável"""
+    resumo = {}
+    for j, (variavel, valores) in enumerate(zip(estratos.variaveis, estratos.valores)):
+        amostra = np.bincount(codigos[:, j], weights=contagens, minlength=len(valores) + 1)[:-1]
+        ponderado = np.bincount(codigos[:, j], weights=pesos_celulas * contagens, minlength=len(valores) + 1)[:-1]
+        alvo = np.where(amostra > 0, alvos[j][:-1], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # A margem vale para a parcela ajustável (valores com margem)
+            ajustavel = ~np.isnan(alvo)
+            alvo = alvo / np.nansum(alvo) * ponderado[ajustavel].sum() / ponderado.sum() * 100
+            resumo[variavel] = {
+                valor: {
+                    'amostra': float(amostra[k] / amostra.sum() * 100),
+                    'alvo': None if np.isnan(alvo[k]) else float(alvo[k]),
+                    'ponderado': float(ponderado[k] / ponderado.sum() * 100),
+                }
+                for k, valor in enumerate(valores) if amostra[k] > 0
+            }
+    return resumo
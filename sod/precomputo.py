@@ -0,0 +1,101 @@
+"""
+Resultados do estado padrão do dashboard calculados fora do app.
+
+    python -m sod precomputar
+    python -m sod precomputar --remoto
+
+Grava um artefato versionado com o uso das tecnologias (com e sem grupos),
+as categorias, as tabelas cruzadas de todas as variáveis indexadas, a
+co-ocorrência completa e os intervalos de confiança (bootstrap) do uso e
+das tabelas cruzadas para os filtros iniciais da barra lateral. O app
+serve esses resultados enquanto os filtros estiverem no padrão.
+
+A fonte padrão é o CSV do projeto (sem rede); --remoto usa a cópia do
+GitHub, como o app. O artefato é indexado pela versão dos dados, então
+um artefato de outra fonte simplesmente não é usado.
+"""
+import os
+import pickle
+from datetime import datetime, timezone
+
+from .analise import calcular_uso_tecnologias, categorizar_tecnologias
+from .armazenamento import DIRETORIO_APP
+from .bootstrap import intervalos_cruzada, intervalos_uso
+from .coocorrencia import calcular_coocorrencia
+from .cruzadas import calcular_tabela_cruzada
+from .filtros import COLUNAS_INDEXADAS, filtros_padrao
+
+# Incrementar sempre que o conteúdo do artefato mudar de formato
+VERSAO_ARTEFATO = 2
+
+DIRETORIO_PRECOMPUTADO = os.environ.get(
+    'SOD_PRECOMPUTADO_DIR', os.path.join(DIRETORIO_APP, 'precomputado')
+)
+
+def caminho_precomputado(versao_dados, diretorio=None):
+    """Um artefato por versão dos dados (hash da fonte + versão do pipeline)"""
+    nome = f"state_of_data_{versao_dados}_a{VERSAO_ARTEFATO}.pkl"
+    return os.path.join(diretorio or DIRETORIO_PRECOMPUTADO, nome)
+
+def assinatura_padrao(processed_df, indice):
+    """Assinatura dos filtros iniciais, no mesmo formato das chaves de cache do app"""
+    idade_range, filtros = filtros_padrao(processed_df)
+    return (processed_df.attrs.get('versao_dados'), indice.assinatura(idade_range, filtros))
+
+def calcular_precomputado(processed_df, tech_columns, matriz, indice):
+    """Todos os resultados do estado padrão (filtros iniciais, com e sem grupos)"""
+    idade_range, filtros = filtros_padrao(processed_df)
+    selecao = indice.selecionar(idade_range, filtros)
+    
+    uso = {}
+    categorias = {}
+    for usar_grupos in (True, False):
+        uso[usar_grupos] = calcular_uso_tecnologias(matriz, tech_columns, selecao, usar_grupos)
+        categorias[usar_grupos] = categorizar_tecnologias(uso[usar_grupos]) if uso[usar_grupos] is not None else None
+    variaveis = [variavel for variavel in COLUNAS_INDEXADAS if variavel in indice.bitmaps]
+    
+    return {
+        'versao_artefato': VERSAO_ARTEFATO,
+        'versao_dados': processed_df.attrs.get('versao_dados'),
+        'criado_em': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'assinatura': assinatura_padrao(processed_df, indice),
+        'uso': uso,
+        'categorias': categorias,
+        'cruzadas': {
+            variavel: calcular_tabela_cruzada(matriz, indice, variavel, selecao)
+            for variavel in variaveis
+        },
+        'coocorrencia': calcular_coocorrencia(matriz, selecao),
+        'intervalos_uso': intervalos_uso(matriz, selecao),
+        'intervalos_cruzadas': {
+            variavel: intervalos_cruzada(matriz, indice, variavel, selecao)
+            for variavel in variaveis
+        },
+    }
+
+def salvar_precomputado(artefato, diretorio=None):
+    caminho = caminho_precomputado(artefato['versao_dados'], diretorio)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # Escrever em arquivo temporário e renomear (nunca um artefato pela metade)
+    caminho_tmp = f"{caminho}.{os.getpid()}.tmp"
+    with open(caminho_tmp, 'wb') as f:
+        pickle.dump(artefato, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(caminho_tmp, caminho)
+    return caminho
+
+def carregar_precomputado(versao_dados, diretorio=None):
+    """
+    Artefato da versão dos dados, ou None se não houver (ou se for de outro
+    formato ou estiver corrompido): o app então calcula tudo normalmente
+    """
+    caminho = caminho_precomputado(versao_dados, diretorio)
+    if not versao_dados or not os.path.exists(caminho):
+        return None
+    try:
+        with open(caminho, 'rb') as f:
+            artefato = pickle.load(f)
+    except Exception:
+        return None
+    if artefato.get('versao_artefato') != VERSAO_ARTEFATO or artefato.get('versao_dados') != versao_dados:
+        return None
+    return artefato
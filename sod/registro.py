@@ -0,0 +1,21 @@
+"""Mensagens de progresso do carregamento, sem depender da interface"""
+import logging
+
+logger = logging.getLogger('sod')
+
+# Níveis aceitos (os mesmos nomes dos avisos de st.sidebar)
+NIVEIS_LOG = {
+    'info': logging.INFO,
+    'success': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR
+}
+
+def registrar(mensagens, nivel, texto):
+    """
+    Envia a mensagem ao logger do pacote e, se `mensagens` for uma lista,
+    guarda (nivel, texto) para a interface exibir depois
+    """
+    logger.log(NIVEIS_LOG[nivel], texto)
+    if mensagens is not None:
+        mensagens.append((nivel, texto))
@@ -0,0 +1,216 @@
+"""
+Cópia local do CSV remoto, revalidada com requisições condicionais.
+
+A cópia fica em disco com os validadores da última resposta (ETag e
+Last-Modified); cada revalidação manda If-None-Match/If-Modified-Since e,
+se o arquivo não mudou (304), nada é baixado de novo. As requisições
+passam por uma sessão única com pool de conexões, timeouts e novas
+tentativas limitadas; um prazo total (tentativas, esperas entre elas e
+corpo) impede que um servidor lento prenda a sessão do app.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from hashlib import sha256
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .armazenamento import DIRETORIO_APP
+from .registro import registrar
+
+# ============================================================================
+# CONFIGURAÇÃO
+# ============================================================================
+DIRETORIO_DOWNLOAD = os.environ.get(
+    'SOD_DOWNLOAD_DIR', os.path.join(DIRETORIO_APP, '.cache', 'download')
+)
+# (conexão, leitura) em segundos, por tentativa
+TIMEOUT = (3.05, 10)
+# Tempo máximo do download inteiro, incluindo as novas tentativas e as
+# esperas entre elas (recuo e Retry-After)
+PRAZO_DOWNLOAD_S = float(os.environ.get('SOD_DOWNLOAD_PRAZO', 30))
+TENTATIVAS = 2
+# Recuo exponencial entre as tentativas: 0, 1, 2, 4... segundos
+RECUO_S = 0.5
+STATUS_NOVA_TENTATIVA = frozenset({429, 500, 502, 503, 504})
+TAMANHO_BLOCO = 1 << 16
+
+# ============================================================================
+# SESSÃO HTTP
+# ============================================================================
+class SessaoDownload(requests.Session):
+    """
+    Sessão com pool de conexões e o número de novas tentativas dos
+    downloads. As tentativas são feitas por requisitar, e não pelo
+    urllib3, para que as esperas entre elas respeitem o prazo do download
+    """
+    
+    def __init__(self, tentativas=TENTATIVAS):
+        super().__init__()
+        self.tentativas = tentativas
+        adaptador = HTTPAdapter(max_retries=0, pool_connections=4, pool_maxsize=8)
+        self.mount('https://', adaptador)
+        self.mount('http://', adaptador)
+
+def criar_sessao(tentativas=TENTATIVAS):
+    """
+    Sessão para requisitar: novas tentativas (recuo exponencial) em falhas
+    de conexão e nas respostas 429/5xx, com o Retry-After respeitado até
+    o prazo do download
+    """
+    return SessaoDownload(tentativas)
+
+def recuo(tentativa):
+    """Espera depois da tentativa `tentativa` (a primeira nova tentativa é imediata)"""
+    return RECUO_S * 2 ** tentativa if tentativa else 0.0
+
+def esperar(segundos, limite):
+    """Espera antes da próxima tentativa; se ela não couber no prazo, desiste já"""
+    if time.monotonic() + segundos >= limite:
+        raise requests.Timeout("prazo do download esgotado")
+    time.sleep(segundos)
+
+def segundos_retry_after(resposta):
+    """Espera pedida pelo servidor (segundos ou data HTTP), ou None"""
+    valor = resposta.headers.get('Retry-After')
+    if not valor:
+        return None
+    try:
+        return Retry().parse_retry_after(valor)
+    except Exception:
+        return None
+
+def requisitar(sessao, url, cabecalhos, timeout, limite):
+    """
+    GET em streaming com as novas tentativas da sessão. O timeout de cada
+    tentativa é cortado ao tempo que resta, e nenhuma espera passa do
+    prazo: um Retry-After maior que o restante encerra as tentativas. A
+    última resposta 429/5xx é devolvida (quem chama decide o que fazer).
+    """
+    tentativas = getattr(sessao, 'tentativas', 0)
+    conexao, leitura = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    for tentativa in range(tentativas + 1):
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            raise requests.Timeout("prazo do download esgotado")
+        try:
+            resposta = sessao.get(
+                url, headers=cabecalhos, timeout=(min(conexao, restante), min(leitura, restante)), stream=True
+            )
+        except (requests.ConnectionError, requests.Timeout):
+            if tentativa == tentativas:
+                raise
+            esperar(recuo(tentativa), limite)
+            continue
+        if resposta.status_code not in STATUS_NOVA_TENTATIVA or tentativa == tentativas:
+            return resposta
+        espera = segundos_retry_after(resposta)
+        resposta.close()
+        esperar(recuo(tentativa) if espera is None else espera, limite)
+
+_sessao = None
+_lock_sessao = threading.Lock()
+
+def obter_sessao():
+    """Sessão única do processo (reaproveita as conexões entre downloads)"""
+    global _sessao
+    with _lock_sessao:
+        if _sessao is None:
+            _sessao = criar_sessao()
+        return _sessao
+
+# ============================================================================
+# CÓPIA LOCAL
+# ============================================================================
+def caminhos_copia(url, diretorio=None):
+    """Arquivo da cópia e dos seus metadados, um par por URL"""
+    base = os.path.join(diretorio or DIRETORIO_DOWNLOAD, sha256(url.encode('utf-8')).hexdigest()[:16])
+    return f"{base}.csv", f"{base}.json"
+
+def ler_metadados(caminho_meta):
+    try:
+        with open(caminho_meta, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def gravar_atomico(caminho, conteudo):
+    caminho_tmp = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(caminho_tmp, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+    os.replace(caminho_tmp, caminho)
+
+def baixar_para(resposta, caminho, limite):
+    """Grava o corpo da resposta em `caminho` (via temporário), respeitando o prazo"""
+    caminho_tmp = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(caminho_tmp, 'wb') as f:
+            # read1 devolve o que já chegou, então o prazo é conferido mesmo
+            # quando o servidor manda poucos bytes por vez
+            for bloco in iter(lambda: resposta.raw.read1(TAMANHO_BLOCO, decode_content=True), b''):
+                if time.monotonic() > limite:
+                    raise requests.Timeout("prazo do download esgotado")
+                f.write(bloco)
+        os.replace(caminho_tmp, caminho)
+    finally:
+        if os.path.exists(caminho_tmp):
+            os.remove(caminho_tmp)
+
+def obter_copia(url, diretorio=None, revalidar=True, sessao=None, timeout=TIMEOUT,
+                prazo=PRAZO_DOWNLOAD_S, mensagens=None):
+    """
+    Caminho da cópia local de `url`, atualizada se o servidor tiver uma
+    versão nova. Retorna (caminho, situacao), com situacao 'baixada',
+    'validada' (304), 'local' (sem revalidar) ou 'desatualizada' (o
+    servidor não respondeu e a cópia anterior foi mantida); sem rede e
+    sem cópia, retorna (None, 'indisponivel').
+    """
+    caminho, caminho_meta = caminhos_copia(url, diretorio)
+    existe = os.path.exists(caminho)
+    metadados = ler_metadados(caminho_meta) if existe else {}
+    if existe and not revalidar:
+        return caminho, 'local'
+    
+    cabecalhos = {}
+    if metadados.get('etag'):
+        cabecalhos['If-None-Match'] = metadados['etag']
+    if metadados.get('last_modified'):
+        cabecalhos['If-Modified-Since'] = metadados['last_modified']
+    
+    limite = time.monotonic() + prazo
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with requisitar(sessao or obter_sessao(), url, cabecalhos, timeout, limite) as resposta:
+            if resposta.status_code == 304 and existe:
+                situacao = 'validada'
+            else:
+                resposta.raise_for_status()
+                baixar_para(resposta, caminho, limite)
+                metadados = {
+                    'url': url,
+                    'etag': resposta.headers.get('ETag'),
+                    'last_modified': resposta.headers.get('Last-Modified'),
+                    'baixado_em': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                }
+                situacao = 'baixada'
+        metadados['validado_em'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        gravar_atomico(caminho_meta, json.dumps(metadados, ensure_ascii=False))
+    except (requests.RequestException, OSError) as e:
+        if not existe:
+            registrar(mensagens, 'warning', f"⚠️ Não foi possível baixar o dataset: {str(e)[:80]}")
+            return None, 'indisponivel'
+        registrar(
+            mensagens, 'warning',
+            f"⚠️ Servidor indisponível, usando a cópia de {metadados.get('baixado_em', '?')}: {str(e)[:80]}"
+        )
+        return caminho, 'desatualizada'
+    
+    if situacao == 'baixada':
+        registrar(mensagens, 'success', f"📥 Dataset baixado ({os.path.getsize(caminho) / 1024:.0f} KB)")
+    else:
+        registrar(mensagens, 'info', "📂 Cópia local do dataset confirmada pelo servidor (sem download)")
+    return caminho, situacao
@@ -0,0 +1,68 @@
+"""Pesquisas sintéticas com o mesmo layout do CSV original (para benchmarks)"""
+import csv
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from .armazenamento import CAMINHO_CSV_LOCAL
+from .colunas import limpar_nome_coluna
+from .esquema import COLUNAS_DEMOGRAFICAS, ler_cabecalho_csv, nomes_unicos
+
+# Linhas do CSV original (fator 1)
+LINHAS_ORIGINAIS = 2645
+
+# Linhas geradas e gravadas por vez (limita a memória em fatores grandes)
+LINHAS_POR_LOTE = 100_000
+
+def ler_modelo(caminho_csv=CAMINHO_CSV_LOCAL):
+    """Cabeçalho original (com repetições) e a tabela do CSV modelo, tudo como texto"""
+    cabecalho = ler_cabecalho_csv(caminho_csv, 'utf-8')
+    nomes = nomes_unicos([nome.strip() for nome in cabecalho])
+    tabela = pa_csv.read_csv(
+        caminho_csv,
+        read_options=pa_csv.ReadOptions(skip_rows=1, column_names=nomes),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={nome: pa.string() for nome in nomes},
+            strings_can_be_null=True
+        )
+    )
+    return cabecalho, tabela
+
+def gerar_pesquisa_sintetica(destino, fator=1, semente=0, caminho_modelo=CAMINHO_CSV_LOCAL,
+                             linhas=None):
+    """
+    Grava em `destino` uma pesquisa com o cabeçalho do CSV modelo e
+    `fator` vezes o seu número de linhas (ou `linhas`, se informado).
+    Cada variável de perfil é sorteada de forma independente da sua
+    distribuição no modelo (gera combinações novas de filtros); as
+    colunas de tecnologia e de texto livre são sorteadas por linha inteira,
+    preservando as taxas de uso e as co-ocorrências. Retorna o número de
+    linhas gravadas.
+    """
+    cabecalho, modelo = ler_modelo(caminho_modelo)
+    n_modelo = modelo.num_rows
+    total = linhas if linhas is not None else int(round(fator * n_modelo))
+    rng = np.random.default_rng(semente)
+    
+    perfil = [i for i, nome in enumerate(modelo.column_names)
+              if limpar_nome_coluna(nome) in COLUNAS_DEMOGRAFICAS]
+    
+    with open(destino, 'w', encoding='utf-8', newline='') as arquivo:
+        csv.writer(arquivo).writerow(cabecalho)
+        arquivo.flush()
+    
+    with open(destino, 'ab') as arquivo:
+        escritor = pa_csv.CSVWriter(
+            arquivo, modelo.schema, write_options=pa_csv.WriteOptions(include_header=False)
+        )
+        gravadas = 0
+        while gravadas < total:
+            n = min(LINHAS_POR_LOTE, total - gravadas)
+            colunas = modelo.take(rng.integers(0, n_modelo, n)).columns
+            for i in perfil:
+                colunas[i] = modelo.column(i).take(rng.integers(0, n_modelo, n))
+            escritor.write_table(pa.Table.from_arrays(colunas, schema=modelo.schema))
+            gravadas += n
+        escritor.close()
+    return total
@@ -0,0 +1,186 @@
+"""
+Testes de associação entre o uso de cada tecnologia e uma variável.
+
+Todos os testes saem da mesma tabela cruzada: para T tecnologias e
+grupos e V valores da variável, o tensor de contingência T × 2 × V
+(usuários e não usuários por valor) dá de uma vez as frequências
+esperadas, o qui-quadrado, os graus de liberdade e o V de Cramér de
+todas as tecnologias. Tabelas 2 × 2 com frequência esperada abaixo de 5
+usam o teste exato de Fisher, também vetorizado; nas maiores, o
+qui-quadrado fora da regra de Cochran é marcado como aproximado. Os p-valores são
+corrigidos para comparações múltiplas (Benjamini-Hochberg ou Holm).
+
+Os testes usam contagens de respondentes (sem ponderação).
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+ALFA = 0.05
+CORRECOES = {
+    'bh': 'Benjamini-Hochberg',
+    'holm': 'Holm',
+}
+# Frequência esperada mínima para a aproximação do qui-quadrado
+ESPERADO_MINIMO = 5
+ITERACOES_GAMA = 200
+
+# ============================================================================
+# DISTRIBUIÇÕES
+# ============================================================================
+_lgama = np.vectorize(math.lgamma, otypes=[float])
+
+def gama_superior_regularizada(a, x, iteracoes=ITERACOES_GAMA):
+    """
+    Q(a, x) = Γ(a, x) / Γ(a), vetorizada: série de P(a, x) para x < a + 1
+    e fração contínua (Lentz) para o resto
+    """
+    a, x = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(x, dtype=float))
+    q = np.ones(a.shape)
+    serie = (x > 0) & (x < a + 1)
+    fracao = (x > 0) & ~serie
+    
+    if serie.any():
+        aa, xx = a[serie], x[serie]
+        termo = 1.0 / aa
+        soma = termo.copy()
+        for n in range(1, iteracoes + 1):
+            termo = termo * xx / (aa + n)
+            soma += termo
+        q[serie] = 1 - soma * np.exp(aa * np.log(xx) - xx - _lgama(aa))
+    
+    if fracao.any():
+        aa, xx = a[fracao], x[fracao]
+        minimo = 1e-300
+        b = xx + 1 - aa
+        c = np.full(b.shape, 1 / minimo)
+        d = 1 / b
+        h = d.copy()
+        for i in range(1, iteracoes + 1):
+            an = -i * (i - aa)
+            b = b + 2
+            d = an * d + b
+            d = np.where(np.abs(d) < minimo, minimo, d)
+            c = b + an / c
+            c = np.where(np.abs(c) < minimo, minimo, c)
+            d = 1 / d
+            h = h * d * c
+        q[fracao] = np.exp(aa * np.log(xx) - xx - _lgama(aa)) * h
+    return np.clip(q, 0, 1)
+
+def sobrevivencia_qui2(estatistica, gl):
+    """P(X > estatistica) para X ~ qui-quadrado com `gl` graus de liberdade"""
+    return gama_superior_regularizada(np.asarray(gl, dtype=float) / 2, np.asarray(estatistica, dtype=float) / 2)
+
+def fisher_2x2(a, b, c, d):
+    """
+    p-valor bilateral do teste exato de Fisher para as tabelas [[a, b], [c, d]]
+    (vetores): soma das probabilidades hipergeométricas não maiores que a
+    da tabela observada, sobre o suporte de todas as tabelas de uma vez
+    """
+    a, b, c, d = (np.asarray(v, dtype=np.int64) for v in (a, b, c, d))
+    linha, coluna, n = a + b, a + c, a + b + c + d
+    log_fatorial = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, int(n.max(initial=0)) + 1)))])
+    constante = (log_fatorial[linha] + log_fatorial[n - linha] + log_fatorial[coluna]
+                 + log_fatorial[n - coluna] - log_fatorial[n])
+    
+    def log_prob(k, linha, coluna, n):
+        return (-log_fatorial[k] - log_fatorial[linha - k] - log_fatorial[coluna - k]
+                - log_fatorial[n - linha - coluna + k])
+    
+    # Suporte de cada tabela: da menor à maior contagem possível na célula a
+    inicio = np.maximum(0, linha + coluna - n)
+    fim = np.minimum(linha, coluna)
+    suporte = inicio[:, None] + np.arange(int((fim - inicio).max(initial=0)) + 1)
+    valido = suporte <= fim[:, None]
+    suporte = np.where(valido, suporte, inicio[:, None])
+    
+    observada = log_prob(a, linha, coluna, n)
+    grade = log_prob(suporte, linha[:, None], coluna[:, None], n[:, None])
+    extremas = valido & (grade <= observada[:, None] + 1e-7)
+    return np.minimum(np.where(extremas, np.exp(grade + constante[:, None]), 0).sum(axis=1), 1.0)
+
+def ajustar_p(p, metodo='bh'):
+    """
+    p-valores corrigidos para comparações múltiplas (NaN fica de fora):
+    Benjamini-Hochberg (taxa de falsas descobertas) ou Holm (erro de
+    família)
+    """
+    p = np.asarray(p, dtype=float)
+    ajustado = np.full(p.shape, np.nan)
+    validos = np.flatnonzero(~np.isnan(p))
+    m = len(validos)
+    if not m:
+        return ajustado
+    ordem = validos[np.argsort(p[validos], kind='stable')]
+    posicao = np.arange(1, m + 1)
+    if metodo == 'holm':
+        corrigido = np.maximum.accumulate(p[ordem] * (m - posicao + 1))
+    elif metodo == 'bh':
+        corrigido = np.minimum.accumulate((p[ordem] * m / posicao)[::-1])[::-1]
+    else:
+        raise ValueError(f"correção desconhecida: {metodo}")
+    ajustado[ordem] = np.minimum(corrigido, 1.0)
+    return ajustado
+
+# ============================================================================
+# TESTES EM LOTE SOBRE A TABELA CRUZADA
+# ============================================================================
+def testar_associacao(tabela, valores=None, tecnologias=None, correcao='bh', alfa=ALFA):
+    """
+    Associação de cada tecnologia e grupo de uma TabelaCruzada sem
+    ponderação com a variável (apenas `valores`, se dados). Retorna um
+    DataFrame indexado por 'Tecnologia', do maior para o menor V de Cramér.
+    """
+    linhas = [
+        i for i, v in enumerate(tabela.valores)
+        if tabela.tamanhos[i] > 0 and (valores is None or v in valores)
+    ]
+    tecnologias = tabela.colunas if tecnologias is None else [t for t in tecnologias if t in tabela.posicao]
+    colunas = [tabela.posicao[t] for t in tecnologias]
+    
+    # Tensor de contingência: tecnologias × (usa, não usa) × valores
+    usuarios = tabela.contagens[np.ix_(linhas, colunas)].T.astype(float)
+    tamanhos = np.asarray(tabela.tamanhos, dtype=float)[linhas]
+    observado = np.stack([usuarios, tamanhos - usuarios], axis=1)
+    n = tamanhos.sum()
+    totais_linha = observado.sum(axis=2, keepdims=True)
+    esperado = totais_linha * tamanhos[None, None, :] / n if n else np.zeros_like(observado)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        qui2 = np.where(esperado > 0, (observado - esperado) ** 2 / esperado, 0).sum(axis=(1, 2))
+        # Sem variação (ninguém ou todos usam) ou um só valor: não há o que testar
+        testavel = (totais_linha[:, :, 0] > 0).all(axis=1) & (len(linhas) > 1)
+        gl = np.full(len(colunas), len(linhas) - 1)
+        p = np.where(testavel, sobrevivencia_qui2(qui2, np.maximum(gl, 1)), np.nan)
+        cramer = np.where(testavel, np.sqrt(qui2 / n), np.nan)
+        percentuais = usuarios / tamanhos * 100
+    amplitude = np.ptp(percentuais, axis=1) if len(linhas) else np.full(len(colunas), np.nan)
+    
+    # Regra de Cochran: nenhuma esperada < 1 e no máximo 20% abaixo de 5
+    pequenas = esperado < ESPERADO_MINIMO
+    esparsa = testavel & ((esperado < 1).any(axis=(1, 2)) | (pequenas.mean(axis=(1, 2)) > 0.2))
+    teste = np.where(esparsa, 'qui-quadrado (aproximado)', 'qui-quadrado').astype(object)
+    if len(linhas) == 2:
+        # Em 2 × 2, qualquer esperada < 5 leva ao teste exato
+        exata = testavel & pequenas.any(axis=(1, 2))
+        if exata.any():
+            usa, nao_usa = observado[exata, 0], observado[exata, 1]
+            p[exata] = fisher_2x2(usa[:, 0], usa[:, 1], nao_usa[:, 0], nao_usa[:, 1])
+            teste[exata] = 'Fisher (exato)'
+    teste[~testavel] = 'sem variação'
+    
+    ajustado = ajustar_p(p, correcao)
+    resultado = pd.DataFrame({
+        'Teste': teste,
+        'Qui-quadrado': qui2,
+        'GL': gl,
+        'p-valor': p,
+        'p ajustado': ajustado,
+        'V de Cramér': cramer,
+        'Amplitude (pp)': amplitude,
+        'Significativo': ajustado < alfa,
+    }, index=pd.Index(tecnologias, name='Tecnologia'))
+    resultado = resultado[~resultado.index.duplicated()]
+    return resultado.sort_values('V de Cramér', ascending=False, na_position='last', kind='stable')
@@ -0,0 +1,107 @@
+"""
+Impressão digital e relatório de validação do dataset processado.
+
+A impressão digital reúne o hash do conteúdo da fonte, o hash do conjunto
+de colunas (com os tipos), o tipo e a cardinalidade de cada coluna e a
+versão do pipeline. O seu `id` é a versão dos dados usada como chave em
+todos os caches (snapshot, arrays compartilhados, resultados e artefato
+pré-calculado): muda exatamente quando os dados ou a limpeza mudam.
+"""
+import hashlib
+import json
+
+from .armazenamento import VERSAO_PIPELINE
+from .filtros import COLUNAS_INDEXADAS
+
+def hash_json(valor):
+    """SHA-256 da serialização canônica de `valor`"""
+    texto = json.dumps(valor, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+def perfil_colunas(processed_df):
+    """Tipo, cardinalidade e ausentes de cada coluna"""
+    return {
+        col: {
+            'dtype': str(serie.dtype),
+            'cardinalidade': int(serie.nunique(dropna=True)),
+            'nulos': int(serie.isna().sum()),
+        }
+        for col, serie in processed_df.items()
+    }
+
+def calcular_impressao(processed_df, tech_columns, hash_conteudo):
+    """Impressão digital do dataset processado a partir do CSV com hash `hash_conteudo`"""
+    colunas = perfil_colunas(processed_df)
+    impressao = {
+        'versao_pipeline': VERSAO_PIPELINE,
+        'hash_conteudo': hash_conteudo,
+        'hash_colunas': hash_json([[col, perfil['dtype']] for col, perfil in colunas.items()]),
+        'linhas': len(processed_df),
+        'tecnologias': list(tech_columns),
+        'colunas': colunas,
+    }
+    impressao['id'] = hash_json(impressao)[:16]
+    return impressao
+
+def conferir_estrutura(impressao, processed_df, tech_columns, n_linhas=None):
+    """
+    Confere um dataset restaurado (snapshot ou arrays compartilhados) com a
+    impressão gravada junto: número de linhas, tecnologias e tipo de cada
+    coluna presente. As colunas de tecnologia podem faltar no DataFrame
+    quando estão só na matriz de bits.
+    """
+    if not impressao or impressao.get('versao_pipeline') != VERSAO_PIPELINE:
+        return False
+    if (n_linhas if n_linhas is not None else len(processed_df)) != impressao['linhas']:
+        return False
+    if list(tech_columns) != impressao['tecnologias']:
+        return False
+    colunas = impressao['colunas']
+    ausentes = set(colunas) - set(processed_df.columns) - set(tech_columns)
+    if ausentes:
+        return False
+    return all(
+        col in colunas and str(serie.dtype) == colunas[col]['dtype']
+        for col, serie in processed_df.items()
+    )
+
+def montar_relatorio(relatorio_leitura, relatorio_tecnologias, impressao):
+    """
+    Relatório de validação: linhas descartadas na leitura, colunas fora do
+    esquema, colunas de tecnologia não mapeadas ou não convertidas e os
+    problemas que impedem o uso do dataset (`erros`) ou merecem atenção
+    (`avisos`)
+    """
+    erros = []
+    avisos = []
+    if impressao['linhas'] == 0:
+        erros.append("nenhuma linha lida")
+    if not impressao['tecnologias']:
+        erros.append("nenhuma coluna de tecnologia reconhecida")
+    # Colunas derivadas (regiao, faixa_etaria) dependem de UF e Idade
+    faltando = [col for col in COLUNAS_INDEXADAS if col not in impressao['colunas']]
+    if faltando:
+        avisos.append(f"variáveis de perfil ausentes: {', '.join(faltando)}")
+    if relatorio_leitura['linhas_descartadas']:
+        avisos.append(f"{relatorio_leitura['linhas_descartadas']} linhas malformadas descartadas")
+    if relatorio_tecnologias.get('falhas_conversao'):
+        avisos.append(f"{len(relatorio_tecnologias['falhas_conversao'])} colunas de tecnologia não convertidas")
+    
+    return {
+        'id': impressao['id'],
+        'encoding': relatorio_leitura['encoding'],
+        'linhas_lidas': relatorio_leitura['linhas_lidas'],
+        'linhas_descartadas': relatorio_leitura['linhas_descartadas'],
+        'amostra_linhas_descartadas': relatorio_leitura['amostra_linhas_descartadas'],
+        'colunas_fora_do_esquema': relatorio_leitura['colunas_fora_do_esquema'],
+        'tecnologias': {
+            'reconhecidas': len(impressao['tecnologias']),
+            'nao_reconhecidas': relatorio_tecnologias.get('nao_reconhecidas', []),
+            'ambiguas': relatorio_tecnologias.get('ambiguas', {}),
+            'repetidas': relatorio_tecnologias.get('repetidas', {}),
+            'falhas_conversao': relatorio_tecnologias.get('falhas_conversao', {}),
+            'valores_invalidos': relatorio_tecnologias.get('valores_invalidos', {}),
+        },
+        'erros': erros,
+        'avisos': avisos,
+    }
@@ -0,0 +1,9 @@
+import pytest
+
+from sod.armazenamento import CAMINHO_CSV_LOCAL
+from sod.carga import carregar_dataset
+
+@pytest.fixture(scope='session')
+def dataset():
+    """(processed_df, tech_columns, matriz, indice) do CSV do projeto, lido do zero"""
+    return carregar_dataset(CAMINHO_CSV_LOCAL, usar_snapshot=False, usar_compartilhado=False)
@@ -0,0 +1,80 @@
+"""
+Arrays publicados para as outras réplicas: anexar o arquivo devolve o
+mesmo DataFrame de perfil e o mesmo índice de filtros de uma carga do
+zero, com os valores no tipo original.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sod import armazenamento
+from sod.armazenamento import anexar_arrays, publicar_arrays
+from sod.bits import TechMatrix
+from sod.filtros import IndiceFiltros
+
+VALIDACAO = {'impressao': {'id': 'teste'}, 'relatorio': {'avisos': []}}
+
+@pytest.fixture(autouse=True)
+def diretorio_compartilhado(tmp_path, monkeypatch):
+    monkeypatch.setattr(armazenamento, 'DIRETORIO_COMPARTILHADO', str(tmp_path))
+
+def conferir_indice(anexado, original):
+    assert anexado.n_linhas == original.n_linhas
+    assert anexado.completa == original.completa
+    assert list(anexado.bitmaps) == list(original.bitmaps)
+    for col, mapa in original.bitmaps.items():
+        valores = list(anexado.bitmaps[col])
+        assert valores == list(mapa), col
+        assert [type(v) for v in valores] == [type(v) for v in pd.Index(list(mapa))], col
+        for valor, bits in mapa.items():
+            np.testing.assert_array_equal(anexado.bitmaps[col][valor], bits)
+    np.testing.assert_array_equal(anexado.idade, original.idade)
+    np.testing.assert_array_equal(anexado.idades, original.idades)
+    np.testing.assert_array_equal(anexado.prefixos_idade, original.prefixos_idade)
+
+def publicar_e_anexar(df, tech_columns, matriz, indice):
+    publicar_arrays(df, tech_columns, matriz, indice, 'hash-teste', VALIDACAO)
+    anexado = anexar_arrays('hash-teste')
+    assert anexado is not None
+    return anexado
+
+def test_csv_do_projeto(dataset):
+    df, tech_columns, matriz, indice = dataset
+    anexado_df, anexado_tech, anexada, anexado_indice, validacao = publicar_e_anexar(*dataset)
+    
+    assert anexado_tech == tech_columns
+    assert validacao == VALIDACAO
+    np.testing.assert_array_equal(anexada.palavras, matriz.palavras)
+    pd.testing.assert_frame_equal(anexado_df, df.drop(columns=tech_columns))
+    conferir_indice(anexado_indice, indice)
+    # Filtros por faixa etária (categoria ordenada) selecionam as mesmas pessoas
+    filtros = {'faixa_etaria': ['25-34', '55+'], 'UF': ['SP']}
+    np.testing.assert_array_equal(anexado_indice.selecionar((20, 40), filtros), indice.selecionar((20, 40), filtros))
+
+def test_dimensoes_nao_textuais():
+    df = pd.DataFrame({
+        'Idade': [20.0, np.nan, 31.0, 45.0, 31.0],
+        # Categorias inteiras e chaves numéricas do índice (coluna não categórica)
+        'nivel': pd.Categorical([3, 1, None, 2, 3], categories=[1, 2, 3], ordered=True),
+        'codigo': np.array([10, 20, 10, 30, 20], dtype=np.int64),
+        'UF': pd.Categorical(['SP', 'RJ', 'SP', None, 'MG']),
+        'Python': np.array([1, 0, 1, 1, 0], dtype=np.int8),
+    })
+    matriz = TechMatrix.de_dataframe(df, ['Python'])
+    indice = IndiceFiltros(df, colunas=['nivel', 'codigo', 'UF'])
+    anexado_df, _, _, anexado_indice, _ = publicar_e_anexar(df, ['Python'], matriz, indice)
+    
+    assert anexado_df['nivel'].cat.categories.dtype == np.int64
+    pd.testing.assert_series_equal(anexado_df['nivel'], df['nivel'])
+    conferir_indice(anexado_indice, indice)
+    assert anexado_indice.valores('codigo') == [10, 20, 30]
+    np.testing.assert_array_equal(
+        anexado_indice.selecionar(filtros={'nivel': [3], 'codigo': [10]}),
+        indice.selecionar(filtros={'nivel': [3], 'codigo': [10]})
+    )
+
+def test_valores_nao_suportados():
+    df = pd.DataFrame({'misto': pd.Categorical(['a', 1, 'a'])})
+    matriz = TechMatrix.de_dataframe(df.assign(Python=np.int8(1)), ['Python'])
+    with pytest.raises(TypeError):
+        publicar_arrays(df, [], matriz, IndiceFiltros(df, colunas=[]), 'hash-teste', VALIDACAO)
@@ -0,0 +1,90 @@
+"""
+Empacotamento em palavras uint64 e popcount: ida e volta com números de
+respondentes que não são múltiplos de 64, e contagens da TechMatrix
+iguais às do DataFrame denso.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sod.bits import TechMatrix, bits_das_linhas, desempacotar_bits, empacotar_bits, popcount
+
+LINHAS = [1, 7, 63, 64, 65, 127, 129, 2645]
+
+@pytest.mark.parametrize('n', LINHAS)
+def test_ida_e_volta(n):
+    rng = np.random.default_rng(n)
+    mascara = rng.random((3, n)) < 0.3
+    
+    palavras = empacotar_bits(mascara)
+    assert palavras.dtype == np.uint64
+    assert palavras.shape == (3, (n + 63) // 64)
+    np.testing.assert_array_equal(desempacotar_bits(palavras, n), mascara)
+    # Bits de preenchimento da última palavra ficam desligados
+    np.testing.assert_array_equal(popcount(palavras), mascara.sum(axis=1))
+    
+    linhas = rng.integers(0, n, 20)
+    np.testing.assert_array_equal(bits_das_linhas(palavras, linhas), mascara[:, linhas])
+
+@pytest.mark.parametrize('n', LINHAS)
+def test_popcount_igual_a_count_nonzero(n):
+    rng = np.random.default_rng(n)
+    for densidade in (0.0, 0.01, 0.5, 1.0):
+        mascara = rng.random((5, n)) < densidade
+        palavras = empacotar_bits(mascara)
+        np.testing.assert_array_equal(popcount(palavras), np.count_nonzero(mascara, axis=1))
+        # AND de seleções: mesma contagem que o AND das máscaras
+        np.testing.assert_array_equal(
+            popcount(palavras & palavras[0]), np.count_nonzero(mascara & mascara[0], axis=1)
+        )
+
+def test_popcount_em_palavras_cheias():
+    palavras = np.array([0, 1, 2 ** 63, 2 ** 64 - 1], dtype=np.uint64)
+    assert [int(popcount(p[None])) for p in palavras] == [0, 1, 1, 64]
+
+@pytest.fixture
+def df_tecnologias():
+    rng = np.random.default_rng(0)
+    n = 1001
+    return pd.DataFrame({
+        'Python': (rng.random(n) < 0.6).astype(np.int8),
+        'SQL': (rng.random(n) < 0.7).astype(np.int8),
+        'R': (rng.random(n) < 0.1).astype(np.int8),
+        'Scala': np.zeros(n, dtype=np.int8),
+        'UF': rng.choice(['SP', 'RJ'], n),
+    })
+
+def test_contagens_da_techmatrix(df_tecnologias):
+    df = df_tecnologias
+    tech_columns = ['Python', 'SQL', 'R', 'Scala', 'UF']
+    matriz = TechMatrix.de_dataframe(df, tech_columns)
+    
+    # Só as colunas numéricas entram na matriz
+    assert matriz.colunas == ['Python', 'SQL', 'R', 'Scala']
+    assert matriz.n_linhas == len(df)
+    np.testing.assert_array_equal(matriz.contagens(), df[matriz.colunas].sum().to_numpy())
+    np.testing.assert_array_equal(matriz.desempacotar(), df[matriz.colunas].to_numpy())
+    
+    mascara = (df['UF'] == 'SP').to_numpy()
+    selecao = matriz.selecao_de_mascara(mascara)
+    assert matriz.total(selecao) == mascara.sum()
+    np.testing.assert_array_equal(
+        matriz.contagens(selecao), df.loc[mascara, matriz.colunas].sum().to_numpy()
+    )
+    assert matriz.contagem('R', selecao) == df.loc[mascara, 'R'].sum()
+    # Tecnologias fora da matriz (Julia) são ignoradas
+    usa_alguma = (df.loc[mascara, ['R', 'Scala']] == 1).any(axis=1).sum()
+    assert matriz.contagem_qualquer(['R', 'Scala', 'Julia'], selecao) == usa_alguma
+    np.testing.assert_array_equal(matriz.selecao_de_indices(np.flatnonzero(mascara)), selecao)
+    np.testing.assert_array_equal(matriz.desempacotar(selecao), df.loc[mascara, matriz.colunas].to_numpy())
+
+def test_contagens_ponderadas(df_tecnologias):
+    df = df_tecnologias
+    matriz = TechMatrix.de_dataframe(df, ['Python', 'SQL', 'R'])
+    pesos = np.random.default_rng(1).random(len(df))
+    mascara = (df['UF'] == 'RJ').to_numpy()
+    selecao = matriz.selecao_de_mascara(mascara)
+    
+    esperado = (df.loc[mascara, matriz.colunas].to_numpy() * pesos[mascara, None]).sum(axis=0)
+    np.testing.assert_allclose(matriz.contagens(selecao, pesos=pesos), esperado, rtol=1e-5)
+    assert matriz.total(selecao, pesos=pesos) == pytest.approx(pesos[mascara].sum(), rel=1e-6)
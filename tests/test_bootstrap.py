@@ -0,0 +1,72 @@
+"""
+intervalos_phi sobre uma pesquisa sintética 10×: o intervalo de cada par
+contém a correlação phi calculada diretamente das colunas 0/1, e a
+semente fixa repete o resultado.
+"""
+import numpy as np
+import pytest
+
+from sod.bootstrap import NIVEL, intervalos_phi, lotes_pesos
+from sod.carga import carregar_dataset
+from sod.cruzadas import bloco_com_grupos
+from sod.sintetico import gerar_pesquisa_sintetica
+
+TECNOLOGIAS = ['Python', 'R', 'SQL (linguagem, dados relacionais e bancos)', 'AWS (serviços diversos)']
+REAMOSTRAGENS = 300
+
+@pytest.fixture(scope='module')
+def matriz(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp('sintetico') / 'pesquisa_10x.csv'
+    gerar_pesquisa_sintetica(caminho, fator=10, semente=1)
+    _, _, matriz, _ = carregar_dataset(str(caminho), usar_snapshot=False, usar_compartilhado=False)
+    return matriz
+
+def phi_direto(matriz, nomes):
+    """phi de cada par = correlação de Pearson das colunas 0/1, em float64"""
+    bloco, todos = bloco_com_grupos(matriz)
+    posicao = {nome: i for i, nome in enumerate(todos)}
+    return np.corrcoef(bloco[:, [posicao[nome] for nome in nomes]].astype(np.float64), rowvar=False)
+
+def intervalos_phi_float64(matriz, nomes, reamostragens, semente=0):
+    """Referência: as mesmas reamostragens, com somas e fórmula em float64"""
+    bloco, todos = bloco_com_grupos(matriz)
+    posicao = {nome: i for i, nome in enumerate(todos)}
+    bloco = bloco[:, [posicao[nome] for nome in nomes]].astype(np.float64)
+    i, j = np.triu_indices(len(nomes), k=1)
+    estimativas = []
+    for pesos in lotes_pesos(len(bloco), reamostragens, semente):
+        pesos = pesos.astype(np.float64)
+        n = pesos.sum(axis=1)[:, None]
+        somas = pesos @ bloco
+        ni, nj, nij = somas[:, i], somas[:, j], pesos @ (bloco[:, i] * bloco[:, j])
+        estimativas.append((n * nij - ni * nj) / np.sqrt(ni * (n - ni) * nj * (n - nj)))
+    alfa = (1 - NIVEL) / 2 * 100
+    return np.percentile(np.concatenate(estimativas), [alfa, 100 - alfa], axis=0)
+
+def test_intervalo_contem_o_phi_direto(matriz):
+    assert matriz.n_linhas == 10 * 2645
+    inferior, superior = intervalos_phi(matriz, TECNOLOGIAS, reamostragens=REAMOSTRAGENS)
+    assert list(inferior.index) == TECNOLOGIAS
+    direto = phi_direto(matriz, TECNOLOGIAS)
+    
+    i, j = np.triu_indices(len(TECNOLOGIAS), k=1)
+    inf, sup, phi = inferior.values[i, j], superior.values[i, j], direto[i, j]
+    assert np.all(inf <= phi) and np.all(phi <= sup)
+    # ~26 mil respondentes: intervalos estreitos e centrados no phi da amostra
+    assert np.all(sup - inf < 0.06)
+    np.testing.assert_allclose((inf + sup) / 2, phi, atol=0.01)
+    np.testing.assert_array_equal(np.diag(inferior.values), 1)
+    
+    # Mesmas reamostragens em float64 do começo ao fim: só arredondamento
+    referencia_inf, referencia_sup = intervalos_phi_float64(matriz, TECNOLOGIAS, REAMOSTRAGENS)
+    np.testing.assert_allclose(inf, referencia_inf, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(sup, referencia_sup, rtol=0, atol=1e-9)
+
+def test_semente_fixa_repete_o_resultado(matriz):
+    primeira = intervalos_phi(matriz, TECNOLOGIAS, reamostragens=REAMOSTRAGENS, semente=7)
+    segunda = intervalos_phi(matriz, TECNOLOGIAS, reamostragens=REAMOSTRAGENS, semente=7)
+    outra = intervalos_phi(matriz, TECNOLOGIAS, reamostragens=REAMOSTRAGENS, semente=8)
+    
+    for a, b in zip(primeira, segunda):
+        np.testing.assert_array_equal(a.values, b.values)
+    assert not np.array_equal(primeira[0].values, outra[0].values)
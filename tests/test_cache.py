@@ -0,0 +1,156 @@
+"""
+CacheResultados: descarte LRU dentro do limite de bytes, resultados
+fixados, camada em disco (acertos depois de recriar o cache, arquivos
+ilegíveis, limite e versões dos dados) e acesso simultâneo.
+"""
+import os
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sod.cache import CacheResultados, arquivos_cache, tamanho_aproximado
+
+def bloco(n, valor=0):
+    """Resultado de exatamente n bytes"""
+    return np.full(n, valor, dtype=np.uint8)
+
+def test_tamanho_conta_texto_e_atributos():
+    textos = pd.DataFrame({'Tecnologia': ['x' * 1000] * 10, 'Uso (%)': np.zeros(10)})
+    assert tamanho_aproximado(textos) > 10 * 1000
+    
+    class Resultado:
+        def __init__(self):
+            self.contagens = bloco(5000)
+            self.nomes = ['y' * 500] * 4
+            self.mesma = self.contagens
+    # Arrays e textos dentro do objeto, o array compartilhado uma vez só
+    assert 5000 + 500 < tamanho_aproximado(Resultado()) < 2 * 5000
+
+def test_descarta_o_menos_usado():
+    cache = CacheResultados(limite_bytes=300)
+    for chave in 'abc':
+        cache.guardar(chave, bloco(100))
+    assert cache.obter('a') is not None  # 'a' passa a ser o mais recente
+    cache.guardar('d', bloco(100))
+    
+    assert cache.obter('b') is None
+    assert all(cache.obter(chave) is not None for chave in 'acd')
+    assert cache.estatisticas()['bytes'] == 300
+    # Maior que o limite inteiro: não entra nem descarta os outros
+    cache.guardar('grande', bloco(301))
+    assert cache.obter('grande') is None and cache.obter('c') is not None
+
+def test_fixados_sobrevivem_ao_descarte():
+    cache = CacheResultados(limite_bytes=200)
+    cache.fixar('padrao', bloco(150))
+    for i in range(10):
+        cache.guardar(i, bloco(100))
+    
+    assert cache.obter('padrao') is not None
+    assert cache.estatisticas()['fixos'] == 1
+    assert cache.estatisticas()['bytes'] <= 200
+
+def test_obter_ou_calcular_anota_a_origem(tmp_path):
+    cache = CacheResultados(1 << 20, str(tmp_path), versao='v1')
+    chamadas = []
+    def calcular():
+        chamadas.append(1)
+        return bloco(10, 7)
+    
+    origens = []
+    for _ in range(2):
+        medicao = {}
+        cache.obter_ou_calcular(('uso', 1), calcular, medicao)
+        origens.append(medicao['cache'])
+    assert origens == ['falha', 'memoria'] and len(chamadas) == 1
+    
+    medicao = {}
+    novo = CacheResultados(1 << 20, str(tmp_path), versao='v1')
+    np.testing.assert_array_equal(novo.obter_ou_calcular(('uso', 1), calcular, medicao), bloco(10, 7))
+    assert medicao['cache'] == 'disco' and len(chamadas) == 1
+
+def test_acerto_em_disco_depois_de_recriar(tmp_path):
+    tabela = pd.DataFrame({'Tecnologia': ['Python', 'R'], 'Uso (%)': [51.0, 11.6]})
+    CacheResultados(1 << 20, str(tmp_path), versao='v1').guardar(('uso', 'assinatura'), tabela)
+    
+    novo = CacheResultados(1 << 20, str(tmp_path), versao='v1')
+    pd.testing.assert_frame_equal(novo.obter(('uso', 'assinatura')), tabela)
+    assert novo.estatisticas()['acertos_disco'] == 1
+    # Depois do disco, o resultado fica em memória
+    novo.obter(('uso', 'assinatura'))
+    assert novo.estatisticas()['acertos'] == 1
+
+def test_arquivo_truncado_e_falha(tmp_path):
+    cache = CacheResultados(1 << 20, str(tmp_path), versao='v1')
+    cache.guardar('chave', bloco(1000))
+    caminho = cache._caminho('chave')
+    with open(caminho, 'r+b') as f:
+        f.truncate(os.path.getsize(caminho) // 2)
+    
+    novo = CacheResultados(1 << 20, str(tmp_path), versao='v1')
+    assert novo.obter('chave') is None
+    assert novo.estatisticas()['falhas'] == 1
+    # O arquivo ilegível sai; o próximo cálculo grava de novo
+    assert not os.path.exists(caminho)
+    assert novo.obter_ou_calcular('chave', lambda: bloco(3)).nbytes == 3
+    assert CacheResultados(1 << 20, str(tmp_path), versao='v1').obter('chave') is not None
+
+def test_resultado_sem_pickle_fica_so_em_memoria(tmp_path):
+    cache = CacheResultados(1 << 20, str(tmp_path), versao='v1')
+    valor = {'formatar': lambda x: f"{x:.1f}"}
+    
+    assert cache.obter_ou_calcular('lambda', lambda: valor) is valor
+    assert cache.obter('lambda') is valor
+    # Nem o resultado nem o temporário ficam em disco
+    assert os.listdir(cache.diretorio) == []
+
+def test_outras_versoes_sao_apagadas(tmp_path):
+    CacheResultados(1 << 20, str(tmp_path), versao='v1').guardar('chave', bloco(10))
+    with open(tmp_path / 'formato_antigo.pkl', 'wb') as f:
+        pickle.dump(('chave', 1), f)
+    
+    cache = CacheResultados(1 << 20, str(tmp_path), versao='v2')
+    assert os.listdir(tmp_path) == ['dados_v2']
+    assert cache.obter('chave') is None
+
+def test_limite_do_disco(tmp_path):
+    cache = CacheResultados(1 << 20, str(tmp_path), versao='v1', limite_disco_bytes=20_000)
+    for i in range(30):
+        cache.guardar(i, bloco(1000))
+        # mtime distinto por arquivo: o acesso mais antigo sai primeiro
+        os.utime(cache._caminho(i), (i, i))
+    
+    arquivos = arquivos_cache(cache.diretorio)
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    assert total <= 20_000
+    assert cache.estatisticas()['bytes_disco'] == total
+    novo = CacheResultados(1 << 20, str(tmp_path), versao='v1', limite_disco_bytes=20_000)
+    assert novo.obter(29) is not None
+    assert novo.obter(0) is None
+
+def test_acesso_simultaneo(tmp_path):
+    cache = CacheResultados(limite_bytes=50 * 100, diretorio=str(tmp_path), versao='v1')
+    erros = []
+    
+    def sessao(semente):
+        rng = np.random.default_rng(semente)
+        try:
+            for _ in range(300):
+                chave = int(rng.integers(0, 80))
+                valor = cache.obter_ou_calcular(chave, lambda: bloco(100, chave % 256))
+                assert valor[0] == chave % 256
+        except Exception as e:
+            erros.append(e)
+    
+    threads = [threading.Thread(target=sessao, args=(semente,)) for semente in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert erros == []
+    estatisticas = cache.estatisticas()
+    assert estatisticas['bytes'] <= 50 * 100
+    assert estatisticas['bytes'] == 100 * estatisticas['itens']
+    assert estatisticas['acertos'] + estatisticas['acertos_disco'] + estatisticas['falhas'] == 8 * 300
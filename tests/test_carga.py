@@ -0,0 +1,80 @@
+"""
+Fonte do dataset na carga: com cópia local do GitHub, os dados são lidos
+dela sem esperar a rede e a revalidação só começa depois da carga; sem
+cópia (ou na CLI), a cópia é revalidada antes.
+"""
+import os
+import shutil
+
+import pytest
+
+from sod import carga
+from sod.armazenamento import CAMINHO_CSV_LOCAL
+from sod.remoto import caminhos_copia
+
+class Rede:
+    """obter_copia de teste: anota as chamadas e "baixa" o CSV do projeto"""
+    
+    def __init__(self, copia):
+        self.copia = copia
+        self.eventos = []
+        self.revalidacoes = []
+    
+    def obter_copia(self, url, revalidar=True, mensagens=None):
+        self.eventos.append(('rede', revalidar))
+        if not revalidar:
+            return self.copia, 'local'
+        if not os.path.exists(self.copia):
+            shutil.copyfile(CAMINHO_CSV_LOCAL, self.copia)
+            return self.copia, 'baixada'
+        return self.copia, 'validada'
+
+@pytest.fixture
+def rede(tmp_path, monkeypatch):
+    rede = Rede(caminhos_copia(carga.GITHUB_URL, str(tmp_path))[0])
+    ler_csv = carga.ler_csv_com_esquema
+    iniciar = carga.iniciar_revalidacao
+    
+    def ler_csv_com_esquema(caminho, **kwargs):
+        rede.eventos.append(('leitura', caminho))
+        return ler_csv(caminho, **kwargs)
+    
+    monkeypatch.setattr(carga, 'REMOTO_ATIVO', True)
+    monkeypatch.setattr('sod.remoto.DIRETORIO_DOWNLOAD', str(tmp_path))
+    monkeypatch.setattr(carga, 'obter_copia', rede.obter_copia)
+    monkeypatch.setattr(carga, 'ler_csv_com_esquema', ler_csv_com_esquema)
+    monkeypatch.setattr(carga, 'iniciar_revalidacao', lambda: rede.revalidacoes.append(iniciar()))
+    return rede
+
+def carregar(**kwargs):
+    return carga.carregar_dataset(usar_snapshot=False, usar_compartilhado=False, **kwargs)
+
+def test_com_copia_local_revalida_depois_da_carga(rede):
+    shutil.copyfile(CAMINHO_CSV_LOCAL, rede.copia)
+    carregar()
+    assert len(rede.revalidacoes) == 1
+    rede.revalidacoes[0].join(5)
+    
+    assert rede.eventos == [('rede', False), ('leitura', rede.copia), ('rede', True)]
+
+def test_sem_copia_local_baixa_antes(rede):
+    carregar()
+    
+    assert rede.eventos == [('rede', True), ('leitura', rede.copia)]
+    assert rede.revalidacoes == []
+
+def test_cli_revalida_antes(rede):
+    shutil.copyfile(CAMINHO_CSV_LOCAL, rede.copia)
+    carregar(revalidar_em_segundo_plano=False)
+    
+    assert rede.eventos == [('rede', True), ('leitura', rede.copia)]
+    assert rede.revalidacoes == []
+
+def test_revalida_mesmo_se_a_carga_falhar(rede):
+    with open(rede.copia, 'w', encoding='utf-8') as f:
+        f.write("coluna\n1\n")
+    with pytest.raises(carga.DatasetIndisponivel):
+        carregar()
+    rede.revalidacoes[0].join(5)
+    # Uma cópia inválida também é renovada em segundo plano
+    assert rede.eventos[-1] == ('rede', True)
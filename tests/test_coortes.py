@@ -0,0 +1,71 @@
+"""
+comparar_coortes contra um groupby do pandas no DataFrame processado:
+usuários, uso e diferença de cada tecnologia e grupo nas duas coortes.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sod.bits import empacotar_bits
+from sod.colunas import limpar_nome_coluna
+from sod.coortes import comparar_coortes, complemento
+from sod.grupos import compilar_grupos
+
+@pytest.fixture(scope='module')
+def uso_por_respondente(dataset):
+    """Tecnologias e grupos (usa pelo menos uma) por respondente, como na coluna 'Tecnologia'"""
+    df, tech_columns, matriz, _ = dataset
+    grupos = compilar_grupos(tuple(matriz.colunas))
+    # Nomes repetidos (sufixos .1): fica a primeira coluna, como no resultado
+    colunas = {limpar_nome_coluna(col): df[col].astype(bool) for col in reversed(tech_columns)}
+    for nome, membros in zip(grupos.nomes, grupos.membros):
+        colunas[nome] = df[[matriz.colunas[i] for i in membros]].astype(bool).any(axis=1)
+    return pd.DataFrame(colunas)
+
+def conferir(resultado, esperado_a, esperado_b, n_a, n_b):
+    resultado = resultado.loc[esperado_a.index]
+    np.testing.assert_array_equal(resultado['Usuários A'], esperado_a)
+    np.testing.assert_array_equal(resultado['Usuários B'], esperado_b)
+    np.testing.assert_allclose(resultado['Uso A (%)'], esperado_a / n_a * 100)
+    np.testing.assert_allclose(resultado['Uso B (%)'], esperado_b / n_b * 100)
+    np.testing.assert_allclose(resultado['Diferença (pp)'], (esperado_a / n_a - esperado_b / n_b) * 100, atol=1e-9)
+
+def test_coortes_disjuntas_contra_groupby(dataset, uso_por_respondente):
+    df, _, matriz, _ = dataset
+    sudeste = (df['regiao'] == 'Sudeste').to_numpy()
+    selecao = empacotar_bits(sudeste)
+    resultado = comparar_coortes(matriz, selecao, complemento(matriz, selecao))
+    
+    por_coorte = uso_por_respondente.groupby(np.where(sudeste, 'A', 'B')).sum()
+    tamanhos = pd.Series(sudeste).value_counts()
+    assert len(resultado) == uso_por_respondente.shape[1]
+    assert resultado.attrs == {
+        'tamanho_a': tamanhos[True], 'tamanho_b': tamanhos[False], 'sobreposicao': 0
+    }
+    conferir(resultado, por_coorte.loc['A'], por_coorte.loc['B'], tamanhos[True], tamanhos[False])
+    # Da maior para a menor diferença absoluta
+    assert resultado['Diferença (pp)'].abs().is_monotonic_decreasing
+
+def test_coortes_sobrepostas(dataset, uso_por_respondente):
+    df, _, matriz, _ = dataset
+    a = (df['Senioridade'] == 'Sênior').to_numpy()
+    b = (df['UF'] == 'SP').to_numpy()
+    resultado = comparar_coortes(matriz, empacotar_bits(a), empacotar_bits(b))
+    
+    assert resultado.attrs['sobreposicao'] == int((a & b).sum())
+    conferir(resultado, uso_por_respondente[a].sum(), uso_por_respondente[b].sum(), a.sum(), b.sum())
+
+def test_coortes_ponderadas(dataset, uso_por_respondente):
+    df, _, matriz, _ = dataset
+    a = (df['Gênero'] == 'Feminino').to_numpy()
+    rng = np.random.default_rng(0)
+    pesos = rng.uniform(0.5, 2.0, len(df))
+    resultado = comparar_coortes(matriz, empacotar_bits(a), empacotar_bits(~a), pesos=(pesos, pesos))
+    
+    esperado_a = uso_por_respondente[a].mul(pesos[a], axis=0).sum() / pesos[a].sum() * 100
+    esperado_b = uso_por_respondente[~a].mul(pesos[~a], axis=0).sum() / pesos[~a].sum() * 100
+    resultado = resultado.loc[esperado_a.index]
+    np.testing.assert_allclose(resultado['Uso A (%)'], esperado_a, rtol=1e-5)
+    np.testing.assert_allclose(resultado['Uso B (%)'], esperado_b, rtol=1e-5)
+    # Os testes continuam sobre as contagens de respondentes
+    np.testing.assert_array_equal(resultado['Usuários A'], uso_por_respondente[a].sum())
@@ -0,0 +1,85 @@
+"""
+Detecção das colunas de tecnologia pelo manifesto compilado: variações
+de nome reconhecidas, colunas de perfil ignoradas, e as colunas e
+contagens por grupo fixadas para o CSV do projeto.
+"""
+import pytest
+
+from sod.analise import calcular_uso_tecnologias
+from sod.esquema import DETECTOR_TECNOLOGIAS, DetectorTecnologias
+
+# Colunas detectadas no CSV do projeto, na ordem do manifesto
+TECNOLOGIAS_CSV = [
+    'SQL', 'R', 'Python', 'C/C++/C#', '.NET', 'Java', 'Julia', 'SAS/Stata', 'Visual Basic/VBA',
+    'Scala', 'Matlab', 'PHP', 'Javascript', 'Não utilizo nenhuma linguagem',
+    'Dados relacionais', 'Dados em bancos NoSQL', 'Imagens', 'Textos/Documentos', 'Vídeos',
+    'Áudios', 'Planilhas', 'Dados georeferenciados',
+    'MySQL', 'Oracle', 'SQL SERVER', 'SAP', 'Amazon Aurora ou RDS', 'Amazon DynamoDB', 'CoachDB',
+    'Cassandra', 'MongoDB', 'MariaDB', 'Datomic', 'S3', 'PostgreSQL', 'ElasticSearch', 'DB2',
+    'Microsoft Access', 'SQLite', 'Sybase', 'Firebase', 'Vertica', 'Redis', 'Neo4J',
+    'Google BigQuery', 'Google Firestore', 'Amazon Redshift', 'Amazon Athena', 'Snowflake',
+    'Databricks', 'HBase', 'Presto', 'Splunk', 'SAP HANA', 'Hive', 'Firebird',
+    'AWS', 'Google Cloud', 'Azure', 'Oracle Cloud', 'IBM',
+    'Servidores On Premise/Não utilizamos Cloud', 'Cloud Própria',
+]
+
+# Usuários por linha da tabela de uso com grupos (todos os respondentes)
+USO_COM_GRUPOS_CSV = {
+    'SQL (linguagem, dados relacionais e bancos)': 1734,
+    'AWS (serviços diversos)': 533,
+    'Google Cloud (BigQuery, Firestore)': 349,
+    'Bancos NoSQL (MongoDB, Cassandra, Redis, etc.)': 305,
+    'Plataformas Big Data (Spark, Hadoop, etc.)': 437,
+    'Planilhas': 1674, 'Python': 1349, 'Textos/Documentos': 1085, 'AWS': 786,
+    'Dados em bancos NoSQL': 686, 'Dados georeferenciados': 569, 'Azure': 498,
+    'Google Cloud': 448, 'Servidores On Premise/Não utilizamos Cloud': 433, 'R': 308,
+    'Imagens': 300, 'Java': 224, 'Javascript': 174, 'Não utilizo nenhuma linguagem': 172,
+    'Visual Basic/VBA': 162, 'Cloud Própria': 149, 'ElasticSearch': 108, 'Scala': 89,
+    'SAP': 88, 'SAP HANA': 87, 'Vídeos': 79, 'Áudios': 78, 'SAS/Stata': 77, 'C/C++/C#': 66,
+    'Oracle Cloud': 65, 'Firebase': 63, '.NET': 42, 'PHP': 38, 'IBM': 35, 'Splunk': 19,
+    'Matlab': 15, 'Julia': 8, 'Vertica': 1,
+}
+
+@pytest.mark.parametrize('coluna, tecnologia', [
+    ('R', 'R'),
+    ('r', 'R'),
+    ('R.1', 'R'),
+    ('  Python ', 'Python'),
+    ('Microsoft SQL Server', 'SQL SERVER'),
+    ('SQLServer', 'SQL SERVER'),
+    ('Dados georreferenciados', 'Dados georeferenciados'),
+    ('couchdb', 'CoachDB'),
+    ('Amazon Aurora or RDS', 'Amazon Aurora ou RDS'),
+    ('C / C++ / C#', 'C/C++/C#'),
+    ('Servidores On Premises / Nao utilizamos Cloud', 'Servidores On Premise/Não utilizamos Cloud'),
+])
+def test_variacoes_reconhecidas(coluna, tecnologia):
+    assert DETECTOR_TECNOLOGIAS.classificar_coluna(coluna) == [tecnologia]
+
+@pytest.mark.parametrize('coluna', ['Gênero', 'UF', 'Rust', 'Ruby', 'Python 3', 'Dados', 'SQL Server 2019'])
+def test_colunas_que_nao_sao_tecnologias(coluna):
+    assert DETECTOR_TECNOLOGIAS.classificar_coluna(coluna) == []
+
+def test_relatorio_de_colunas_repetidas_ambiguas_e_desconhecidas():
+    detector = DetectorTecnologias({'Go': [r'go-?(lang)?'], 'Golang': [r'go-?lang'], 'SQL': []})
+    tech_columns, relatorio = detector.classificar(
+        ['sql', 'SQL.1', 'go-lang', 'Go', 'Gênero', 'Idade'], ignorar=['Idade']
+    )
+    assert tech_columns == ['Go', 'sql']
+    assert relatorio == {
+        'nao_reconhecidas': ['Gênero'],
+        'ambiguas': {'go-lang': ['Go', 'Golang']},
+        'repetidas': {'SQL': ['sql', 'SQL.1']},
+    }
+
+def test_colunas_detectadas_no_csv(dataset):
+    df, tech_columns, matriz, _ = dataset
+    assert tech_columns == TECNOLOGIAS_CSV
+    assert 'Gênero' not in tech_columns
+    assert matriz.colunas == TECNOLOGIAS_CSV
+
+def test_uso_com_grupos_no_csv(dataset):
+    _, tech_columns, matriz, _ = dataset
+    uso = calcular_uso_tecnologias(matriz, tech_columns, None, True)
+    assert dict(zip(uso['Tecnologia'], uso['Usuários'])) == USO_COM_GRUPOS_CSV
+    assert (uso['Total'] == 2645).all()
@@ -0,0 +1,80 @@
+"""
+IndiceFiltros.selecionar contra a máscara equivalente do pandas: bitmaps
+por valor (OR dentro da variável, AND entre variáveis) e faixa de idade
+pelos bitmaps de prefixo, com nulos e idades fora da faixa observada.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sod.filtros import IndiceFiltros
+
+COLUNAS = ['UF', 'Senioridade', 'Forma de trabalho']
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(0)
+    n = 1000
+    idade = rng.integers(18, 60, n).astype(float)
+    idade[rng.random(n) < 0.05] = np.nan
+    senioridade = rng.choice(['Júnior', 'Pleno', 'Sênior', None], n)
+    return pd.DataFrame({
+        'Idade': idade,
+        'UF': pd.Categorical(rng.choice(['SP', 'RJ', 'MG', 'BA', 'Não informado'], n)),
+        'Senioridade': pd.Categorical(senioridade),
+        # Variável sem dtype category (pd.factorize)
+        'Forma de trabalho': rng.choice(['Remoto', 'Presencial', 'Híbrido'], n),
+    })
+
+@pytest.fixture(scope='module')
+def indice(df):
+    return IndiceFiltros(df, colunas=COLUNAS)
+
+def mascara_pandas(df, idade_range=None, filtros=None):
+    """Mesma semântica da barra lateral: seleção vazia não filtra"""
+    mascara = pd.Series(True, index=df.index)
+    if idade_range is not None:
+        mascara &= df['Idade'].between(*idade_range)
+    for coluna, valores in (filtros or {}).items():
+        if valores:
+            mascara &= df[coluna].isin(valores)
+    return mascara.to_numpy()
+
+def test_sem_filtros_seleciona_todos(df, indice):
+    assert indice.mascara(indice.selecionar()).all()
+    assert indice.mascara(indice.selecionar(filtros={'UF': [], 'Senioridade': None})).all()
+
+@pytest.mark.parametrize('idade_range', [
+    (18, 59), (25, 40), (25.5, 40.5), (30, 30), (0, 17), (60, 99), (45, 20), (0, 99)
+])
+def test_faixa_de_idade(df, indice, idade_range):
+    selecao = indice.selecionar(idade_range=idade_range)
+    np.testing.assert_array_equal(indice.mascara(selecao), mascara_pandas(df, idade_range))
+
+def test_combinacoes_aleatorias(df, indice):
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        filtros = {}
+        for coluna in COLUNAS:
+            valores = indice.valores(coluna) + ['Inexistente']
+            filtros[coluna] = list(rng.choice(valores, rng.integers(0, len(valores) + 1), replace=False))
+        minimo = rng.integers(15, 60)
+        idade_range = (minimo, minimo + rng.integers(0, 30)) if rng.random() < 0.7 else None
+        
+        selecao = indice.selecionar(idade_range=idade_range, filtros=filtros)
+        esperado = mascara_pandas(df, idade_range, filtros)
+        np.testing.assert_array_equal(indice.mascara(selecao), esperado)
+        assert indice.contagens('UF', selecao) == {
+            uf: n for uf, n in df.loc[esperado, 'UF'].value_counts().items() if n > 0
+        }
+
+def test_assinatura_de_filtros_equivalentes(df, indice):
+    todas = indice.valores('UF')
+    # Mesma seleção efetiva, mesma assinatura
+    assert indice.assinatura((18, 59), {'UF': todas}) == indice.assinatura(None, {'UF': None})
+    assert (indice.assinatura((25.5, 40.5), {'UF': ['SP', 'RJ']})
+            == indice.assinatura((26, 40), {'UF': ['RJ', 'SP']}))
+    # Senioridade tem nulos: marcar todos os valores ainda exclui quem não respondeu
+    senioridades = indice.valores('Senioridade')
+    assert (indice.assinatura(None, {'Senioridade': senioridades})
+            != indice.assinatura(None, {'Senioridade': None}))
@@ -0,0 +1,78 @@
+"""
+AgregadorIncremental numa sequência aleatória de ~300 edições de filtros
+(incluir e tirar valores, limpar uma dimensão, mudar a idade ou um filtro
+fora das dimensões incrementais): cada resultado é igual ao das funções
+de análise sobre a seleção montada do zero.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sod.analise import calcular_uso_tecnologias
+from sod.coocorrencia import calcular_coocorrencia
+from sod.cruzadas import calcular_tabela_cruzada
+from sod.incremental import DIMENSOES_INCREMENTAIS, AgregadorIncremental
+
+EDICOES = 300
+
+def alternar(rng, filtros, indice, coluna):
+    """Inclui ou tira um valor sorteado do filtro da coluna"""
+    valor = rng.choice(indice.valores(coluna))
+    atuais = filtros.setdefault(coluna, [])
+    if valor in atuais:
+        atuais.remove(valor)
+    else:
+        atuais.append(valor)
+
+def editar(rng, estado, indice):
+    """Uma edição aleatória do estado (idade_range, filtros), como na barra lateral"""
+    idade_range, filtros = estado
+    filtros = {coluna: list(valores) for coluna, valores in filtros.items()}
+    sorteio = rng.random()
+    if sorteio < 0.1:
+        minimo, maximo = sorted(rng.choice(indice.idades, size=2))
+        idade_range = (float(minimo), float(maximo))
+    elif sorteio < 0.2:
+        alternar(rng, filtros, indice, 'regiao')
+    elif sorteio < 0.27:
+        filtros[rng.choice(DIMENSOES_INCREMENTAIS)] = []
+    else:
+        alternar(rng, filtros, indice, rng.choice(DIMENSOES_INCREMENTAIS))
+    return idade_range, filtros
+
+def conferir(agregador, dataset, idade_range, filtros):
+    _, tech_columns, matriz, indice = dataset
+    selecao = indice.selecionar(idade_range, filtros)
+    
+    esperado = calcular_uso_tecnologias(matriz, tech_columns, selecao)
+    obtido = agregador.uso(tech_columns, idade_range, filtros)
+    if esperado is None:
+        assert obtido is None
+    else:
+        pd.testing.assert_frame_equal(obtido, esperado)
+    
+    esperada = calcular_coocorrencia(matriz, selecao)
+    obtida = agregador.coocorrencia(idade_range, filtros)
+    assert obtida.nomes == esperada.nomes and obtida.n == esperada.n
+    np.testing.assert_array_equal(obtida.conjunta, esperada.conjunta)
+    
+    for variavel in ['Gênero', 'UF']:
+        esperada = calcular_tabela_cruzada(matriz, indice, variavel, selecao)
+        obtida = agregador.tabela_cruzada(variavel, idade_range, filtros)
+        assert obtida.valores == esperada.valores and obtida.colunas == esperada.colunas
+        np.testing.assert_array_equal(obtida.tamanhos, esperada.tamanhos)
+        np.testing.assert_array_equal(obtida.contagens, esperada.contagens)
+
+@pytest.mark.parametrize('limite_bytes', [None, 64 * 1024], ids=['padrao', 'limite_pequeno'])
+def test_edicoes_aleatorias(dataset, limite_bytes):
+    _, _, matriz, indice = dataset
+    agregador = AgregadorIncremental(matriz, indice, versao='teste', limite_bytes=limite_bytes)
+    rng = np.random.default_rng(25)
+    estado = (None, {})
+    conferir(agregador, dataset, *estado)
+    for _ in range(EDICOES):
+        estado = editar(rng, estado, indice)
+        conferir(agregador, dataset, *estado)
+    if limite_bytes is None:
+        # As edições partiram de resultados anteriores, não só de parciais novas
+        assert agregador.estatisticas()['acertos'] > EDICOES
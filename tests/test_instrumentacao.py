@@ -0,0 +1,81 @@
+"""
+Pico de memória por etapa com o tracemalloc: medido quando só um Medidor
+tem etapas abertas, omitido (None) quando outra execução mede ao mesmo tempo.
+"""
+import threading
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from sod.instrumentacao import Medidor, Metricas
+
+MB = 1 << 20
+
+@pytest.fixture(autouse=True)
+def rastrear_memoria():
+    ja_rastreava = tracemalloc.is_tracing()
+    if not ja_rastreava:
+        tracemalloc.start(1)
+    yield
+    if not ja_rastreava:
+        tracemalloc.stop()
+
+def alocar(megabytes):
+    bloco = np.ones(megabytes * MB, dtype=np.uint8)
+    del bloco
+
+def por_etapa(medidor):
+    return {m['etapa']: m for m in medidor.medicoes}
+
+def test_pico_de_etapas_aninhadas():
+    medidor = Medidor()
+    with medidor.etapa('externa'):
+        alocar(8)
+        with medidor.etapa('interna'):
+            alocar(2)
+    medicoes = por_etapa(medidor)
+    assert 2 * MB <= medicoes['interna']['pico_bytes'] < 3 * MB
+    # O pico da etapa externa inclui o que ocorreu antes da interna
+    assert 8 * MB <= medicoes['externa']['pico_bytes'] < 9 * MB
+    assert abs(medicoes['externa']['memoria_bytes']) < MB
+
+def test_medidores_concorrentes_nao_registram_pico():
+    primeiro, segundo = Medidor(), Medidor()
+    primeiro.secao('longa')
+    alocar(4)
+    with segundo.etapa('concorrente'):
+        alocar(1)
+    with primeiro.etapa('interna'):
+        alocar(1)
+    primeiro.finalizar()
+    # Sozinho de novo: volta a medir o pico
+    with segundo.etapa('sozinha'):
+        alocar(2)
+    
+    assert por_etapa(primeiro)['longa']['pico_bytes'] is None
+    assert por_etapa(primeiro)['interna']['pico_bytes'] is not None
+    assert por_etapa(segundo)['concorrente']['pico_bytes'] is None
+    assert por_etapa(segundo)['concorrente']['memoria_bytes'] is not None
+    assert 2 * MB <= por_etapa(segundo)['sozinha']['pico_bytes'] < 3 * MB
+
+def test_threads_concorrentes():
+    metricas = Metricas()
+    inicio = threading.Barrier(4)
+    
+    def execucao():
+        medidor = Medidor(metricas)
+        inicio.wait()
+        for _ in range(50):
+            with medidor.etapa('trabalho'):
+                alocar(1)
+    
+    threads = [threading.Thread(target=execucao) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    etapas, _ = metricas.resumo()
+    assert etapas['trabalho']['execucoes'] == 200
+    # Nenhum pico inflado pelas alocações das outras threads
+    assert etapas['trabalho']['pico_bytes'] < 2 * MB
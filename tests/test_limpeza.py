@@ -0,0 +1,85 @@
+"""
+Normalização categórica por valores distintos: regras aplicadas uma vez
+por valor, ausentes, categorias ordenadas, e o mapeamento de UF, região,
+senioridade e gênero feito por processar_dataset.
+"""
+import numpy as np
+import pandas as pd
+
+from sod.limpeza import (
+    REGRAS_GENERO, REGRAS_SENIORIDADE, mapear_categorica, normalizar_categorica, processar_dataset
+)
+
+def test_funcao_aplicada_uma_vez_por_valor_distinto():
+    serie = pd.Series(['b', 'a', None, 'b', 'a', 'c'] * 1000)
+    chamadas = []
+    
+    def funcao(valor):
+        chamadas.append(valor)
+        return None if valor == 'c' else (valor or 'vazio').upper()
+    
+    resultado = mapear_categorica(serie, funcao)
+    # Os três valores distintos e o ausente, não as 6000 linhas
+    assert len(chamadas) == 4 and set(chamadas) == {'a', 'b', 'c', None}
+    assert isinstance(resultado.dtype, pd.CategoricalDtype)
+    assert list(resultado.cat.categories) == ['A', 'B', 'VAZIO']
+    assert resultado.iloc[:5].tolist() == ['B', 'A', 'VAZIO', 'B', 'A']
+    assert pd.isna(resultado.iloc[5])
+    assert resultado.index.equals(serie.index)
+
+def test_senioridade():
+    serie = pd.Series([
+        'Júnior', 'junior', ' Analista Júnior ', 'Pleno', 'SÊNIOR', 'Senior',
+        'Gestor', 'Estagiário', 'Head de dados', 'Outra coisa', '', 'None', None, np.nan
+    ])
+    resultado = normalizar_categorica(serie, REGRAS_SENIORIDADE)
+    assert resultado.tolist()[:10] == [
+        'Júnior', 'Júnior', 'Júnior', 'Pleno', 'Sênior', 'Sênior',
+        'Gestor', 'Estagiário', 'Head', 'Outra coisa'
+    ]
+    # Textos de ausência viram nulos de verdade, não o texto 'None'
+    assert resultado.iloc[10:].isna().all()
+
+def test_genero_por_palavra_inteira():
+    serie = pd.Series(['Feminino', 'feminino', 'Mulher', 'F', 'Masculino', 'm', 'Homem',
+                       'Prefiro não informar', 'nan', None])
+    resultado = normalizar_categorica(serie, REGRAS_GENERO, vazio='Não informado')
+    assert resultado.tolist() == [
+        'Feminino', 'Feminino', 'Feminino', 'Feminino', 'Masculino', 'Masculino', 'Masculino',
+        'Prefiro não informar', 'Não informado', 'Não informado'
+    ]
+    assert list(resultado.cat.categories) == sorted(set(resultado))
+
+def test_processar_dataset_mapeia_perfil():
+    df = pd.DataFrame({
+        'Idade': [22.0, np.nan, 40.0, 60.0],
+        'UF': ['sp ', 'RJ', None, 'XX'],
+        'Senioridade': ['Júnior', None, None, 'pleno'],
+        'Gestor?': [0.0, 1.0, 0.0, 0.0],
+        'Gênero': ['Masculino', 'F', None, 'Feminino'],
+        'Setor': ['Finanças', ' Finanças', '', 'Varejo'],
+        'Python': pd.Series([1, 0, 1, 0], dtype=np.int8),
+    })
+    processado, tech_columns = processar_dataset(df)
+    
+    assert tech_columns == ['Python']
+    assert processado['UF'].tolist() == ['SP', 'RJ', 'Não informado', 'XX']
+    assert processado['regiao'].tolist() == ['Sudeste', 'Sudeste', 'Outros', 'Outros']
+    # Sem senioridade: gestores viram 'Gestor', os demais 'Não informado'
+    assert processado['Senioridade'].tolist() == ['Júnior', 'Gestor', 'Não informado', 'Pleno']
+    assert processado['Gênero'].tolist() == ['Masculino', 'Feminino', 'Não informado', 'Feminino']
+    assert processado['Setor'].tolist()[:2] == ['Finanças', 'Finanças']
+    assert pd.isna(processado['Setor'].iloc[2])
+    assert processado['Idade'].tolist() == [22.0, 40.0, 40.0, 60.0]
+    assert processado['faixa_etaria'].astype(str).tolist() == ['<25', '35-44', '35-44', '55+']
+    for coluna in ['UF', 'regiao', 'Senioridade', 'Gênero', 'Setor']:
+        assert isinstance(processado[coluna].dtype, pd.CategoricalDtype), coluna
+    assert processado['Python'].dtype == np.int8
+
+def test_categorias_do_csv(dataset):
+    df = dataset[0]
+    assert set(df['Senioridade'].cat.categories) >= {'Júnior', 'Pleno', 'Sênior', 'Gestor', 'Não informado'}
+    assert df['Senioridade'].notna().all()
+    assert set(df['Gênero'].cat.categories) <= {'Feminino', 'Masculino', 'Outro', 'Prefiro não informar', 'Não informado'}
+    assert 'NONE' not in df['UF'].cat.categories
+    assert df['UF'].notna().all() and df['regiao'].notna().all()
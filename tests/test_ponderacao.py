@@ -0,0 +1,99 @@
+"""
+Raking (IPF) sobre uma tabela pequena montada à mão: as proporções
+ponderadas batem com as margens, e margens impossíveis (células vazias)
+terminam sem convergência em vez de pesos inválidos.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sod.bits import empacotar_bits
+from sod.filtros import IndiceFiltros
+from sod.ponderacao import TOLERANCIA, Estratos, ponderar
+
+# 10 respondentes: Gênero × região, com um sem gênero
+TABELA = pd.DataFrame({
+    'Gênero': ['Feminino', 'Feminino', 'Masculino', 'Masculino', 'Masculino',
+               'Masculino', 'Masculino', 'Feminino', 'Masculino', None],
+    'regiao': ['Sul', 'Sudeste', 'Sudeste', 'Sudeste', 'Sul',
+               'Nordeste', 'Sudeste', 'Nordeste', 'Sudeste', 'Sul'],
+})
+MARGENS = {
+    'Gênero': {'Feminino': 0.5, 'Masculino': 0.5},
+    'regiao': {'Nordeste': 0.2, 'Sudeste': 0.5, 'Sul': 0.3},
+}
+
+def estratos_de(df):
+    indice = IndiceFiltros(df, colunas=list(df.columns))
+    return Estratos(indice, variaveis=list(df.columns))
+
+def proporcoes(df, pesos, variavel):
+    ponderado = pd.Series(pesos).groupby(df[variavel].to_numpy()).sum()
+    return (ponderado / ponderado.sum()).to_dict()
+
+def test_converge_para_as_margens():
+    estratos = estratos_de(TABELA)
+    pesos, relatorio = ponderar(estratos, margens=MARGENS)
+    
+    assert relatorio['convergiu']
+    assert relatorio['erro_maximo'] < TOLERANCIA
+    assert 1 < relatorio['iteracoes'] < 100
+    assert relatorio['respondentes'] == 10
+    for variavel, alvos in MARGENS.items():
+        obtido = proporcoes(TABELA, pesos, variavel)
+        for valor, alvo in alvos.items():
+            assert obtido[valor] == pytest.approx(alvo, abs=1e-5), (variavel, valor)
+    # Média 1 e o mesmo peso para quem está na mesma célula
+    assert pesos.mean() == pytest.approx(1)
+    for _, grupo in pd.Series(pesos).groupby([TABELA['Gênero'].fillna('-'), TABELA['regiao']]):
+        assert np.ptp(grupo.to_numpy()) == 0
+    # Kish: n_ef = (Σw)² / Σw²
+    assert relatorio['tamanho_efetivo'] == pytest.approx(pesos.sum() ** 2 / (pesos ** 2).sum())
+
+def test_sem_margens_usa_a_composicao_da_amostra():
+    estratos = estratos_de(TABELA)
+    pesos, relatorio = ponderar(estratos)
+    assert relatorio['convergiu']
+    np.testing.assert_allclose(pesos, 1)
+
+def test_selecao_renormaliza_valores_ausentes():
+    # Sem Nordeste na seleção: as margens de região valem sobre Sudeste e Sul
+    estratos = estratos_de(TABELA)
+    selecao = empacotar_bits((TABELA['regiao'] != 'Nordeste').to_numpy())
+    pesos, relatorio = ponderar(estratos, selecao, margens=MARGENS)
+    
+    assert relatorio['convergiu']
+    assert np.all(pesos[TABELA['regiao'] == 'Nordeste'] == 0)
+    dentro = TABELA['regiao'] != 'Nordeste'
+    obtido = proporcoes(TABELA[dentro], pesos[dentro.to_numpy()], 'regiao')
+    assert obtido['Sudeste'] == pytest.approx(0.5 / 0.8, abs=1e-5)
+    assert 'Nordeste' not in relatorio['margens']['regiao']
+
+def test_celulas_vazias_impedem_convergencia():
+    # Gênero determina a região (células Feminino × Sudeste e Masculino × Sul
+    # vazias): não há pesos com 50% de mulheres e 80% no Sul
+    df = pd.DataFrame({
+        'Gênero': ['Feminino'] * 3 + ['Masculino'] * 7,
+        'regiao': ['Sul'] * 3 + ['Sudeste'] * 7,
+    })
+    margens = {'Gênero': {'Feminino': 0.5, 'Masculino': 0.5}, 'regiao': {'Sul': 0.8, 'Sudeste': 0.2}}
+    pesos, relatorio = ponderar(estratos_de(df), margens=margens, max_iteracoes=50)
+    
+    assert not relatorio['convergiu']
+    assert relatorio['iteracoes'] == 50
+    assert relatorio['erro_maximo'] >= 0.1
+    assert np.all(np.isfinite(pesos)) and np.all(pesos > 0)
+    assert pesos.mean() == pytest.approx(1)
+
+def test_iteracoes_insuficientes():
+    pesos, relatorio = ponderar(estratos_de(TABELA), margens=MARGENS, max_iteracoes=1)
+    assert not relatorio['convergiu']
+    assert relatorio['erro_maximo'] > TOLERANCIA
+
+def test_selecao_vazia():
+    estratos = estratos_de(TABELA)
+    pesos, relatorio = ponderar(estratos, np.zeros_like(empacotar_bits(np.ones(10, dtype=bool))), margens=MARGENS)
+    assert relatorio['respondentes'] == 0
+    assert relatorio['tamanho_efetivo'] == 0
+    assert np.isnan(relatorio['peso_minimo'])
+    assert np.all(pesos == 0)
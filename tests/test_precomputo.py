@@ -0,0 +1,93 @@
+"""
+Artefato pré-calculado a partir de um CSV temporário, servido pelo app:
+as chaves que obter_cache_resultados (main.py) fixa são exatamente as que
+as seções consultam no estado padrão dos filtros.
+"""
+import functools
+import os
+
+import pytest
+
+import sod
+from sod import carga, precomputo
+from sod.sintetico import gerar_pesquisa_sintetica
+
+pytest.importorskip('matplotlib')  # Styler.background_gradient do app
+streamlit = pytest.importorskip('streamlit')
+testing = pytest.importorskip('streamlit.testing.v1')
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+class CacheRegistrado(sod.CacheResultados):
+    """CacheResultados que anota as chaves fixadas e as consultadas"""
+    
+    fixadas = set()
+    consultadas = []
+    
+    def fixar(self, chave, valor):
+        self.fixadas.add(chave)
+        super().fixar(chave, valor)
+    
+    def _buscar(self, chave):
+        self.consultadas.append(chave)
+        return super()._buscar(chave)
+
+def seletor_perfil(app):
+    return next(s for s in app.selectbox if s.label == "Selecione a variável:")
+
+@pytest.fixture
+def csv_temporario(tmp_path):
+    caminho = str(tmp_path / 'pesquisa.csv')
+    gerar_pesquisa_sintetica(caminho, fator=1, semente=3)
+    return caminho
+
+def test_construir_a_partir_do_csv(csv_temporario, tmp_path):
+    df, tech_columns, matriz, indice = carga.carregar_dataset(
+        csv_temporario, usar_snapshot=False, usar_compartilhado=False
+    )
+    artefato = precomputo.calcular_precomputado(df, tech_columns, matriz, indice)
+    caminho = precomputo.salvar_precomputado(artefato, str(tmp_path))
+    
+    assert os.path.basename(caminho).startswith(f"state_of_data_{df.attrs['versao_dados']}_")
+    carregado = precomputo.carregar_precomputado(df.attrs['versao_dados'], str(tmp_path))
+    assert carregado['assinatura'] == precomputo.assinatura_padrao(df, indice)
+    assert carregado['uso'][True].equals(artefato['uso'][True])
+    # Outra versão dos dados não usa o artefato
+    assert precomputo.carregar_precomputado('outra', str(tmp_path)) is None
+
+def test_app_consulta_as_chaves_fixadas(csv_temporario, tmp_path, monkeypatch):
+    df, tech_columns, matriz, indice = carga.carregar_dataset(
+        csv_temporario, usar_snapshot=False, usar_compartilhado=False
+    )
+    precomputo.salvar_precomputado(
+        precomputo.calcular_precomputado(df, tech_columns, matriz, indice), str(tmp_path)
+    )
+    
+    # O app carrega o mesmo CSV temporário e lê o artefato do tmp_path
+    monkeypatch.setattr(sod, 'carregar_dataset', functools.partial(
+        carga.carregar_dataset, csv_temporario, usar_snapshot=False, usar_compartilhado=False
+    ))
+    monkeypatch.setattr(sod, 'CacheResultados', CacheRegistrado)
+    monkeypatch.setattr(precomputo, 'DIRETORIO_PRECOMPUTADO', str(tmp_path))
+    monkeypatch.setattr(CacheRegistrado, 'fixadas', set())
+    monkeypatch.setattr(CacheRegistrado, 'consultadas', [])
+    # Recursos do processo (dataset, cache) de execuções anteriores
+    streamlit.cache_resource.clear()
+    
+    app = testing.AppTest.from_file(MAIN, default_timeout=120).run()
+    assert not app.exception
+    # Estado padrão, sem agrupar e cada variável da análise por perfil
+    agrupar = next(c for c in app.checkbox if c.label.startswith("Agrupar tecnologias"))
+    agrupar.uncheck().run()
+    assert not app.exception
+    for variavel in seletor_perfil(app).options:
+        seletor_perfil(app).select(variavel).run()
+        assert not app.exception
+    
+    fixadas = CacheRegistrado.fixadas
+    assert fixadas
+    tipos = {chave[0] for chave in fixadas}
+    consultadas = {chave for chave in CacheRegistrado.consultadas if chave[0] in tipos}
+    # Nada do estado padrão é calculado no app, e nada fixado fica sem uso
+    assert consultadas - fixadas == set()
+    assert fixadas - consultadas == set()
@@ -0,0 +1,242 @@
+"""
+obter_copia contra um http.server local em porta efêmera: download,
+revalidação condicional (304), novas tentativas em 503, prazo do
+download e queda para a cópia anterior sem servidor.
+"""
+import os
+import socket
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sod.remoto import caminhos_copia, criar_sessao, obter_copia
+
+CORPO = b"id;Idade\n1;30\n2;41\n"
+ETAG = '"v1"'
+ULTIMA_MODIFICACAO = formatdate(0, usegmt=True)
+
+class Servidor:
+    """http.server em uma thread, com o comportamento escolhido por teste"""
+    
+    def __init__(self, responder):
+        self.requisicoes = []
+        servidor = self
+        
+        class Tratador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                servidor.requisicoes.append(dict(self.headers))
+                responder(self, len(servidor.requisicoes))
+            
+            def log_message(self, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Tratador)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/dados.csv"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+    
+    def parar(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def servidor():
+    criados = []
+    def criar(responder):
+        criados.append(Servidor(responder))
+        return criados[-1]
+    yield criar
+    for s in criados:
+        s.parar()
+
+def responder_corpo(tratador, etag=ETAG, ultima_modificacao=ULTIMA_MODIFICACAO):
+    tratador.send_response(200)
+    tratador.send_header('Content-Length', str(len(CORPO)))
+    if etag:
+        tratador.send_header('ETag', etag)
+    if ultima_modificacao:
+        tratador.send_header('Last-Modified', ultima_modificacao)
+    tratador.end_headers()
+    tratador.wfile.write(CORPO)
+
+def responder_vazio(tratador, status):
+    tratador.send_response(status)
+    tratador.send_header('Content-Length', '0')
+    tratador.end_headers()
+
+def responder_condicional(tratador, n):
+    """200 com ETag e Last-Modified; 304 quando algum validador confere"""
+    if (tratador.headers.get('If-None-Match') == ETAG
+            or tratador.headers.get('If-Modified-Since') == ULTIMA_MODIFICACAO):
+        responder_vazio(tratador, 304)
+    else:
+        responder_corpo(tratador)
+
+def porta_fechada():
+    """URL em uma porta sem ninguém ouvindo"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        porta = s.getsockname()[1]
+    return f"http://127.0.0.1:{porta}/dados.csv"
+
+# ============================================================================
+# DOWNLOAD E REVALIDAÇÃO
+# ============================================================================
+def test_baixa_e_depois_valida_com_if_none_match(servidor, tmp_path):
+    s = servidor(responder_condicional)
+    
+    caminho, situacao = obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao())
+    assert situacao == 'baixada'
+    with open(caminho, 'rb') as f:
+        assert f.read() == CORPO
+    modificado = os.path.getmtime(caminho)
+    
+    caminho_2, situacao = obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao())
+    assert (caminho_2, situacao) == (caminho, 'validada')
+    assert s.requisicoes[1].get('If-None-Match') == ETAG
+    # 304: a cópia não foi reescrita
+    assert os.path.getmtime(caminho) == modificado
+    with open(caminho, 'rb') as f:
+        assert f.read() == CORPO
+
+def test_valida_com_if_modified_since_sem_etag(servidor, tmp_path):
+    def responder(tratador, n):
+        if tratador.headers.get('If-Modified-Since') == ULTIMA_MODIFICACAO:
+            responder_vazio(tratador, 304)
+        else:
+            responder_corpo(tratador, etag=None)
+    s = servidor(responder)
+    
+    assert obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao())[1] == 'baixada'
+    assert obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao())[1] == 'validada'
+    assert 'If-None-Match' not in s.requisicoes[1]
+    assert s.requisicoes[1]['If-Modified-Since'] == ULTIMA_MODIFICACAO
+
+def test_sem_revalidar_usa_a_copia_sem_requisicao(servidor, tmp_path):
+    s = servidor(responder_condicional)
+    obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao())
+    
+    assert obter_copia(s.url, diretorio=tmp_path, revalidar=False)[1] == 'local'
+    assert len(s.requisicoes) == 1
+
+# ============================================================================
+# NOVAS TENTATIVAS E PRAZO
+# ============================================================================
+def test_tenta_de_novo_em_503(servidor, tmp_path):
+    def responder(tratador, n):
+        if n <= 2:
+            responder_vazio(tratador, 503)
+        else:
+            responder_corpo(tratador)
+    s = servidor(responder)
+    
+    caminho, situacao = obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao(tentativas=2))
+    assert situacao == 'baixada'
+    assert len(s.requisicoes) == 3
+    with open(caminho, 'rb') as f:
+        assert f.read() == CORPO
+
+def test_desiste_depois_das_tentativas(servidor, tmp_path):
+    s = servidor(lambda tratador, n: responder_vazio(tratador, 503))
+    
+    assert obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao(tentativas=2)) == (None, 'indisponivel')
+    assert len(s.requisicoes) == 3
+
+def test_prazo_interrompe_corpo_lento(servidor, tmp_path):
+    blocos = 40
+    def responder(tratador, n):
+        tratador.send_response(200)
+        tratador.send_header('Content-Length', str(blocos * 10))
+        tratador.end_headers()
+        try:
+            for _ in range(blocos):
+                tratador.wfile.write(b"x" * 10)
+                tratador.wfile.flush()
+                time.sleep(0.1)
+        except OSError:
+            pass
+    s = servidor(responder)
+    
+    inicio = time.monotonic()
+    resultado = obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao(), prazo=0.5)
+    decorrido = time.monotonic() - inicio
+    
+    assert resultado == (None, 'indisponivel')
+    # Bem antes dos 4 s do corpo inteiro, e sem arquivo pela metade
+    assert decorrido < 2
+    assert os.listdir(tmp_path) == []
+
+def test_retry_after_longo_respeita_o_prazo(servidor, tmp_path):
+    def responder(tratador, n):
+        tratador.send_response(503)
+        tratador.send_header('Retry-After', '3600')
+        tratador.send_header('Content-Length', '0')
+        tratador.end_headers()
+    s = servidor(responder)
+    
+    inicio = time.monotonic()
+    resultado = obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao(tentativas=2), prazo=1)
+    decorrido = time.monotonic() - inicio
+    
+    assert resultado == (None, 'indisponivel')
+    # A espera de uma hora não cabe no prazo: desiste sem dormir
+    assert decorrido < 1
+    assert len(s.requisicoes) == 1
+
+def test_retry_after_curto_e_respeitado(servidor, tmp_path):
+    def responder(tratador, n):
+        if n == 1:
+            tratador.send_response(429)
+            tratador.send_header('Retry-After', '1')
+            tratador.send_header('Content-Length', '0')
+            tratador.end_headers()
+        else:
+            responder_corpo(tratador)
+    s = servidor(responder)
+    
+    inicio = time.monotonic()
+    caminho, situacao = obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao(tentativas=2), prazo=5)
+    
+    assert situacao == 'baixada'
+    assert time.monotonic() - inicio >= 1
+    assert len(s.requisicoes) == 2
+
+def test_prazo_vale_para_cabecalhos_lentos(servidor, tmp_path):
+    # Cada tentativa espera o timeout de leitura inteiro: as tentativas
+    # seguintes só usam o que resta do prazo
+    def responder(tratador, n):
+        time.sleep(1.5)
+        try:
+            responder_corpo(tratador)
+        except OSError:
+            pass
+    s = servidor(responder)
+    
+    inicio = time.monotonic()
+    resultado = obter_copia(
+        s.url, diretorio=tmp_path, sessao=criar_sessao(tentativas=2), timeout=(1, 1), prazo=1.5
+    )
+    assert resultado == (None, 'indisponivel')
+    assert time.monotonic() - inicio < 2.5
+
+# ============================================================================
+# SERVIDOR FORA DO AR
+# ============================================================================
+def test_servidor_fora_do_ar_mantem_a_copia_anterior(servidor, tmp_path):
+    s = servidor(responder_condicional)
+    caminho, _ = obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao())
+    s.parar()
+    
+    assert obter_copia(s.url, diretorio=tmp_path, sessao=criar_sessao(tentativas=0)) == (caminho, 'desatualizada')
+    with open(caminho, 'rb') as f:
+        assert f.read() == CORPO
+
+def test_servidor_fora_do_ar_sem_copia(tmp_path):
+    url = porta_fechada()
+    
+    assert obter_copia(url, diretorio=tmp_path, sessao=criar_sessao(tentativas=0)) == (None, 'indisponivel')
+    assert not os.path.exists(caminhos_copia(url, tmp_path)[0])
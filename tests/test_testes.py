@@ -0,0 +1,104 @@
+"""
+testar_associacao contra o scipy (qui-quadrado sem correção de
+continuidade e Fisher bilateral) e as correções de Benjamini-Hochberg e
+Holm contra valores calculados à mão.
+"""
+import numpy as np
+import pytest
+
+from sod.cruzadas import TabelaCruzada, calcular_tabela_cruzada
+# Pelo módulo: importada direto, testar_associacao seria coletada pelo pytest
+from sod import testes
+from sod.testes import ajustar_p, fisher_2x2, sobrevivencia_qui2
+
+stats = pytest.importorskip('scipy.stats')
+
+def tabela_de(contagens, tamanhos, colunas, valores=None):
+    contagens = np.asarray(contagens, dtype=np.int64)
+    valores = valores or [f'v{i}' for i in range(len(tamanhos))]
+    return TabelaCruzada('variavel', valores, np.asarray(tamanhos, dtype=np.int64), contagens, colunas)
+
+def contingencia(tabela, tecnologia):
+    usuarios = tabela.contagens[:, tabela.posicao[tecnologia]]
+    return np.array([usuarios, tabela.tamanhos - usuarios])
+
+def test_qui_quadrado_contra_scipy():
+    # 3 valores × 3 tecnologias, esperadas grandes
+    tabela = tabela_de(
+        [[40, 12, 90], [55, 30, 80], [20, 25, 60]], [100, 120, 90], ['A', 'B', 'C']
+    )
+    resultado = testes.testar_associacao(tabela)
+    for tecnologia in ['A', 'B', 'C']:
+        qui2, p, gl, _ = stats.chi2_contingency(contingencia(tabela, tecnologia), correction=False)
+        linha = resultado.loc[tecnologia]
+        assert linha['Teste'] == 'qui-quadrado'
+        assert linha['Qui-quadrado'] == pytest.approx(qui2, rel=1e-10)
+        assert linha['GL'] == gl
+        assert linha['p-valor'] == pytest.approx(p, rel=1e-8, abs=1e-15)
+        assert linha['V de Cramér'] == pytest.approx(np.sqrt(qui2 / 310), rel=1e-10)
+
+def test_fisher_em_tabelas_2x2_pequenas():
+    tabela = tabela_de([[1, 9, 3], [6, 2, 3]], [10, 8], ['A', 'B', 'C'])
+    resultado = testes.testar_associacao(tabela)
+    for tecnologia in ['A', 'B', 'C']:
+        _, p = stats.fisher_exact(contingencia(tabela, tecnologia))
+        assert resultado.loc[tecnologia, 'Teste'] == 'Fisher (exato)'
+        assert resultado.loc[tecnologia, 'p-valor'] == pytest.approx(p, rel=1e-9)
+
+def test_fisher_vetorizado():
+    rng = np.random.default_rng(0)
+    tabelas = rng.integers(0, 30, size=(200, 4))
+    p = fisher_2x2(*tabelas.T)
+    esperado = [stats.fisher_exact(t.reshape(2, 2))[1] for t in tabelas]
+    np.testing.assert_allclose(p, esperado, rtol=1e-9)
+
+def test_sobrevivencia_qui2():
+    estatisticas = np.array([0.01, 0.5, 3.0, 7.8, 15.0, 40.0, 120.0])
+    for gl in [1, 2, 5, 22]:
+        np.testing.assert_allclose(
+            sobrevivencia_qui2(estatisticas, gl), stats.chi2.sf(estatisticas, gl), rtol=1e-9, atol=1e-300
+        )
+
+def test_sem_variacao():
+    tabela = tabela_de([[0, 10], [0, 5]], [10, 5], ['Ninguém', 'Todos'])
+    resultado = testes.testar_associacao(tabela)
+    assert (resultado['Teste'] == 'sem variação').all()
+    assert resultado['p-valor'].isna().all() and not resultado['Significativo'].any()
+
+def test_csv_do_projeto_contra_scipy(dataset):
+    _, _, matriz, indice = dataset
+    tabela = calcular_tabela_cruzada(matriz, indice, 'regiao')
+    resultado = testes.testar_associacao(tabela, correcao='holm')
+    linhas = tabela.tamanhos > 0
+    p_scipy = []
+    for tecnologia in resultado.index:
+        observado = contingencia(tabela, tecnologia)[:, linhas]
+        if resultado.loc[tecnologia, 'Teste'] == 'sem variação':
+            p_scipy.append(np.nan)
+            continue
+        qui2, p, _, _ = stats.chi2_contingency(observado, correction=False)
+        assert resultado.loc[tecnologia, 'Qui-quadrado'] == pytest.approx(qui2, rel=1e-9), tecnologia
+        assert resultado.loc[tecnologia, 'p-valor'] == pytest.approx(p, rel=1e-6, abs=1e-14), tecnologia
+        p_scipy.append(p)
+    p_scipy = np.array(p_scipy)
+    # Holm sobre os p-valores do scipy
+    np.testing.assert_allclose(resultado['p ajustado'], ajustar_p(p_scipy, 'holm'), rtol=1e-6, atol=1e-14)
+
+# p-valores corrigidos à mão: ordenados 0.005, 0.01, 0.03, 0.04 (m = 4)
+P = [0.01, 0.04, 0.03, 0.005, np.nan]
+
+def test_benjamini_hochberg():
+    # p·m/posição = 0.02, 0.02, 0.04, 0.04 (mínimo acumulado do fim)
+    np.testing.assert_allclose(ajustar_p(P, 'bh'), [0.02, 0.04, 0.04, 0.02, np.nan])
+    rng = np.random.default_rng(1)
+    p = rng.uniform(0, 0.2, 50)
+    np.testing.assert_allclose(ajustar_p(p, 'bh'), stats.false_discovery_control(p, method='bh'))
+
+def test_holm():
+    # p·(m - posição + 1) = 0.02, 0.03, 0.06, 0.04 (máximo acumulado)
+    np.testing.assert_allclose(ajustar_p(P, 'holm'), [0.03, 0.06, 0.06, 0.02, np.nan])
+    np.testing.assert_allclose(ajustar_p([0.5, 0.4, 0.3], 'holm'), [0.9, 0.9, 0.9])
+
+def test_correcao_desconhecida():
+    with pytest.raises(ValueError):
+        ajustar_p([0.1], 'bonferroni')
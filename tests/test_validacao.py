@@ -0,0 +1,29 @@
+"""
+Validação do CSV do projeto: nenhum erro nem aviso, e todas as variáveis
+de perfil indexadas (nomes do esquema).
+"""
+from sod.armazenamento import CAMINHO_CSV_LOCAL
+from sod.carga import carregar_dataset
+from sod.esquema import ESQUEMA_CSV
+from sod.filtros import COLUNAS_INDEXADAS
+
+# Colunas derivadas na limpeza, fora do esquema do CSV
+DERIVADAS = {'regiao', 'faixa_etaria'}
+
+def test_variaveis_indexadas_estao_no_esquema():
+    assert set(COLUNAS_INDEXADAS) - DERIVADAS <= set(ESQUEMA_CSV)
+
+def test_csv_do_projeto_sem_avisos():
+    validacao, mensagens = {}, []
+    _, _, _, indice = carregar_dataset(
+        CAMINHO_CSV_LOCAL, usar_snapshot=False, usar_compartilhado=False,
+        mensagens=mensagens, validacao=validacao
+    )
+    assert validacao['relatorio']['erros'] == []
+    assert validacao['relatorio']['avisos'] == []
+    assert [texto for nivel, texto in mensagens if nivel == 'warning'] == []
+    assert list(indice.bitmaps) == COLUNAS_INDEXADAS
+    assert indice.valores('Atuaçao') == [
+        'Análise de Dados', 'Buscando emprego na área de dados.', 'Ciência de Dados',
+        'Engenharia de Dados', 'Gestor', 'Outra'
+    ]